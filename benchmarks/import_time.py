@@ -0,0 +1,74 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+"""
+Startup benchmark. Every run starts a fresh interpreter, the same as `python -c "import teacup"`,
+and reports the median wall time of the whole process, of `import teacup` alone and of a headless
+`teacup.init()` / `teacup.done()`. Modules teacup only loads on first use (numpy, SDL_ttf, SDL_image)
+must not be imported by then. Exits with 1 above `--max-ms` or when one of them was imported:
+
+    python benchmarks/import_time.py --max-ms 300
+"""
+
+TARGET_MS = 300 # `python -c "import teacup"` on a typical desktop, checked by default
+
+LAZY = ("numpy", "sdl2.ext", "sdl2.sdlttf", "sdl2.sdlimage") # loaded on first use only
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import teacup
+imported = time.perf_counter()
+teacup.init(headless=True)
+teacup.done()
+done = time.perf_counter()
+print(json.dumps({
+    "import": imported - start,
+    "init": done - imported,
+    "loaded": [name for name in %r if name in sys.modules],
+}))
+""" % (LAZY,)
+
+def probe():
+    """
+    Returns the timings of one fresh interpreter, "process" being `python -c "import teacup"`.
+    """
+
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import teacup"], check=True, stderr=subprocess.DEVNULL)
+    process = time.perf_counter() - start
+
+    output = subprocess.run([sys.executable, "-c", PROBE], check=True, capture_output=True, text=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process"] = process
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="teacup startup benchmark")
+    parser.add_argument("--runs", type=int, default=10, help="fresh interpreters to time")
+    parser.add_argument("--max-ms", type=float, default=TARGET_MS, help="fail when `python -c \"import teacup\"` takes longer")
+    parser.add_argument("--out", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    runs = [probe() for _ in range(args.runs)]
+    results = {key: statistics.median(run[key] for run in runs) * 1000 for key in ("process", "import", "init")}
+    results["loaded"] = sorted({name for run in runs for name in run["loaded"]})
+
+    print(f"python -c \"import teacup\" {results['process']:>8.1f} ms")
+    print(f"import teacup              {results['import']:>8.1f} ms")
+    print(f"init & done (headless)     {results['init']:>8.1f} ms")
+    if results["loaded"]:
+        print("loaded up front:", ", ".join(results["loaded"]))
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+    return 1 if results["process"] > args.max_ms or results["loaded"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
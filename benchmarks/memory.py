@@ -0,0 +1,120 @@
+import argparse
+import json
+import sys
+import tracemalloc
+
+import teacup
+
+"""
+Memory benchmark based on tracemalloc. Measures the bytes kept alive per screen object and the
+transient memory a steady state frame allocates (peak above the memory held before the frame), both
+when every object moves and when an unchanged scene is fully redrawn, which should not allocate
+anything per object. Pass limits to turn it into a check that exits with 1 when they are exceeded:
+
+    python benchmarks/memory.py --max-object-bytes 500 --max-frame-bytes 80000 --max-redraw-bytes 4096
+
+For comparison, before screen objects were slotted a rectangle kept 447 bytes, an ellipse 473 and a
+text 567.
+
+About 40000 bytes of a moving frame are the new coordinates the benchmark itself assigns to 2000
+objects, alive next to the old ones until the frame is recorded. tests/test_memory.py runs the same
+checks.
+"""
+
+def per_object(factory, n):
+    """
+    Bytes kept alive per object created by `factory(i)`.
+    """
+
+    objects = []
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(n):
+        objects.append(factory(i))
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / n
+
+def per_frame(factory, n, frames, moving=True):
+    """
+    Transient bytes allocated by a frame in which every one of `n` objects moves, or with `moving`
+    off, by a full redraw of the same objects standing still.
+    """
+
+    win = teacup.OffscreenWindow((800, 600))
+    objects = [factory(i) for i in range(n)]
+    for obj in objects:
+        win.attach(obj)
+
+    def frame():
+        if moving:
+            for obj in objects:
+                obj.x = (obj.x + 1) % 800
+        else:
+            win._touch() # redraw everything
+        win.render()
+
+    for i in range(5): # warm up caches
+        frame()
+
+    tracemalloc.start()
+    frame() # replaces objects allocated before tracing, their release would not be seen
+    worst = 0
+    for i in range(frames):
+        held = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        frame()
+        worst = max(worst, tracemalloc.get_traced_memory()[1] - held)
+    tracemalloc.stop()
+
+    win.destroy()
+    return worst
+
+STYLE = {"background-color": (255, 0, 0, 255), "color": (255, 255, 255, 255)}
+
+FACTORIES = {
+    "rectangle": lambda i: teacup.Rectangle(i % 800, i % 600, 10, 10, STYLE),
+    "ellipse": lambda i: teacup.Ellipse(i % 800, i % 600, 10, 10, STYLE),
+    "text": lambda i: teacup.Text(i % 800, i % 600, "label", STYLE),
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="teacup memory benchmark")
+    parser.add_argument("-n", type=int, default=10_000, help="objects per measurement")
+    parser.add_argument("--frames", type=int, default=20)
+    parser.add_argument("--max-object-bytes", type=float, help="fail above this many bytes per object")
+    parser.add_argument("--max-frame-bytes", type=float, help="fail above this many transient bytes per frame")
+    parser.add_argument("--max-redraw-bytes", type=float, help="fail above this many transient bytes per static redraw")
+    parser.add_argument("--out", help="write results to this JSON file")
+    args = parser.parse_args()
+
+    teacup.init(headless=True)
+
+    results = {}
+    failed = False
+    for name, factory in FACTORIES.items():
+        results[name] = {
+            "object_bytes": per_object(factory, args.n),
+            "frame_bytes": per_frame(factory, min(args.n, 2000), args.frames),
+            "redraw_bytes": per_frame(factory, min(args.n, 2000), args.frames, moving=False),
+        }
+        print(f"{name:<10} {results[name]['object_bytes']:>8.0f} bytes/object {results[name]['frame_bytes']:>10} bytes/frame"
+              f" {results[name]['redraw_bytes']:>8} bytes/redraw")
+
+        if args.max_object_bytes is not None and results[name]["object_bytes"] > args.max_object_bytes:
+            failed = True
+        if args.max_frame_bytes is not None and results[name]["frame_bytes"] > args.max_frame_bytes:
+            failed = True
+        if args.max_redraw_bytes is not None and results[name]["redraw_bytes"] > args.max_redraw_bytes:
+            failed = True
+
+    teacup.done()
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
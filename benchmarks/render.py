@@ -0,0 +1,267 @@
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+
+import teacup
+
+"""
+Headless rendering benchmarks. Every scenario renders frames as fast as possible into offscreen
+windows under SDL's dummy video driver and reports frames/sec & per frame times. Results are written
+as JSON so runs on different commits can be compared:
+
+    python benchmarks/render.py --out before.json
+    python benchmarks/render.py --out after.json --compare before.json
+"""
+
+WIDTH, HEIGHT = 800, 600
+
+def _color():
+    return (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255), 255)
+
+def rectangles(n):
+    def setup():
+        win = teacup.OffscreenWindow((WIDTH, HEIGHT))
+        rects = [teacup.Rectangle(random.randint(0, WIDTH), random.randint(0, HEIGHT), 20, 20,
+                                  {"background-color": _color()}) for _ in range(n)]
+        for rect in rects:
+            win.attach(rect)
+
+        def update(frame):
+            for rect in rects: # everything moves, nothing can be skipped
+                rect.x = (rect.x + 1) % WIDTH
+        return [win], update
+    return setup
+
+def rectangles_static(n):
+    def setup():
+        win = teacup.OffscreenWindow((WIDTH, HEIGHT))
+        for _ in range(n):
+            win.attach(teacup.Rectangle(random.randint(0, WIDTH), random.randint(0, HEIGHT), 20, 20,
+                                        {"background-color": _color()}))
+
+        def update(frame): # nothing changes, yet all of it is drawn again every frame
+            win._touch()
+        return [win], update
+    return setup
+
+def ellipses(n, radius):
+    def setup():
+        win = teacup.OffscreenWindow((WIDTH, HEIGHT))
+        balls = [teacup.Ellipse(random.randint(0, WIDTH), random.randint(0, HEIGHT), radius * 2, radius * 2,
+                                {"background-color": _color()}) for _ in range(n)]
+        for ball in balls:
+            win.attach(ball)
+
+        def update(frame):
+            for ball in balls:
+                ball.y = (ball.y + 1) % HEIGHT
+        return [win], update
+    return setup
+
+def shapes(n, antialias):
+    def setup():
+        win = teacup.OffscreenWindow((WIDTH, HEIGHT))
+        objects = []
+        for i in range(n):
+            x, y = random.randint(0, WIDTH), random.randint(0, HEIGHT)
+            style = {"background-color": _color(), "color": _color()}
+            kind = i % 3
+            if kind == 0:
+                objects.append(teacup.RoundedRect(x, y, 40, 24, 8, style, antialias=antialias))
+            elif kind == 1:
+                objects.append(teacup.Polygon(x, y, [(0, 0), (30, 0), (30, 30), (15, 10), (0, 30)], style, antialias=antialias))
+            else:
+                objects.append(teacup.Line(x, y, x + 40, y + 20, 3, style, antialias=antialias))
+        for obj in objects:
+            win.attach(obj)
+
+        def update(frame):
+            for obj in objects:
+                y = (obj.y + 1) % HEIGHT
+                if isinstance(obj, teacup.Line): # move the end too, same mesh
+                    obj.y2 += y - obj.y
+                obj.y = y
+        return [win], update
+    return setup
+
+def text_static(n):
+    def setup():
+        win = teacup.OffscreenWindow((WIDTH, HEIGHT))
+        for i in range(n):
+            win.attach(teacup.Text(10, (i * 20) % HEIGHT, f"static label number {i}", {"color": (255, 255, 255, 255)}))
+
+        def update(frame): # labels keep their layout, yet all of them are drawn again every frame
+            win._touch()
+        return [win], update
+    return setup
+
+def text_changing(n):
+    def setup():
+        win = teacup.OffscreenWindow((WIDTH, HEIGHT))
+        labels = [teacup.Text(10, (i * 20) % HEIGHT, "", {"color": (255, 255, 255, 255)}) for i in range(n)]
+        for label in labels:
+            win.attach(label)
+
+        def update(frame):
+            for i, label in enumerate(labels):
+                label.text = f"frame {frame} label {i}"
+                label.style["color"] = (frame % 256, 255, 255 - frame % 256, 255)
+        return [win], update
+    return setup
+
+def text_wrapped(n):
+    def setup():
+        win = teacup.OffscreenWindow((WIDTH, HEIGHT))
+        words = "the quick brown fox jumps over the lazy dog".split()
+        pages = [" ".join(words[(i + j) % len(words)] for j in range(60)) for i in range(8)]
+        labels = [teacup.Text(10 + (i % 4) * 190, (i // 4) * 150 % HEIGHT, pages[0],
+                              {"color": (255, 255, 255, 255), "font-size": 12, "text-align": "center"}, max_width=180)
+                  for i in range(n)]
+        for label in labels:
+            win.attach(label)
+
+        def update(frame): # a few paragraphs over and over, laid out once each
+            for i, label in enumerate(labels):
+                label.text = pages[(frame + i) % len(pages)]
+        return [win], update
+    return setup
+
+def layers(n, m, cache):
+    def setup():
+        win = teacup.OffscreenWindow((WIDTH, HEIGHT))
+        background = teacup.Group(cache=cache) # static, one copy per frame when cached
+        for _ in range(n):
+            background.attach(teacup.Rectangle(random.randint(0, WIDTH), random.randint(0, HEIGHT), 12, 12,
+                                               {"background-color": _color()}))
+        win.attach(background)
+
+        sprites = teacup.Group(z_index=1) # drawn on top of the background
+        rects = [teacup.Rectangle(random.randint(0, WIDTH), random.randint(0, HEIGHT), 20, 20,
+                                  {"background-color": _color()}) for _ in range(m)]
+        for rect in rects:
+            sprites.attach(rect)
+        win.attach(sprites)
+
+        def update(frame):
+            sprites.x = frame % 2 # the whole layer moves, redrawing everything below it
+            for rect in rects:
+                rect.y = (rect.y + 1) % HEIGHT
+        return [win], update
+    return setup
+
+def windows(m, n):
+    def setup():
+        wins = [teacup.OffscreenWindow((320, 240)) for _ in range(m)]
+        rects = []
+        for win in wins:
+            for _ in range(n):
+                rect = teacup.Rectangle(random.randint(0, 320), random.randint(0, 240), 16, 16,
+                                        {"background-color": _color()})
+                win.attach(rect)
+                rects.append(rect)
+
+        def update(frame):
+            for rect in rects:
+                rect.x = (rect.x + 1) % 320
+        return wins, update
+    return setup
+
+SCENARIOS = {
+    "rectangles-1000": rectangles(1000),
+    "rectangles-static-1000": rectangles_static(1000),
+    "ellipses-500-r4": ellipses(500, 4),
+    "ellipses-500-r16": ellipses(500, 16),
+    "ellipses-100-r64": ellipses(100, 64),
+    "shapes-300": shapes(300, False),
+    "shapes-300-antialias": shapes(300, True),
+    "text-static-50": text_static(50),
+    "text-changing-50": text_changing(50),
+    "text-wrapped-16": text_wrapped(16),
+    "windows-8x100": windows(8, 100),
+    "layers-5000+100": layers(5000, 100, False),
+    "layers-5000+100-cached": layers(5000, 100, True),
+}
+
+def run(setup, frames, warmup):
+    random.seed(0) # same scene on every run
+    wins, update = setup()
+
+    for frame in range(warmup):
+        update(frame)
+        teacup.display()
+
+    times = []
+    start = time.perf_counter()
+    for frame in range(frames):
+        before = time.perf_counter()
+        update(frame)
+        teacup.display()
+        times.append(time.perf_counter() - before)
+    total = time.perf_counter() - start
+
+    for win in wins:
+        win.destroy()
+
+    times.sort()
+    return {
+        "frames": frames,
+        "fps": frames / total,
+        "mean_ms": total / frames * 1000,
+        "p50_ms": times[len(times) // 2] * 1000,
+        "p95_ms": times[min(len(times) - 1, int(len(times) * 0.95))] * 1000,
+        "max_ms": times[-1] * 1000,
+    }
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="teacup rendering benchmarks")
+    parser.add_argument("--frames", type=int, default=200, help="timed frames per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="untimed frames per scenario")
+    parser.add_argument("--only", nargs="*", help="scenarios to run (default: all)")
+    parser.add_argument("--out", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON file of a previous run to compare against")
+    args = parser.parse_args()
+
+    teacup.init(headless=True)
+
+    results = {}
+    for name, setup in SCENARIOS.items():
+        if args.only and name not in args.only: continue
+        results[name] = run(setup, args.frames, args.warmup)
+        print(f"{name:<26} {results[name]['fps']:>10.1f} fps {results[name]['mean_ms']:>9.3f} ms/frame")
+
+    teacup.done()
+
+    report = {
+        "teacup": teacup.__version__,
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)["results"]
+
+        print("\nspeedup vs", args.compare)
+        for name, result in results.items():
+            if name in previous:
+                print(f"{name:<26} {previous[name]['mean_ms'] / result['mean_ms']:>6.2f}x")
+
+if __name__ == "__main__":
+    sys.exit(main())
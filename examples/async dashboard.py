@@ -0,0 +1,40 @@
+import asyncio
+import random
+import teacup
+
+"""
+Drives teacup from asyncio with `teacup.run`. One coroutine animates a bar every frame while another
+"receives" a reading twice a second, the way a socket or timer would, without a second thread.
+"""
+
+teacup.init() # init teacup
+
+my_win = teacup.Window("Async Dashboard", (400, 200), {"background-color": (20, 20, 30, 255)})
+
+label = teacup.Text(20, 20, "waiting for data", {"color": (255, 255, 255, 255), "font-size": 20})
+bar = teacup.Rectangle(20, 80, 0, 40, {"background-color": (80, 200, 120, 255)})
+my_win.attach(label)
+my_win.attach(bar)
+
+target = 0
+
+async def receive(): # stands in for a network client
+    global target
+    while True:
+        await asyncio.sleep(0.5)
+        target = random.randint(0, 360)
+        label.text = f"reading: {target}"
+
+async def animate():
+    while True:
+        dt = await teacup.next_frame() # woken before every frame
+        bar.width += (target - bar.width) * min(1, dt * 8) # ease towards the reading
+
+async def main():
+    tasks = [asyncio.create_task(receive()), asyncio.create_task(animate())]
+    await teacup.run(60) # returns once the window is closed
+    for task in tasks:
+        task.cancel()
+
+asyncio.run(main())
+teacup.done() # exit teacup
@@ -0,0 +1,35 @@
+import random
+import teacup
+
+"""
+A starfield of 5000 static stars cached in a `Layer` under a group of moving planets. The stars are
+drawn once into a texture and copied every frame, only the planets are redrawn.
+"""
+
+teacup.init() # init teacup
+
+screen_width, screen_height = 800, 600
+my_win = teacup.Window("Layers", (screen_width, screen_height), {"background-color": (0, 0, 20, 255)})
+
+stars = teacup.Layer() # cached, never changes
+for _ in range(5000):
+    shade = random.randint(80, 255)
+    stars.attach(teacup.Rectangle(random.randint(0, screen_width), random.randint(0, screen_height), 2, 2,
+                                  {"background-color": (shade, shade, shade, 255)}))
+my_win.attach(stars)
+
+planets = teacup.Group(0, 0, z_index=1) # children are positioned relative to the group
+for i in range(5):
+    planets.attach(teacup.Ellipse(i * 150, 0, 40, 40, {"background-color": (80 + i * 30, 120, 255 - i * 30, 255)}))
+my_win.attach(planets)
+
+# main loop
+frame = 0
+while teacup.RUNNING():
+    frame += 1
+    planets.x = frame % screen_width # moves every planet at once
+    planets.y = screen_height // 2 + (frame % 100) - 50
+
+    teacup.display(60)
+
+teacup.done() # exit teacup
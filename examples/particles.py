@@ -0,0 +1,70 @@
+import teacup
+import numpy as np
+
+"""
+Bounces 10,000 balls off of the window's borders. Shape batches store every ball as a row of numpy
+columns so the whole physics step is a handful of array operations. Requires numpy.
+"""
+
+teacup.init() # init teacup
+
+# config
+ball_radius = 3
+total_balls = 10_000
+gravity = 1
+fps = 60
+
+# create the window
+screen_width, screen_height = 500, 500
+my_win = teacup.Window(
+    "Particles",
+    (screen_width, screen_height),
+    {
+        "background-color": (30, 30, 30, 255)
+    }
+)
+
+# one object for all of the balls
+balls = teacup.EllipseBatch(
+    np.random.randint(0, screen_width - ball_radius * 2, total_balls), # x
+    np.random.randint(0, screen_height - ball_radius * 2, total_balls), # y
+    ball_radius * 2, # width, shared by every ball
+    ball_radius * 2, # height
+    color=np.column_stack([ # random rgba per ball
+        np.random.randint(0, 256, (total_balls, 3)),
+        np.full(total_balls, 255)
+    ]),
+    segments=8 # small balls don't need round edges
+)
+
+# random velocities
+xvel = np.random.randint(-5, 6, total_balls).astype(np.float32)
+yvel = np.random.randint(-5, 6, total_balls).astype(np.float32)
+
+my_win.attach(balls)
+
+# main loop
+while teacup.RUNNING():
+    x, y = balls.x, balls.y # numpy columns, modified in place
+
+    yvel += gravity
+    x += xvel
+    y += yvel
+
+    # collide w/ floor & ceiling
+    floor = y + ball_radius * 2 >= screen_height
+    y[floor] = screen_height - ball_radius * 2
+    yvel[floor] = -yvel[floor] - 1
+
+    ceiling = y < 0
+    y[ceiling] = 0
+    yvel[ceiling] = -(yvel[ceiling] + 1)
+
+    # collide w/ left & right walls
+    walls = (x < 0) | (x + ball_radius * 2 > screen_width)
+    np.clip(x, 0, screen_width - ball_radius * 2, out=x)
+    xvel[walls] *= -1
+
+    teacup.display(fps)
+
+teacup.done() # exit teacup
@@ -3,18 +3,18 @@ from colorsys import hsv_to_rgb
 
 """
 Open 2 windows, one with text that is rainbow colored and another that's background is rainbow
-colored. Teacup allows you to create & open multiple windows. 5 Fonts are packaged with Teacup,
-if you want to use your own you must add it to teacup with `teacup.font.create_custom_font(...)`.
+colored. Teacup allows you to create & open multiple windows, each refreshing at its own rate.
+5 Fonts are packaged with Teacup, if you want to use your own you must add it to teacup with
+`teacup.font.create_custom_font(...)`.
 """
 
 teacup.init() # init teacup
 
-# create windows
-win1 = teacup.Window("Rainbow Window", (500, 500))
-win2 = teacup.Window("Rainbow Text", (500, 500), {"background-color": (255, 255, 255, 255)})
+# create windows, `display` only redraws a window once its own frame is due
+win1 = teacup.Window("Rainbow Window", (500, 500), fps=60)
+win2 = teacup.Window("Rainbow Text", (500, 500), {"background-color": (255, 255, 255, 255)}, fps=20)
 
 # settings
-fps = 60
 dt = 0 # placeholder
 hue = 0
 speed = 90 # how fast the window's cycle colors
@@ -67,6 +67,6 @@ while teacup.RUNNING():
         255
     )
 
-    dt = teacup.display(fps) # returns deltatime
+    dt = teacup.display() # sleeps until the next window is due, returns deltatime
 
 teacup.done() # don't forget to close
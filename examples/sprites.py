@@ -0,0 +1,37 @@
+import sys
+import random
+import teacup
+
+"""
+Draws 2000 copies of an image, usage: `python sprites.py path/to/image.png`. Every sprite shares one
+atlas page so the whole frame is only a handful of SDL calls.
+"""
+
+if len(sys.argv) < 2:
+    print("usage: python sprites.py path/to/image.png")
+    sys.exit(1)
+
+teacup.init() # init teacup
+
+screen_width, screen_height = 800, 600
+my_win = teacup.Window("Sprites", (screen_width, screen_height), {"background-color": (30, 30, 30, 255)})
+
+sprites = []
+for _ in range(2000):
+    sprite = teacup.Image(random.randint(0, screen_width), random.randint(0, screen_height), sys.argv[1],
+                          width=32, height=32, style={"opacity": random.uniform(0.3, 1)})
+    sprite.xvel = random.uniform(-2, 2)
+    sprite.yvel = random.uniform(-2, 2)
+
+    my_win.attach(sprite)
+    sprites.append(sprite)
+
+# main loop
+while teacup.RUNNING():
+    for sprite in sprites:
+        sprite.x = (sprite.x + sprite.xvel) % screen_width
+        sprite.y = (sprite.y + sprite.yvel) % screen_height
+
+    teacup.display(60)
+
+teacup.done() # exit teacup
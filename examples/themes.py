@@ -0,0 +1,47 @@
+import teacup
+
+"""
+Stylesheet classes. 2000 tiles share two classes and switch between a light & dark theme every
+second by rewriting three rules, only the tiles a rule matches are restyled. Labels inherit their
+color & font size from the window.
+"""
+
+teacup.init() # init teacup
+
+THEMES = [
+    {
+        "window": {"background-color": (240, 240, 240, 255), "color": (20, 20, 20, 255)},
+        ".tile": {"background-color": (200, 200, 210, 255)},
+        ".tile.accent": {"background-color": (60, 120, 220, 255)},
+    },
+    {
+        "window": {"background-color": (25, 25, 30, 255), "color": (230, 230, 230, 255)},
+        ".tile": {"background-color": (60, 60, 70, 255)},
+        ".tile.accent": {"background-color": (230, 140, 40, 255)},
+    },
+]
+
+sheet = teacup.Stylesheet(THEMES[0])
+my_win = teacup.Window("Themes", (800, 600), {"font-size": 18}, stylesheet=sheet)
+
+for i in range(2000):
+    tile = teacup.Rectangle(10 + (i % 50) * 15, 60 + (i // 50) * 13, 12, 10)
+    tile.classes = "tile accent" if i % 7 == 0 else "tile"
+    my_win.attach(tile)
+
+label = teacup.Text(10, 10, "light theme") # color & size come from the window
+my_win.attach(label)
+
+frames = 0
+
+# main loop
+while teacup.RUNNING():
+    frames += 1
+    if frames % 60 == 0:
+        theme = (frames // 60) % 2
+        sheet.update(THEMES[theme]) # one update per rule
+        label.text = ("light theme", "dark theme")[theme]
+
+    teacup.display(60)
+
+teacup.done() # exit teacup
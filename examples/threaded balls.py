@@ -0,0 +1,67 @@
+import teacup
+import random
+
+"""
+Bouncing balls with the physics running on a worker thread through `teacup.simulate`. The main
+loop only draws, so rendering keeps its frame rate even when the physics step is slow.
+"""
+
+teacup.init() # init teacup
+
+# config
+ball_radius = 10
+total_balls = 200
+gravity = 1
+fps = 60
+
+# create the window
+screen_width, screen_height = 500, 500
+my_win = teacup.Window(
+    "Threaded Balls",
+    (screen_width, screen_height),
+    {
+        "background-color": (30, 30, 30, 255)
+    }
+)
+
+balls = []
+for _ in range(total_balls):
+    ball = teacup.Ellipse(
+        random.randint(0, screen_width - ball_radius * 2),
+        random.randint(0, screen_height - ball_radius * 2),
+        ball_radius * 2, # width
+        ball_radius * 2, # height
+        {"background-color": (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255), 255)}
+    )
+    ball.xvel = random.randint(-5, 5)
+    ball.yvel = random.randint(-5, 5)
+
+    my_win.attach(ball)
+    balls.append(ball)
+
+def update(dt): # runs on the simulation thread, the scene is locked meanwhile
+    for ball in balls:
+        ball.yvel += gravity
+        ball.x += ball.xvel
+        ball.y += ball.yvel
+
+        # collide w/ floor & ceiling
+        if ball.y + ball.height >= screen_height:
+            ball.y = screen_height - ball.height
+            ball.yvel = -ball.yvel + 1
+        elif ball.y < 0:
+            ball.y = 0
+            ball.yvel = -ball.yvel
+
+        # collide w/ left & right walls
+        if ball.x < 0 or ball.x + ball.width > screen_width:
+            ball.x = min(max(ball.x, 0), screen_width - ball.width)
+            ball.xvel *= -1 # bounce
+
+teacup.simulate(update, fps) # physics steps per second
+
+# main loop, only draws the latest finished step
+while teacup.RUNNING():
+    teacup.display(fps)
+
+teacup.done() # exit teacup, also stops the simulation
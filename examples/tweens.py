@@ -0,0 +1,44 @@
+import numpy as np
+import teacup
+
+"""
+Tweens with `teacup.animate`. A box slides back & forth by restarting its tween once it arrives,
+while 5000 squares of a `RectangleBatch` drift to new colors & positions, every one of them moved by
+a single array operation per frame.
+"""
+
+teacup.init() # init teacup
+
+screen_width, screen_height = 600, 400
+my_win = teacup.Window("Tweens", (screen_width, screen_height), {"background-color": (20, 20, 20, 255)})
+
+count = 5000
+squares = teacup.RectangleBatch(np.random.rand(count) * screen_width, np.random.rand(count) * screen_height, 4, 4)
+my_win.attach(squares)
+
+box = teacup.RoundedRect(20, 180, 60, 40, 10, {"background-color": (255, 200, 0, 255)})
+my_win.attach(box)
+
+def slide(tween=None): # called again every time the box arrives
+    target = 20 if box.x > screen_width / 2 else screen_width - 80
+    teacup.animate(box, 1.2, x=target, easing="ease-in-out", on_done=slide)
+
+def shuffle(tween=None):
+    colors = np.random.randint(0, 256, (count, 4))
+    colors[:, 3] = 255 # opaque
+    teacup.animate(
+        squares, 2,
+        x=np.random.rand(count) * screen_width,
+        y=np.random.rand(count) * screen_height,
+        color=colors,
+        on_done=shuffle
+    )
+
+slide()
+shuffle()
+
+# main loop, the tweens advance by themselves
+while teacup.RUNNING():
+    teacup.display(60)
+
+teacup.done() # exit teacup
@@ -4,7 +4,19 @@ Teacup Engine
 Resources used by teacup internally
 """
 
-from .core import ScreenObject, Rectangle, Ellipse, Text, Window, init, done, register_window, RUNNING, sleep, display
+from .core import ScreenObject, Rectangle, Ellipse, RoundedRect, Polygon, Line, RectangleBatch, EllipseBatch, Image, Text, Group, Layer, Window, OffscreenWindow, init, done, register_window, RUNNING, sleep, display, run, next_frame, simulate, get_clock, frame_stats, on, off
+from . import cache
+from . import clock
+from . import events
+from .events import Event
 from . import draw # disambiguate between Rectangle and RECT
 from . import font
+from .font import measure_text
+from . import image
+from . import profiler
+from . import recorder
+from . import simulation
 from . import style
+from .style import Stylesheet
+from . import tween
+from .tween import animate
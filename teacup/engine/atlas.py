@@ -0,0 +1,105 @@
+import sdl2
+from . import profiler
+
+class Page:
+    def __init__(self, renderer, width : int, height : int = None) -> None:
+        """
+        One texture of an atlas along with the surface its entries are packed into. The texture is
+        created by the first `upload` and only updated from the surface when something was added, so
+        a simulation thread can fill pages while the main thread owns every texture.
+        """
+
+        if height is None:
+            height = width
+
+        self.width = width
+        self.height = height
+        self.surface = sdl2.SDL_CreateRGBSurfaceWithFormat(0, width, height, 32, sdl2.SDL_PIXELFORMAT_RGBA32)
+        sdl2.SDL_FillRect(self.surface, None, 0) # fully transparent
+        self.renderer = renderer
+        self.texture = None
+        self.stale = True # surface has entries the texture does not
+
+    def blit(self, surface, x : int, y : int) -> None:
+        """
+        Copy the exact pixels of `surface` to (x, y) instead of blending them.
+        """
+
+        contents = surface.contents
+        sdl2.SDL_SetSurfaceBlendMode(surface, sdl2.SDL_BLENDMODE_NONE)
+        sdl2.SDL_BlitSurface(surface, None, self.surface, sdl2.SDL_Rect(x, y, contents.w, contents.h))
+        self.stale = True
+
+    def upload(self):
+        """
+        Returns the texture, brought up to date with the surface. Main thread only. `None` once the
+        page was destroyed.
+        """
+
+        if self.surface is None: return None
+
+        if self.texture is None:
+            self.texture = sdl2.SDL_CreateTexture(self.renderer, sdl2.SDL_PIXELFORMAT_RGBA32,
+                                                  sdl2.SDL_TEXTUREACCESS_STATIC, self.width, self.height)
+            sdl2.SDL_SetTextureBlendMode(self.texture, sdl2.SDL_BLENDMODE_BLEND)
+            profiler.count("textures")
+
+        if self.stale:
+            self.stale = False # first, an entry blitted meanwhile is uploaded next time
+            surface = self.surface.contents
+            sdl2.SDL_UpdateTexture(self.texture, None, surface.pixels, surface.pitch)
+        return self.texture
+
+    def destroy(self):
+        if self.texture is not None:
+            sdl2.SDL_DestroyTexture(self.texture)
+            self.texture = None
+        if self.surface is not None:
+            sdl2.SDL_FreeSurface(self.surface)
+            self.surface = None
+
+class Atlas:
+    PAGE_SIZE = 512
+    PADDING = 1
+
+    def __init__(self, renderer) -> None:
+        """
+        Square pages filled shelf by shelf, base of the glyph & image atlases.
+        """
+
+        self.renderer = renderer
+        self.pages = []
+
+        # shelf packing cursor
+        self._x = self.PAGE_SIZE
+        self._y = self.PAGE_SIZE
+        self._shelf = 0
+
+    def _reserve(self, w, h):
+        """
+        Returns (page, x, y) of a free `w` by `h` area, opening a new page when the last one is full.
+        """
+
+        pad = self.PADDING
+        size = self.PAGE_SIZE
+
+        if self._x + w + pad > size: # next shelf
+            self._x = 0
+            self._y += self._shelf + pad
+            self._shelf = 0
+
+        if self._y + h + pad > size: # next page
+            self.pages.append(Page(self.renderer, max(size, w + pad, h + pad)))
+            self._x = 0
+            self._y = 0
+            self._shelf = 0
+
+        x, y = self._x, self._y
+        self._x += w + pad
+        self._shelf = max(self._shelf, h)
+        return self.pages[-1], x, y
+
+    def destroy(self):
+        for page in self.pages:
+            page.destroy()
+        self.pages.clear()
@@ -0,0 +1,252 @@
+import ctypes
+import math
+import sdl2
+import struct
+from array import array
+
+from .atlas import Page
+
+_RECT_SIZE = ctypes.sizeof(sdl2.SDL_Rect)
+_RECT = struct.Struct("4i") # SDL_Rect
+_BLANK_RECT = bytes(_RECT_SIZE)
+_VERTEX_SIZE = ctypes.sizeof(sdl2.SDL_Vertex)
+
+_STRUCTS = (ctypes.Array, ctypes.Structure)
+
+RECTS = 0 # filled rects of one color
+GEOMETRY = 1 # triangles, optionally textured & color modded
+
+class _Batch:
+    def __init__(self):
+        """
+        Consecutive commands that can be submitted with a single SDL call. Reused across frames.
+        """
+
+        self.kind = RECTS
+        self.key = None # rgba of the rects, or color mod of the texture
+        self.texture = None
+        self.data = bytearray() # packed SDL_Rect or SDL_Vertex structs, only grows
+        self.size = 0 # bytes of `data` used this frame
+        self.count = 0
+        self.bounds = None
+
+    def reset(self, kind, key, texture):
+        self.kind = kind
+        self.key = key
+        self.texture = texture
+        self.size = 0 # keep the memory, shrinking would reallocate it next frame
+        self.count = 0
+        self.bounds = None
+
+class CommandBuffer:
+    LOOKBACK = 16 # how many batches a command may skip over to join one with the same state
+
+    def __init__(self) -> None:
+        """
+        Draw commands recorded by the children of a window during a frame. Consecutive commands with
+        the same state are merged, a command may also join an earlier batch as long as it does not
+        overlap anything drawn in between, so painter's order is kept wherever objects overlap.
+        """
+
+        self._batches = [] # pool, only the first `_used` are part of this frame
+        self._used = 0
+        self._quad = (sdl2.SDL_Vertex * 6)() # scratch space for `copy`
+
+        self.commands = 0 # commands recorded since the last flush
+        self._dx = self._dy = 0 # added to everything recorded, see `translate`
+
+    def translate(self, dx : int, dy : int) -> None:
+        """
+        Move everything recorded from now on by (dx, dy), adds up with earlier calls. Groups use it to
+        draw their children at their own position.
+        """
+
+        self._dx += dx
+        self._dy += dy
+
+    def fill_rects(self, color : tuple, rects, bounds : tuple) -> None:
+        """
+        Record a `SDL_Rect`, an array of them or a single (x, y, w, h) tuple of ints filled with
+        `color` (rgba). `bounds` is the (x, y, w, h) box containing every rect.
+        """
+
+        if color[3] == 0: return # fully transparent, nothing to draw
+        self._record(RECTS, color, None, rects, len(rects) if isinstance(rects, ctypes.Array) else 1, bounds)
+
+    def geometry(self, texture, color : tuple, vertices, bounds : tuple, count : int = None, paint=None) -> None:
+        """
+        Record an array of `SDL_Vertex` forming a triangle list. `texture` may be `None` or an atlas
+        `Page`, which is uploaded when the buffer is flushed. `color`
+        (rgba) is applied as the texture's color & alpha mod. `vertices` can be any buffer of packed
+        `SDL_Vertex` structs as long as `count` is given. `paint` (packed `SDL_Color` bytes, one per
+        vertex) replaces the colors of the recorded copy, shared vertices are never written to.
+        """
+
+        self._record(GEOMETRY, color, texture, vertices, len(vertices) if count is None else count, bounds, paint)
+
+    def copy(self, texture, dst : tuple, color : tuple = (255, 255, 255, 255)) -> None:
+        """
+        Record a copy of a whole texture onto `dst` (x, y, w, h). Copies of the same texture are
+        submitted together as one textured quad list.
+        """
+
+        x0, y0, w, h = dst
+        x1 = x0 + w
+        y1 = y0 + h
+
+        quad = self._quad
+        for i, (px, py, u, v) in enumerate(((x0, y0, 0, 0), (x1, y0, 1, 0), (x1, y1, 1, 1),
+                                            (x0, y0, 0, 0), (x1, y1, 1, 1), (x0, y1, 0, 1))):
+            vertex = quad[i]
+            vertex.position.x = px
+            vertex.position.y = py
+            vertex.color.r = vertex.color.g = vertex.color.b = vertex.color.a = 255
+            vertex.tex_coord.x = u
+            vertex.tex_coord.y = v
+
+        self.geometry(texture, color, quad, dst)
+
+    def _record(self, kind, key, texture, items, count, bounds, paint=None):
+        self.commands += 1
+
+        dx, dy = self._dx, self._dy
+        translated = dx or dy
+        if translated:
+            bounds = (bounds[0] + dx, bounds[1] + dy, bounds[2], bounds[3])
+
+        batches = self._batches
+
+        target = None
+        for i in range(self._used - 1, max(self._used - 1 - self.LOOKBACK, -1), -1):
+            batch = batches[i]
+            if batch.kind == kind and batch.texture is texture and batch.key == key:
+                target = batch
+                break
+            if _intersects(batch.bounds, bounds):
+                break # would change what is drawn on top
+
+        if target is None:
+            if self._used == len(batches):
+                batches.append(_Batch())
+            target = batches[self._used]
+            target.reset(kind, key, texture)
+            self._used += 1
+
+        start = target.size
+        if isinstance(items, tuple): # one rect, packed in place & already moved
+            end = start + _RECT_SIZE
+            target.data[start:end] = _BLANK_RECT # grows the buffer when needed
+            _RECT.pack_into(target.data, start, items[0] + dx, items[1] + dy, items[2], items[3])
+            translated = False
+        else:
+            if isinstance(items, _STRUCTS): # ctypes objects are copied without a view
+                size = ctypes.sizeof(items)
+            else: # e.g. numpy
+                items = memoryview(items).cast("B")
+                size = items.nbytes
+
+            end = start + size
+            target.data[start:end] = items # copy now, callers may reuse their arrays
+        target.size = end
+
+        if translated:
+            _move(memoryview(target.data)[start:end], kind, dx, dy)
+        if paint is not None: # SDL_Vertex is 5 words, the color is the third
+            words = memoryview(target.data)[start:end].cast("I")
+            words[2::5] = memoryview(paint).cast("I")
+            words.release()
+
+        target.count += count
+        target.bounds = _union(target.bounds, bounds)
+
+    def flush(self, renderer) -> int:
+        """
+        Submit every recorded batch in order and empty the buffer. Returns the number of SDL calls.
+        """
+
+        calls = 0
+        color = None
+
+        for i in range(self._used):
+            batch = self._batches[i]
+            count = batch.count
+
+            if batch.kind == RECTS:
+                if batch.key != color: # only change state when needed
+                    color = batch.key
+                    sdl2.SDL_SetRenderDrawColor(renderer, *color)
+                    calls += 1
+
+                rects = (sdl2.SDL_Rect * count).from_buffer(batch.data)
+                sdl2.SDL_RenderFillRects(renderer, rects, count)
+                calls += 1
+
+            else:
+                texture = batch.texture
+                if isinstance(texture, Page):
+                    texture = texture.upload()
+                    if texture is None: continue # atlas destroyed since this was recorded
+                if texture:
+                    r, g, b, a = batch.key
+                    sdl2.SDL_SetTextureColorMod(texture, r, g, b)
+                    sdl2.SDL_SetTextureAlphaMod(texture, a)
+                    calls += 2
+
+                vertices = (sdl2.SDL_Vertex * count).from_buffer(batch.data)
+                sdl2.SDL_RenderGeometry(renderer, texture, vertices, count, None, 0)
+                calls += 1
+
+        self.clear()
+        return calls
+
+    def clear(self) -> None:
+        """
+        Drop everything recorded without submitting it. The batches keep their memory.
+        """
+
+        self._used = 0
+        self.commands = 0
+
+def _union(a, b):
+    """
+    Smallest rect (x, y, w, h) containing both `a` and `b`, either may be `None`.
+    """
+
+    if a is None: return b
+    if b is None: return a
+
+    x = min(a[0], b[0])
+    y = min(a[1], b[1])
+    return (x, y, max(a[0] + a[2], b[0] + b[2]) - x, max(a[1] + a[3], b[1] + b[3]) - y)
+
+def _outward(rect):
+    """
+    Smallest rect of whole pixels containing `rect`, e.g. the damage of a group at a fractional
+    position. `None` stays `None`.
+    """
+
+    if rect is None: return None
+    x, y, w, h = rect
+    x0 = math.floor(x)
+    y0 = math.floor(y)
+    return (x0, y0, math.ceil(x + w) - x0, math.ceil(y + h) - y0)
+
+def _intersects(a, b) -> bool:
+    return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+
+def _move(data, kind, dx, dy):
+    """
+    Add (dx, dy) to the positions of the packed rects or vertices in the memoryview `data`.
+    """
+
+    if kind == RECTS: # SDL_Rect is 4 ints
+        words = data.cast("i")
+        words[0::4] = array("i", map(int(dx).__add__, words[0::4]))
+        words[1::4] = array("i", map(int(dy).__add__, words[1::4]))
+    else: # SDL_Vertex is 5 words, the position is the first two floats
+        words = data.cast("f")
+        words[0::5] = array("f", map(float(dx).__add__, words[0::5]))
+        words[1::5] = array("f", map(float(dy).__add__, words[1::5]))
+
+    words.release()
+    data.release() # the batch may grow again
@@ -0,0 +1,137 @@
+import sdl2
+from collections import OrderedDict
+
+from . import style
+
+class TextureCache:
+    def __init__(self, budget : int = 64 * 1024 * 1024) -> None:
+        """
+        Least recently used cache of rasterized shapes. Every entry is an `SDL_Texture` owned by one
+        window's renderer, the total size of all entries is kept under `budget` bytes. Textures
+        handed out since their window last flushed are pinned: evicting one only destroys it once
+        that window called `flushed`, the recorded commands still draw it.
+        """
+
+        self.budget = budget
+        self.used = 0
+        self._entries = OrderedDict() # key -> (texture, nbytes, wid)
+        self._pinned = {} # key -> wid, handed out since that window's last flush
+        self._retired = [] # (texture, wid) evicted while pinned, destroyed by `flushed`
+
+    def get(self, key):
+        """
+        Returns the cached texture for `key` or `None`. Marks the entry as recently used.
+        """
+
+        entry = self._entries.get(key)
+        if entry is None: return None
+
+        self._entries.move_to_end(key)
+        self._pinned[key] = entry[2]
+        return entry[0]
+
+    def fits(self, nbytes : int) -> bool:
+        """
+        `False` for textures larger than the whole budget, those are drawn without the cache.
+        """
+
+        return nbytes <= self.budget
+
+    def put(self, key, texture, nbytes : int, wid : int) -> None:
+        """
+        Store a texture created by the renderer of window `wid`, pinned until that window flushes.
+        Evicts the least recently used entries until the cache fits in its budget again.
+        """
+
+        self.discard(key)
+        self._entries[key] = (texture, nbytes, wid)
+        self._pinned[key] = wid
+        self.used += nbytes
+        self._trim()
+
+    def flushed(self, wid : int) -> None:
+        """
+        Called once window `wid` submitted its commands: unpins its textures and destroys the ones
+        evicted meanwhile.
+        """
+
+        for key in [k for k, owner in self._pinned.items() if owner == wid]:
+            del self._pinned[key]
+
+        if self._retired:
+            kept = []
+            for texture, owner in self._retired:
+                if owner == wid:
+                    sdl2.SDL_DestroyTexture(texture)
+                else:
+                    kept.append((texture, owner))
+            self._retired = kept
+
+    def discard(self, key) -> None:
+        """
+        Remove & destroy a single entry if it exists.
+        """
+
+        entry = self._entries.pop(key, None)
+        if entry is None: return
+
+        self.used -= entry[1]
+        if self._pinned.pop(key, None) is not None: # still drawn by unflushed commands
+            self._retired.append((entry[0], entry[2]))
+        else:
+            sdl2.SDL_DestroyTexture(entry[0])
+
+    def evict_window(self, wid : int) -> None:
+        """
+        Destroy every texture that belongs to window `wid`. Must run before its renderer is destroyed.
+        """
+
+        for key in [k for k, entry in self._entries.items() if entry[2] == wid]:
+            self.discard(key)
+        self.flushed(wid) # nothing of it is drawn anymore
+
+    def clear(self) -> None:
+        """
+        Destroy every cached texture.
+        """
+
+        for key in list(self._entries):
+            self.discard(key)
+        for texture, _ in self._retired:
+            sdl2.SDL_DestroyTexture(texture)
+        self._retired = []
+        self._pinned.clear()
+
+    def _trim(self):
+        while self.used > self.budget and self._entries:
+            self.discard(next(iter(self._entries))) # oldest entry first
+
+    def __len__(self):
+        return len(self._entries)
+
+_cache = TextureCache() # shared by all windows, keys include the window id
+
+def get_cache() -> TextureCache:
+    """
+    Returns the texture cache shared by all windows.
+    """
+
+    return _cache
+
+def set_budget(nbytes : int) -> None:
+    """
+    Set the maximum amount of texture memory (in bytes) that cached shapes may use.
+    """
+
+    _cache.budget = nbytes
+    _cache._trim()
+
+def freeze_style(styl) -> tuple:
+    """
+    Returns a hashable snapshot of a style, used as part of a cache key. Interned style records are
+    already hashable and unique per content.
+    """
+
+    if isinstance(styl, style.StyleRecord):
+        return styl
+    return tuple(sorted(styl.items()))
@@ -0,0 +1,135 @@
+import time
+from collections import deque
+
+class Clock:
+    SPIN = 0.002 # last seconds before a deadline are busy waited, sleeping is not that precise
+
+    def __init__(self, window : int = 240) -> None:
+        """
+        Paces frames against absolute deadlines so that small errors never add up, and keeps
+        the durations of the last `window` frames for statistics.
+        """
+
+        self.frame_times = deque(maxlen=window)
+        self.dropped = 0 # frames skipped because a frame took longer than its budget
+        self.frames = 0
+
+        self._deadline = None
+        self._last = None
+        self._period = 0
+
+    def remaining(self, fps : float) -> float:
+        """
+        Seconds left until the next frame is due. Starts a new schedule if `fps` changed.
+        """
+
+        now = time.perf_counter()
+        period = 1 / fps if fps > 0 else 0
+
+        if period != self._period or self._deadline is None:
+            self._period = period
+            self._deadline = now + period
+
+        return self._deadline - now
+
+    def wait(self, fps : float) -> None:
+        """
+        Block until the next frame is due, sleeping first and spinning for the final stretch.
+        """
+
+        remaining = self.remaining(fps)
+        if remaining <= 0: return
+
+        if remaining > self.SPIN:
+            time.sleep(remaining - self.SPIN)
+
+        deadline = self._deadline
+        while time.perf_counter() < deadline: pass
+
+    def tick(self, fps : float = 0) -> float:
+        """
+        Wait for the frame deadline (if `fps > 0`) and start the next frame. Returns the actual
+        time in seconds since the previous tick.
+        """
+
+        self.wait(fps)
+        return self.advance()
+
+    def advance(self) -> float:
+        """
+        Start the next frame without waiting. Returns the time in seconds since the previous frame.
+        """
+
+        now = time.perf_counter()
+        period = self._period
+
+        if period > 0:
+            self._deadline += period
+            late = now - self._deadline
+            if late > 0: # missed at least one whole frame, don't try to catch up
+                self.dropped += int(late / period) + 1
+                self._deadline = now + period
+
+        if self._last is None: # first frame, nothing to measure yet
+            self._last = now
+            return period
+
+        dt = now - self._last
+        self._last = now
+        self.frames += 1
+        self.frame_times.append(dt)
+        return dt
+
+    def stats(self) -> dict:
+        """
+        Frame time statistics (in seconds) over the recent window.
+        """
+
+        times = sorted(self.frame_times)
+        if not times:
+            return {"frames": self.frames, "dropped": self.dropped, "fps": 0.0,
+                    "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+
+        mean = sum(times) / len(times)
+        return {
+            "frames": self.frames,
+            "dropped": self.dropped,
+            "fps": 1 / mean if mean > 0 else 0.0,
+            "mean": mean,
+            "p50": _percentile(times, 0.50),
+            "p95": _percentile(times, 0.95),
+            "p99": _percentile(times, 0.99),
+            "max": times[-1],
+        }
+
+class Schedule:
+    def __init__(self, rate : float = 0) -> None:
+        """
+        Deadlines of something drawn `rate` times a second (every time when `rate <= 0`), e.g. a
+        window with its own refresh rate. `dt` is the time between its last two frames.
+        """
+
+        self.rate = rate
+        self.deadline = None # when the next frame is due, `None` until the first one
+        self.dt = 0.0
+        self._last = None
+
+    def due(self, now : float) -> bool:
+        return self.rate <= 0 or self.deadline is None or now >= self.deadline
+
+    def advance(self, now : float) -> None:
+        """
+        Start a frame at `now` and schedule the next one.
+        """
+
+        period = 1 / self.rate if self.rate > 0 else 0
+        if self.deadline is None or now - self.deadline > period: # late by a whole frame, don't catch up
+            self.deadline = now + period
+        else:
+            self.deadline += period
+
+        self.dt = now - self._last if self._last is not None else period
+        self._last = now
+
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
@@ -1,22 +1,58 @@
+import ctypes
+import os
 import sdl2
-import sdl2.ext
-import sdl2.sdlttf as ttf
+import threading
 import time
 
 # module local imports
+from . import batch
+from . import cache
+from . import clock
 from . import draw
+from . import events
 from . import font
+from . import image
+from . import profiler
+from . import recorder
+from . import simulation
+from . import spatial
 from . import style
+from . import tween
 
-_windows = [] # list of all window objects created
+_windows = {} # every open window by its wid
 _event = None
-
-def init() -> None: 
+_global = events.EventTarget() # handlers registered with `teacup.on`
+_clock = clock.Clock() # paces `display`
+_vsync = False
+_headless = False
+_simulation = None # runs user updates on a worker thread, see `simulate`
+_deferred = [] # events polled while a simulation step held the scene, handled first by the next frame
+_deferred_since = None # when the oldest of `_deferred` was polled
+_waiters = [] # futures of `next_frame`, resolved by `run`
+_paced = clock.Schedule() # frames of windows following the `fps` of `display`
+_NO_CLASSES = frozenset() # shared, empty frozensets are not singletons
+_NO_LAYOUT = font.TextLayout(0) # shown by every text until it is baked
+
+IDLE_WAIT = 0.016 # seconds an uncapped `display` waits for input when nothing changed
+INPUT_WAIT = 0.1 # seconds input waits for a running simulation step before `display` waits for it
+
+def init(vsync : bool = False, headless : bool = False) -> None: 
     """
-    Initializes Teacup and SDL2
+    Initializes Teacup and SDL2. With `vsync` windows present in sync with the monitor's refresh
+    rate, `display` then needs no `fps` cap. With `headless` SDL uses its dummy video driver and
+    software rendering, no display is needed and nothing is shown on screen.
     """
-    sdl2.ext.init()
-    font.init_fonts()
+
+    global _vsync, _headless
+    _vsync = vsync and not headless # nothing to sync to
+    _headless = headless
+
+    if headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy" # read by SDL_Init
+        sdl2.SDL_SetHint(sdl2.SDL_HINT_RENDER_DRIVER, b"software")
+
+    if sdl2.SDL_Init(sdl2.SDL_INIT_VIDEO | sdl2.SDL_INIT_EVENTS) != 0:
+        raise RuntimeError(f"could not initialize SDL2: {sdl2.SDL_GetError().decode()}")
 
     global _event # init after sdl2 inits
     _event = sdl2.SDL_Event()
@@ -25,18 +61,19 @@ def done() -> None:
     """
     Quits Teacup and SDL2
     """ 
+    if _simulation is not None:
+        _simulation.stop()
+    cache.get_cache().clear() # textures must go before their renderers
+    image.close_images()
     font.close_fonts()
-    sdl2.ext.quit()
+    sdl2.SDL_Quit()
 
 def _window_by_wid(wid):
     """
     Retrieve a window by it's unique wid.
     """
 
-    for w in _windows:
-        if w.wid == wid:
-            return w
-    return None
+    return _windows.get(wid)
 
 def register_window(window) -> None:
     """
@@ -44,8 +81,23 @@ def register_window(window) -> None:
     once.
     """
 
-    if _window_by_wid(window.wid) is None:
-        _windows.append(window)
+    if window.wid not in _windows:
+        _windows[window.wid] = window
+
+def on(name : str, handler=None):
+    """
+    Call `handler(event)` for every `name` event no window or object handled, e.g. "keydown" or
+    "quit". Can be used as a decorator.
+    """
+
+    return _global.on(name, handler)
+
+def off(name : str, handler=None) -> None:
+    """
+    Remove a handler added with `teacup.on`.
+    """
+
+    _global.off(name, handler)
 
 def RUNNING() -> bool:
     """
@@ -64,75 +116,521 @@ def sleep(n) -> None:
 def display(fps : int = 0) -> float:
     """
     Shortcuts sdl2's event system. Additionally renders any registered windows. Returns `deltatime`
-    in seconds. Caps ALL windows to the given `fps` parameter (uncaps if `fps <= 0`).
+    in seconds, the real time since the previous call. Caps windows without an `fps` of their own
+    to the given `fps` parameter (uncaps if `fps <= 0`). Uncapped calls that had nothing to redraw
+    wait for input for up to `IDLE_WAIT` seconds, so a static scene does not spin the cpu.
+
+    Once a window has its own `fps`, only the windows that are due are drawn and the call sleeps
+    until the next one is, or until input arrives. Uncapped windows (`fps` 0) that had nothing to
+    redraw do not keep it from sleeping. `window.dt` is the time between the last two
+    frames of each window.
+    """
+
+    windows = tuple(_windows.values())
+    if all(window._fps is None for window in windows):
+        drawn = _frame(_due(windows, True))
+        if fps <= 0 and not drawn: # nothing changed, sleep until input or the next check
+            _wait(time.perf_counter() + IDLE_WAIT, spin=False)
+        dt = _clock.tick(fps) # wait for the frame deadline
+    else:
+        if _paced.rate != fps: # new pace, starts right away
+            _paced.rate = fps
+            _paced.deadline = None
+
+        now = time.perf_counter()
+        paced = _paced.due(now)
+        if paced:
+            _paced.advance(now)
+        drawn = _frame(_due(windows, paced, now))
+
+        # uncapped windows are drawn on every call, only wait while none of them is changing
+        uncapped = [window for window in windows if window._fps == 0 or (window._fps is None and fps <= 0)]
+        if not any(window in drawn for window in uncapped):
+            deadlines = [window._schedule.deadline for window in windows if window._fps]
+            if fps > 0:
+                deadlines.append(_paced.deadline)
+
+            idle = time.perf_counter() + IDLE_WAIT if uncapped else None
+            if deadlines and (idle is None or min(deadlines) <= idle):
+                _wait(min(deadlines))
+            elif idle is not None: # check the uncapped windows again after waiting for input
+                _wait(idle, spin=False)
+
+        _clock.remaining(0) # only measures the time between calls
+        dt = _clock.advance()
+
+    if profiler.enabled:
+        profiler.mark("wait")
+        profiler.end_frame()
+
+    return dt
+
+async def run(fps : float = 60) -> None:
+    """
+    asyncio version of the `display` loop, returns once every window is closed. Waits for frame
+    deadlines with `asyncio.sleep` so other coroutines (sockets, timers, ...) keep running, and
+    wakes everything waiting in `next_frame` before each frame is drawn.
+
+        async def main():
+            asyncio.create_task(animate())
+            await teacup.run(60)
+    """
+
+    import asyncio
+
+    try:
+        _frame(_due(tuple(_windows.values()), True))
+        while RUNNING():
+            remaining = _clock.remaining(fps)
+            await asyncio.sleep(remaining if remaining > 0 else 0) # always yield, even when late
+            dt = _clock.advance()
+
+            if profiler.enabled:
+                profiler.mark("wait")
+                profiler.end_frame()
+
+            waiters = _waiters[:]
+            del _waiters[:]
+            for future in waiters:
+                if not future.done():
+                    future.set_result(dt)
+            await asyncio.sleep(0) # let them update the scene before it is drawn
+
+            if not RUNNING(): break
+            _frame(_due(tuple(_windows.values()), True))
+    finally:
+        for future in _waiters: # nothing will draw anymore
+            future.cancel()
+        del _waiters[:]
+
+async def next_frame() -> float:
+    """
+    Wait for the next frame of `run`, returns `deltatime` in seconds. Changes made right after
+    are drawn in that frame. Raises `asyncio.CancelledError` once `run` stops.
+    """
+
+    import asyncio
+
+    future = asyncio.get_running_loop().create_future()
+    _waiters.append(future)
+    return await future
+
+def _due(windows, paced : bool, now : float = None) -> list:
+    """
+    The `windows` to draw this frame: the ones with their own `fps` when their frame is due, the
+    others when `paced` (their shared deadline passed). Starts the next frame of each of them.
+    """
+
+    now = time.perf_counter() if now is None else now
+    due = []
+    for window in windows:
+        if window._fps is None and not paced: continue
+        if window._fps and not window._schedule.due(now): continue
+
+        window._schedule.advance(now)
+        due.append(window)
+    return due
+
+def _wait(deadline : float, spin : bool = True) -> None:
+    """
+    Sleep until `deadline` (`time.perf_counter` seconds) or until an SDL event arrives, whichever
+    comes first. With `spin` the last stretch is busy waited like `Clock.wait`.
+    """
+
+    margin = clock.Clock.SPIN if spin else 0
+    remaining = deadline - time.perf_counter()
+    if remaining > margin:
+        if sdl2.SDL_WaitEventTimeout(None, int((remaining - margin) * 1000)):
+            return # input is handled right away, on change only windows redraw for it
+
+    while spin and time.perf_counter() < deadline: pass
+
+def _frame(windows) -> list:
+    """
+    Poll events, then draw each of `windows` that changed. Returns the windows that were drawn.
+    """
+
+    sim = _simulation
+    if sim is not None:
+        sim.check() # surface errors of the update thread here
+        if sim.running:
+            return _frame_simulated(windows, sim)
+
+    if profiler.enabled:
+        profiler.mark("update") # user code since the last frame
+
+    _poll_events() # handlers may change the scene
+
+    if profiler.enabled:
+        profiler.mark("events")
+
+    tween.step() # animations land in this frame
+
+    if profiler.enabled:
+        profiler.mark("animate")
+
+    recorded = []
+    for window in windows:
+        if window._published is not None: # left by a simulation that stopped
+            window._unpublish()
+        if window._open and window._record():
+            recorded.append(window)
+
+    for window in recorded: # draw the windows
+        if window._open:
+            window._submit()
+    return recorded
+
+def _frame_simulated(windows, sim) -> list:
+    """
+    `_frame` while a simulation runs. Its thread publishes a frame of every window at the end of
+    each step, `display` presents the last published ones without waiting for the step in progress.
+    Only when the lock is free are events handled, tweens advanced and the windows recorded here.
+    Events are kept for later meanwhile, once they waited `INPUT_WAIT` seconds the step is waited for.
+    """
+
+    if profiler.enabled:
+        profiler.mark("update") # user code since the last frame
+
+    locked = sim.lock.acquire(blocking=False)
+    if not locked:
+        _poll_events(handle=False)
+        if _deferred_since is not None and time.perf_counter() - _deferred_since > INPUT_WAIT:
+            sim.lock.acquire()
+            locked = True
+
+    if locked:
+        try:
+            _poll_events() # handlers may change the scene
+
+            if profiler.enabled:
+                profiler.mark("events")
+
+            tween.step() # animations land in this frame
+
+            if profiler.enabled:
+                profiler.mark("animate")
+
+            # recording may replace textures the published frames still use, record them again
+            for window in _windows.values():
+                window._unpublish()
+            font.evict_unused() # atlases the simulation thread let go of
+
+            for window in windows:
+                if window._open:
+                    window._publish()
+        finally:
+            sim.lock.release()
+
+    return [window for window in windows if window._open and window._present_published()]
+
+def _poll_events(handle : bool = True) -> None:
+    """
+    Handle every pending SDL event. Mouse motion is coalesced per window so that at most one
+    "mousemotion" event per window is dispatched per frame. Without `handle` the events are only
+    taken out of SDL's queue and handled first by the next call.
     """
 
-    before = time.perf_counter()
+    global _deferred_since
+
+    if not handle:
+        while sdl2.SDL_PollEvent(_event):
+            _deferred.append(events.copy_event(_event))
+        if _deferred and _deferred_since is None:
+            _deferred_since = time.perf_counter()
+        return
+
+    queued = None
+    if _deferred:
+        queued = _deferred[:]
+        del _deferred[:]
+        _deferred_since = None
+
+    motion = {} # wid -> pending mouse motion
+
+    for event in _pending_events(queued):
+        kind = event.type
+
+        if kind == sdl2.SDL_MOUSEMOTION:
+            wid = event.motion.windowID
+            pending = motion.get(wid)
+            if pending is None:
+                motion[wid] = events.copy_event(event)
+            else:
+                events.coalesce_motion(pending, event)
+            continue
+
+        wid = events.window_id(event)
+        if wid in motion: # keep motion in order with clicks & keys of the same window
+            _dispatch(motion.pop(wid))
 
+        if kind == sdl2.SDL_WINDOWEVENT:
+            _window_event(event)
+
+        elif kind in (sdl2.SDL_RENDER_TARGETS_RESET, sdl2.SDL_RENDER_DEVICE_RESET):
+            for window in _windows.values(): # target textures lost their contents
+                window._touch()
+
+        elif kind == sdl2.SDL_QUIT: # e.g. the last window closed, treat as shutdown
+            if not _global._emit(events.Event("quit")):
+                for window in tuple(_windows.values()):
+                    window.destroy()
+
+        else:
+            _dispatch(event)
+
+    for pending in motion.values():
+        _dispatch(pending)
+
+def _pending_events(queued):
+    """
+    Yields the `queued` events (if any), then the ones waiting in SDL's queue.
+    """
+
+    if queued:
+        yield from queued
     while sdl2.SDL_PollEvent(_event):
-        if _event.type == sdl2.SDL_WINDOWEVENT:
-            if _event.window.event == sdl2.SDL_WINDOWEVENT_CLOSE:
-                wid = _event.window.windowID # get the window id
-                _window_by_wid(wid).destroy() # close the window
+        yield _event
+
+def _window_event(event) -> None:
+    window = _windows.get(event.window.windowID)
+    if window is None: return
+
+    kind = event.window.event
+    if kind == sdl2.SDL_WINDOWEVENT_SIZE_CHANGED:
+        window._create_backbuffer() # new size, redraw everything
+    elif kind == sdl2.SDL_WINDOWEVENT_EXPOSED:
+        window._touch() # the os lost what was on screen
+
+    handled = _dispatch(event)
+
+    if kind == sdl2.SDL_WINDOWEVENT_CLOSE and not handled:
+        window.destroy() # close the window
+
+def _dispatch(sdl_event) -> bool:
+    """
+    Route an SDL event to the objects under the mouse (for mouse events), then its window, then the
+    global handlers. Returns `True` if a handler handled it.
+    """
+
+    window = _windows.get(events.window_id(sdl_event))
+    objects = window is not None and window._listeners
+    if not objects and not (window is not None and window._handlers) and not _global._handlers:
+        return False # nobody is listening, don't bother translating
 
-        elif _event.type == sdl2.SDL_QUIT: # called in sdl2.ext.quit() treat as shutdown
-            for window in _windows:
-                window._open = False
+    event = events.translate(events.copy_event(sdl_event), window)
+    if event is None: return False
 
-    for window in _windows: # draw the windows
+    if objects and event.type in events.POINTER:
+        for obj in window.query_point(event.x, event.y): # topmost first
+            if obj._handlers and obj._emit(event):
+                return True
+
+    if window is not None and window._emit(event):
+        return True
+
+    return _global._emit(event)
+
+def simulate(update, rate : float = 60) -> simulation.Simulation:
+    """
+    Run `update(dt)` on a worker thread `rate` times a second instead of between `display` calls,
+    so slow updates no longer stall rendering. Every finished step records a frame of each window,
+    `display` keeps polling events and pacing on the main thread and presents the latest of those
+    frames without waiting for the step in progress. Replaces a running simulation.
+
+    `update` must not create or destroy windows. Code outside of it (besides event handlers) that
+    changes the scene should hold `simulation.lock`.
+    """
+
+    global _simulation
+    if _simulation is not None:
+        _simulation.stop()
+
+    _simulation = simulation.Simulation(update, rate, _publish_windows)
+    _simulation.start()
+    return _simulation
+
+def _publish_windows() -> None:
+    """
+    Record a frame of every open window, runs on the simulation thread after each step.
+    """
+
+    for window in tuple(_windows.values()):
         if window._open:
-            window._draw()
-    
-    
-    dif = time.perf_counter() - before
+            window._publish()
+
+def get_clock() -> clock.Clock:
+    """
+    Returns the clock pacing `display`.
+    """
 
-    if fps <= 0: return dif # uncapped
+    return _clock
 
-    dtc = 1 / fps - dif # diff between expected dt and actual dt
-    if dtc > 0: 
-        sleep(int(dtc * 1000)) # wait for the dt to catch up (convert to ms)
-        return 1 / fps
-    
-    return 1 / fps - dtc # dtc < 0 so return a higher dt b/c the renderer is "behind"
+def frame_stats() -> dict:
+    """
+    Frame time statistics of the recent frames: `fps`, `mean`, `p50`, `p95`, `p99` & `max` frame
+    time in seconds, along with the number of `frames` and `dropped` frames.
+    """
 
-class ScreenObject:
-    def __init__(self, name : str, styl : dict) -> None:
+    return _clock.stats()
+
+class ScreenObject(events.Emitter, style.Styled):
+    # user attributes (e.g. `ball.xvel`) still work through __dict__, it is only created when used
+    __slots__ = ("name", "cache", "parent", "geometry", "_drawn", "_style", "_style_view", "_inline",
+                 "_classes", "_inheritable", "_handlers", "_x", "_y", "_z", "_width", "_height",
+                 "_version", "_baked", "__dict__", "__weakref__")
+
+    def __init__(self, name : str, styl : dict, cache : bool = False) -> None:
         """
         Teacup internal class used for the parent of anything that eventually draws on screen. Can
         be used to create custom screen objects.
 
         - `name` (str): internal name of the object used for debugging
-        - `styl` (dict): CSS styling in dict format.
+        - `styl` (dict): CSS styling in dict format, wins over stylesheet rules, see `classes`.
+        - `cache` (bool): rasterize the object once into a texture and blit it while its size and
+        style stay the same.
         """
 
         self.name = name
-        self._style = style.get_style_template()
-        if styl:
-            for k in styl:
-                self._style[k] = styl[k]
-
+        self.cache = cache
         self.parent = None # default as None
+        self.geometry = None
+        self._drawn = None # bounding box of the last frame this object was drawn in
+        self._inline = style.intern(styl) if styl else None # own style
+        self._classes = _NO_CLASSES
+        self._inheritable = None # style keys passed on to children
+        self._style = style.compute((), None, self._inline)[0] # shared with every object styled the same
+        self._style_view = None
+        self._handlers = None
+
+        self._x = self._y = self._width = self._height = 0
+        self._z = 0 # z_index
+        self._version = 0 # bumped on every change
+        self._baked = -1 # version the geometry was last baked at
+
+    def _set_style(self, record) -> None:
+        if record is not self._style:
+            self._style = record
+            self._touch()
+
+    # resolved with the stylesheet of the window once attached
+    def _stylesheet(self):
+        window = self._window()
+        return window.stylesheet if window is not None else None
+
+    def _style_parent(self):
+        return self.parent
+
+    def _style_type(self):
+        return self.name
+
+    def _style_children(self):
+        return None
+
+    # geometry is tracked so windows only redraw what changed
+    @property
+    def x(self):
+        return self._x
+
+    @x.setter
+    def x(self, value):
+        if self._x != value:
+            self._x = value
+            self._touch()
+
+    @property
+    def y(self):
+        return self._y
+
+    @y.setter
+    def y(self, value):
+        if self._y != value:
+            self._y = value
+            self._touch()
 
     @property
-    def style(self):
+    def width(self):
+        return self._width
+
+    @width.setter
+    def width(self, value):
+        if self._width != value:
+            self._width = value
+            self._touch()
+
+    @property
+    def z_index(self):
         """
-        The style of this object.
+        Siblings with a higher z_index are drawn on top, equal ones in the order they were attached.
         """
-        return self._style
+        return self._z
 
-    @style.setter
-    def style(self, value : dict):
-        self._style = style.get_style_template()
-        for k in value:
-            self._style[k] = value[k]
+    @z_index.setter
+    def z_index(self, value):
+        if self._z != value:
+            self._z = value
+            if self.parent is not None:
+                self.parent._reorder(self)
+            self._touch()
 
-        self._bake()
-        
-    def _render(self, pipeline : list) -> bool:
+    @property
+    def height(self):
+        return self._height
+
+    @height.setter
+    def height(self, value):
+        if self._height != value:
+            self._height = value
+            self._touch()
+
+    def _touch(self) -> None:
+        """
+        Mark this object as changed. Custom screen objects should call this whenever something
+        that affects how they look is modified.
+        """
+
+        self._version += 1
+        if self.parent is not None:
+            self.parent._mark_dirty(self)
+
+    def _bounds(self):
+        """
+        Returns the on screen bounding box (x, y, w, h) of the object, or `None` if unknown. Objects
+        with unknown bounds force a full window redraw when they change.
+        """
+        return None
+
+    def _damage(self, old, new):
+        """
+        Returns the region (x, y, w, h) to redraw after the object moved from `old` to `new` bounds.
+        """
+        return batch._union(old, new)
+
+    def _window(self):
+        """
+        Returns the window this object is drawn in, through any groups. `None` if not attached.
+        """
+
+        parent = self.parent
+        while parent is not None and not isinstance(parent, Window):
+            parent = parent.parent
+        return parent
+
+    def _listening(self):
+        if self.parent is not None: # let the window route mouse events here
+            self.parent._add_listener(self)
+
+    def _render(self, pipeline : list = None) -> bool:
         if self.parent is None: return False # did not render
 
-        for pipe in pipeline: # render each pipe seperately
-            self.parent._render_pipe(pipe)
+        # blit from the texture cache or render each pipe seperately
+        render = self.parent._render_cached if self.cache else self.parent._render_pipe
+        if pipeline is None: # the object is its own pipe, see `_SlotPipe`
+            render(self)
+            return True
+
+        for pipe in pipeline:
+            render(pipe)
         
         return True # sucessfully rendered
 
@@ -141,16 +639,41 @@ class ScreenObject:
         Called when `my_win.attach(...)`, adds the window as a parent to the screen object.
         """
         self.parent = parent
+        self._touch()
+        self._restyle(cascade=True) # rules & inherited keys of the new parent
 
     def _bake(self): pass
 
-class Rectangle(ScreenObject):
-    def __init__(self, x, y, width, height, style = None):
+class _SlotPipe:
+    """
+    A built in screen object drawn as a single pipe: the object itself, read by its shape as
+    `pipe[key]` from the attribute `_pipe` names for the key. Baking updates the slots in place,
+    no dict is kept per object.
+    """
+
+    __slots__ = ()
+    _pipe = {"style": "_style", "shape": "_shape", "geometry": "geometry"} # pipe key -> attribute
+
+    def __getitem__(self, key):
+        return getattr(self, self._pipe[key])
+
+    def get(self, key, default=None):
+        name = self._pipe.get(key)
+        return default if name is None else getattr(self, name)
+
+    def keys(self):
+        return self._pipe.keys()
+
+class Rectangle(_SlotPipe, ScreenObject):
+    __slots__ = ()
+    _shape = draw.RECT() # shared by every rectangle
+
+    def __init__(self, x, y, width, height, style = None, cache = False):
         """
         Draw rectangles on screen. x, y is the upper left corner of the rectangle.
         """
 
-        super().__init__("rectangle", style) # name matches with draw.RECT
+        super().__init__("rectangle", style, cache) # name matches with draw.RECT
 
         self.x = x
         self.y = y
@@ -160,29 +683,68 @@ class Rectangle(ScreenObject):
         self._bake()
     
     def _bake(self):
+        if self._baked == self._version: return # unchanged
+
         self.geometry = (
-            int(self.x),
-            int(self.y),
-            int(self.width),
-            int(self.height)
+            int(self._x),
+            int(self._y),
+            int(self._width),
+            int(self._height)
         )
+        self._baked = self._version
+
+    def _bounds(self):
+        return self.geometry
     
     def _render(self):
         self._bake()
-        pipeline = [{ # custom pipeline
-            "style": self._style,
-            "shape": draw.RECT(), # pull from teacup.draw.RECT
-            "geometry": self.geometry # xywh
-        }]
-        return super()._render(pipeline) # use ScreenObject's method for rendering
+        return super()._render() # use ScreenObject's method for rendering
     
-class Ellipse(ScreenObject):
-    def __init__(self, x, y, width, height, style = None):
+class _MeshObject(_SlotPipe, ScreenObject):
+    __slots__ = ("antialias", "_baked_mesh", "_origin")
+    _shape = draw.MESH() # shared by every tessellated shape
+    _color = "background-color" # style key the shape is filled with
+    _pipe = dict(_SlotPipe._pipe, color="_color", mesh="_baked_mesh", origin="_origin")
+
+    def __init__(self, name, style, cache=False, antialias=False):
+        """
+        Base of the shapes drawn as triangle lists through `SDL_RenderGeometry`. Subclasses return
+        their (cached) `draw.Mesh` from `_mesh`, the object only keeps where to draw it.
         """
-        Draw circles & ovals. x, y is the upper left corner of the ellipse.
+
+        super().__init__(name, style, cache)
+        self.antialias = antialias # fade the edges out over one pixel, set before attaching
+        self._baked_mesh = None
+        self._origin = None # (x, y) the mesh is drawn at
+
+    def _mesh(self) -> draw.Mesh:
+        return draw.Mesh([])
+
+    def _bake(self):
+        if self._baked == self._version: return # unchanged
+
+        mesh = self._baked_mesh = self._mesh()
+        self._origin = (self._x, self._y)
+        self.geometry = draw.mesh_geometry(mesh, self._x, self._y) # pixel bounding box
+        self._baked = self._version
+
+    def _bounds(self):
+        return self.geometry
+
+    def _render(self):
+        self._bake()
+        return super()._render()
+
+class Ellipse(_MeshObject):
+    __slots__ = ()
+
+    def __init__(self, x, y, width, height, style = None, cache = False, antialias = False):
+        """
+        Draw circles & ovals. x, y is the upper left corner of the ellipse. With `antialias` the
+        edge is smoothed.
         """
 
-        super().__init__("ellipse", style)
+        super().__init__("ellipse", style, cache, antialias)
 
         self.x = x
         self.y = y
@@ -191,168 +753,1542 @@ class Ellipse(ScreenObject):
 
         self._bake()
 
-    def _bake(self):
-        self.geometry = (
-            int(self.x + self.width / 2),
-            int(self.y + self.height / 2),
-            int(self.width),
-            int(self.height)
-        )
-    
-    def _render(self):
-        self._bake()
-        pipeline = [{
-            "style": self._style,
-            "shape": draw.ELLIPSE(),
-            "geometry": self.geometry # cx cy w h
-        }]
+    def _mesh(self):
+        return draw.ellipse_mesh(self._width, self._height, self.antialias)
 
-        return super()._render(pipeline)
+class RoundedRect(_MeshObject):
+    __slots__ = ("_radius",)
 
-class Text(ScreenObject):
-    def __init__(self, x : int, y : int, text : str, style = None) -> None:
+    def __init__(self, x, y, width, height, radius, style = None, cache = False, antialias = False):
         """
-        Draw text onscreen. font, size and color are stored in `style` as `font-family`,
-        `font-size` and `color`.
+        Draw rectangles with rounded corners. x, y is the upper left corner, `radius` the radius of
+        the corners.
         """
 
-        super().__init__("text", style)
-
-        self.text = text
+        super().__init__("rounded-rectangle", style, cache, antialias)
 
+        self._radius = radius
         self.x = x
         self.y = y
-        self._width = 0
-        self._height = 0
+        self.width = width
+        self.height = height
 
-        self._old_style = style.copy()
+        self._bake()
 
-    def _backwards_attach(self, parent):
-        super()._backwards_attach(parent)
-        self._bake_style(override=True) # avoid baking when self.parent is None
-    
-    def _bake(self): # bakes both geometry & style
-        self._bake_style()
-        self.geometry = (
-            self.x,
-            self.y,
-            self._width,
-            self._height
-        )
+    @property
+    def radius(self):
+        return self._radius
 
-        self._old_style = self._style.copy()
-        
-    def _bake_style(self, override=False):
+    @radius.setter
+    def radius(self, value):
+        if self._radius != value:
+            self._radius = value
+            self._touch()
+
+    def _mesh(self):
+        return draw.rounded_rect_mesh(self._width, self._height, self._radius, self.antialias)
+
+class Polygon(_MeshObject):
+    __slots__ = ("_points",)
+
+    def __init__(self, x, y, points, style = None, cache = False, antialias = False):
         """
-        If the style is changed recreate the text surface and save it to a new texture.
+        Draw any simple polygon, convex or not. `points` are the corners ((x, y), ...) relative to
+        x, y. `width` & `height` are the size of the polygon's bounding box.
         """
 
-        # check if color, font-family or font-size changed
-        if override or self._old_style["color"] != self._style["color"] or self._old_style["font-family"] != self._style["font-family"] or self._old_style["font-size"] != self._style["font-size"]:
-            color = sdl2.SDL_Color(*self._style["color"]) # unpack color
-            font_family = self._style["font-family"]
-            size = self._style["font-size"]
+        super().__init__("polygon", style, cache, antialias)
+
+        self.points = points
+        self.x = x
+        self.y = y
 
-            font_ = font.load_font(font_family, size)
+        self._bake()
 
-            # encode text to bytes
-            surface = ttf.TTF_RenderUTF8_Blended(font_, self.text.encode("utf-8"), color)
-            self.texture = sdl2.SDL_CreateTextureFromSurface(self.parent.renderer, surface)
+    @property
+    def points(self):
+        return self._points
+
+    @points.setter
+    def points(self, value):
+        value = tuple((px, py) for px, py in value)
+        if getattr(self, "_points", None) != value:
+            self._points = value
+            self._width = max((p[0] for p in value), default=0) - min((p[0] for p in value), default=0)
+            self._height = max((p[1] for p in value), default=0) - min((p[1] for p in value), default=0)
+            self._touch()
+
+    def _mesh(self):
+        return draw.polygon_mesh(self._points, self.antialias)
+
+class Line(_MeshObject):
+    __slots__ = ("_x2", "_y2", "_thickness")
+    _color = "color"
+
+    def __init__(self, x1, y1, x2, y2, thickness = 1, style = None, antialias = False):
+        """
+        Draw a straight line from (x1, y1) to (x2, y2) in the style's `color`. `x` & `y` are the
+        start, `x2` & `y2` the end of the line.
+        """
 
-            self._width = surface.contents.w
-            self._height = surface.contents.h
+        super().__init__("line", style, False, antialias)
 
-            sdl2.SDL_FreeSurface(surface)
+        self._x2 = x2
+        self._y2 = y2
+        self._thickness = thickness
+        self.x = x1
+        self.y = y1
 
-    def _render(self):
         self._bake()
-        pipeline = [{
-            "style": self.style,
-            "shape": font.TEXT(),
-            "geometry": self.geometry,
-            "texture": self.texture
-        }]
 
-        return super()._render(pipeline)
+    @property
+    def x2(self):
+        return self._x2
+
+    @x2.setter
+    def x2(self, value):
+        if self._x2 != value:
+            self._x2 = value
+            self._touch()
 
-class Window(sdl2.ext.Window):
-    def __init__(self, title : str, size : tuple, styl=None, position=None, flags=None) -> None:
-        """
-        Wraps `sdl2.ext.Window`
+    @property
+    def y2(self):
+        return self._y2
 
-        - `title` (str): title of the window
-        - `size` (tuple): size of the window (width, height)
-        - `styl` (dict | None): window styling
-        - `position` (tuple | None): where the window will open at (upper left corner)
-        - `flag` (int | None): custom flags the window will have on opening
-        """
+    @y2.setter
+    def y2(self, value):
+        if self._y2 != value:
+            self._y2 = value
+            self._touch()
 
-        self.age = 0
-        self.children = []
-        self._style = style.get_style_template()
+    @property
+    def thickness(self):
+        return self._thickness
 
-        if styl:
-            for k in styl:
-                self._style[k] = styl[k]
+    @thickness.setter
+    def thickness(self, value):
+        if self._thickness != value:
+            self._thickness = value
+            self._touch()
 
-        super().__init__(title, size, position, flags) # init sdl2 prior to teacup init
+    def _mesh(self):
+        return draw.line_mesh(self._x2 - self._x, self._y2 - self._y, self._thickness, self.antialias)
 
-        self.wid = sdl2.SDL_GetWindowID(self.window)
-        register_window(self)
+def _numpy():
+    """
+    numpy is only needed by the shape batches, import it on first use.
+    """
 
-        self._open = True
-        self.show() # show the window
-        self.renderer = sdl2.SDL_CreateRenderer(self.window, -1, sdl2.SDL_RENDERER_ACCELERATED)
-        sdl2.SDL_SetRenderDrawBlendMode(self.renderer, sdl2.SDL_BLENDMODE_BLEND) # open up alpha channel
-    
-    def destroy(self) -> None:
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("shape batches require numpy, install it with `pip install numpy`") from None
+    return numpy
+
+def _vertex_dtype(np):
+    """
+    numpy layout matching `SDL_Vertex`.
+    """
+
+    return np.dtype([("x", np.float32), ("y", np.float32), ("color", np.uint8, (4,)),
+                     ("u", np.float32), ("v", np.float32)])
+
+class _ShapeBatch(_SlotPipe, ScreenObject):
+    __slots__ = ("_np", "_color", "_vertices", "_packed", "_count")
+    _shape = draw.GEOMETRY()
+    _pipe = dict(_SlotPipe._pipe, vertices="_packed", count="_count")
+
+    def __init__(self, name, x, y, width, height, color=None, style=None):
         """
-        Safely destroy the window.
+        Base of `RectangleBatch` & `EllipseBatch`. Stores every shape as one row of numpy columns
+        and draws all of them as a single triangle list.
         """
 
-        self._open = False
-        sdl2.SDL_DestroyRenderer(self.renderer) # sdl2 cleanup
-        sdl2.SDL_DestroyWindow(self.window)
-        _windows.remove(self) # remove from global list
+        super().__init__(name, style)
 
-    def attach(self, obj : ScreenObject) -> int:
+        np = self._np = _numpy()
+        n = np.broadcast(x, y, width, height).size
+
+        self._x = np.array(np.broadcast_to(x, (n,)), dtype=np.float32)
+        self._y = np.array(np.broadcast_to(y, (n,)), dtype=np.float32)
+        self._width = np.array(np.broadcast_to(width, (n,)), dtype=np.float32)
+        self._height = np.array(np.broadcast_to(height, (n,)), dtype=np.float32)
+
+        if color is None:
+            color = self._style["background-color"]
+        self._color = np.array(np.broadcast_to(color, (n, 4)), dtype=np.uint8)
+
+        self._vertices = np.zeros(0, dtype=_vertex_dtype(np))
+        self._packed = None # `_vertices` as packed SDL_Vertex bytes
+        self._count = 0
+        self._bake()
+
+    def __len__(self):
+        return len(self._x)
+
+    # columns, reading one hands out the array which may be modified in place so it also counts as
+    # a change
+    @property
+    def x(self):
+        self._touch()
+        return self._x
+
+    @x.setter
+    def x(self, value):
+        self._x[...] = value
+        self._touch()
+
+    @property
+    def y(self):
+        self._touch()
+        return self._y
+
+    @y.setter
+    def y(self, value):
+        self._y[...] = value
+        self._touch()
+
+    @property
+    def width(self):
+        self._touch()
+        return self._width
+
+    @width.setter
+    def width(self, value):
+        self._width[...] = value
+        self._touch()
+
+    @property
+    def height(self):
+        self._touch()
+        return self._height
+
+    @height.setter
+    def height(self, value):
+        self._height[...] = value
+        self._touch()
+
+    @property
+    def color(self):
         """
-        Attach a `ScreenObject` to this window. It will be rendered alongside the window.
-        Returns the index of the `ScreenObject` in the attached window's children list.
+        n by 4 rgba column.
         """
+        self._touch()
+        return self._color
 
-        obj._backwards_attach(self) # link the window to the ScreenObject
-        self.children.append(obj)
-        return len(self.children) - 1 # already added so -1
-    
-    def _render_pipe(self, pipe):
-        pipe["shape"]._render(pipe, self.renderer) # internally call draw.RECT()._render
+    @color.setter
+    def color(self, value):
+        self._color[...] = value
+        self._touch()
 
-    def _render_self(self):
-        r, g, b, a = self._style["background-color"]
-        sdl2.SDL_SetRenderDrawColor(self.renderer, r, g, b, a) # "erase" window
-        sdl2.SDL_RenderClear(self.renderer)
+    def _bake(self):
+        if self._baked == self._version: return # unchanged
 
-    def _render_children(self):
-        for child in self.children:
-            child._render()
+        np = self._np
+        if len(self._x) == 0:
+            self.geometry = (0, 0, 0, 0)
+        else:
+            x0 = int(np.floor(self._x.min()))
+            y0 = int(np.floor(self._y.min()))
+            x1 = int(np.ceil((self._x + self._width).max()))
+            y1 = int(np.ceil((self._y + self._height).max()))
+            self.geometry = (x0, y0, x1 - x0, y1 - y0) # bounding box of every shape
 
-    def _draw(self):
-        self.age += 1
-        self._render_self()
-        self._render_children()
-        sdl2.SDL_RenderPresent(self.renderer) # push renders to sdl2 render buffer
+        self._tessellate(np)
 
-    # borrows from ScreenObject
-    @property
-    def style(self):
+        self._packed = self._vertices.view(np.uint8)
+        self._count = len(self._vertices)
+        self._baked = self._version
+
+    def _vertex_buffer(self, count):
+        """
+        Returns the (reused) vertex array resized to `count` vertices.
+        """
+
+        if len(self._vertices) != count:
+            self._vertices = self._np.zeros(count, dtype=self._vertices.dtype)
+        return self._vertices
+
+    def _tessellate(self, np): pass
+
+    def _bounds(self):
+        return self.geometry
+
+    def _render(self):
+        self._bake()
+        return super()._render()
+
+class RectangleBatch(_ShapeBatch):
+    __slots__ = ()
+
+    def __init__(self, x, y, width, height, color=None, style=None):
+        """
+        Draw many rectangles at once. `x`, `y`, `width` and `height` are arrays (or scalars shared
+        by every rectangle) and are exposed as numpy columns, so updates can be vectorized like
+        `batch.x += vx`. `color` is an n by 4 rgba array, defaults to the style's `background-color`.
+        Requires numpy.
+        """
+
+        super().__init__("rectangle-batch", x, y, width, height, color, style)
+
+    def _tessellate(self, np):
+        n = len(self._x)
+        v = self._vertex_buffer(n * 6).reshape(n, 6) # two triangles per rectangle
+
+        x0 = self._x[:, None]
+        y0 = self._y[:, None]
+        x1 = x0 + self._width[:, None]
+        y1 = y0 + self._height[:, None]
+
+        vx = v["x"]
+        vy = v["y"]
+        vx[:, [0, 3, 5]] = x0
+        vx[:, [1, 2, 4]] = x1
+        vy[:, [0, 1, 3]] = y0
+        vy[:, [2, 4, 5]] = y1
+        v["color"] = self._color[:, None, :]
+
+class EllipseBatch(_ShapeBatch):
+    __slots__ = ("segments",)
+
+    def __init__(self, x, y, width, height, color=None, style=None, segments=32):
+        """
+        Draw many ellipses at once, x, y is the upper left corner of each ellipse. Works like
+        `RectangleBatch`, every ellipse is drawn as a fan of `segments` triangles. Requires numpy.
+        """
+
+        self.segments = segments
+        super().__init__("ellipse-batch", x, y, width, height, color, style)
+
+    def _tessellate(self, np):
+        n = len(self._x)
+        k = self.segments
+        v = self._vertex_buffer(n * k * 3).reshape(n, k, 3) # center + two rim points per triangle
+
+        angles = np.linspace(0, 2 * np.pi, k + 1, dtype=np.float32)
+        cos = np.cos(angles)
+        sin = np.sin(angles)
+
+        rx = (self._width / 2)[:, None]
+        ry = (self._height / 2)[:, None]
+        cx = self._x[:, None] + rx
+        cy = self._y[:, None] + ry
+
+        vx = v["x"]
+        vy = v["y"]
+        vx[:, :, 0] = cx
+        vy[:, :, 0] = cy
+        vx[:, :, 1] = cx + rx * cos[None, :-1]
+        vy[:, :, 1] = cy + ry * sin[None, :-1]
+        vx[:, :, 2] = cx + rx * cos[None, 1:]
+        vy[:, :, 2] = cy + ry * sin[None, 1:]
+        v["color"] = self._color[:, None, None, :]
+
+class Image(_SlotPipe, ScreenObject):
+    __slots__ = ("_path", "_source", "_fit", "_loaded", "_page", "_quad")
+    _shape = image.IMAGE()
+    _pipe = dict(_SlotPipe._pipe, page="_page", vertices="_quad")
+
+    def __init__(self, x, y, path : str, width=None, height=None, source=None, style=None):
+        """
+        Draw an image file (.png, .jpg, ... through SDL2_image, .bmp always works). x, y is the upper
+        left corner. The file is decoded the first time it is drawn and shared by every `Image` of
+        the same path, small images are packed into atlas pages so many sprites draw as one batch.
+
+        - `width`, `height`: drawn size, the size of the image (or `source`) when `None`
+        - `source` (tuple | None): (x, y, w, h) part of the image to draw, e.g. a sprite sheet frame
+        - `style`: `opacity` (0 to 1) fades the image
+        """
+
+        super().__init__("image", style)
+
+        self._path = path
+        self._source = source
+        self._fit = width is None or height is None # take the size from the image once loaded
+        self._loaded = None # (path, atlas entry) last looked up
+        self._page = None # atlas page, None until loaded
+        self._quad = (sdl2.SDL_Vertex * 6)() # reused, rewritten on bake
+
+        self.x = x
+        self.y = y
+        self.width = width or 0
+        self.height = height or 0
+
+    @property
+    def path(self):
+        """
+        File the image is loaded from.
+        """
+        return self._path
+
+    @path.setter
+    def path(self, value : str):
+        if value != self._path:
+            self._path = value
+            self._touch()
+
+    @property
+    def source(self):
+        """
+        (x, y, w, h) part of the image that is drawn, `None` for all of it.
+        """
+        return self._source
+
+    @source.setter
+    def source(self, value):
+        if value != self._source:
+            self._source = value
+            self._touch()
+
+    def _bake(self):
+        if self._baked == self._version: return # unchanged
+        window = self._window()
+        if window is None: return # the atlas belongs to the window's renderer
+
+        if self._loaded is None or self._loaded[0] != self._path:
+            images = image.get_atlas(window.wid, window.renderer)
+            self._loaded = (self._path, images.get(self._path))
+        entry = self._loaded[1]
+
+        self._page = None
+        if entry is not None:
+            page, (ex, ey, ew, eh) = entry
+            sx, sy, sw, sh = self._source if self._source is not None else (0, 0, ew, eh)
+            src = (ex + sx, ey + sy, sw, sh) # inside the atlas page
+
+            if self._fit: # natural size, later size changes are kept
+                self._fit = False
+                self._width = self._width or sw
+                self._height = self._height or sh
+
+            geometry = self.geometry = (int(self._x), int(self._y), int(self._width), int(self._height))
+            alpha = round(255 * max(0, min(1, self._style["opacity"])))
+            image.fill_quad(self._quad, geometry, src, page, (255, 255, 255, alpha))
+            self._page = page
+        else:
+            self.geometry = (int(self._x), int(self._y), int(self._width), int(self._height))
+
+        self._baked = self._version
+
+    def _bounds(self):
+        return self.geometry
+
+    def _render(self):
+        self._bake()
+        if self.geometry is None: return False # not loaded yet
+        return super()._render()
+
+class Text(_SlotPipe, ScreenObject):
+    __slots__ = ("_text", "_max_width", "_baked_text", "_baked_font", "_layout", "_atlas")
+    _shape = font.TEXT()
+    _pipe = dict(_SlotPipe._pipe, layout="_layout")
+
+    def __init__(self, x : int, y : int, text : str, style = None, max_width : int = None) -> None:
+        """
+        Draw text onscreen. font, size, color and alignment are stored in `style` as `font-family`,
+        `font-size`, `color` and `text-align`. Newlines start a new line, with `max_width` lines are
+        also wrapped between words to fit and the text is exactly `max_width` wide.
+        """
+
+        super().__init__("text", style)
+
+        self._text = text
+        self._max_width = max_width
+        self._baked_text = None
+        self._baked_font = None
+        self._layout = _NO_LAYOUT
+        self._atlas = None # glyph atlas the layout comes from, given back when the font changes
+
+        self.x = x
+        self.y = y
+        self._width = 0
+        self._height = 0
+
+    @property
+    def text(self):
+        """
+        The string drawn by this object.
+        """
+        return self._text
+
+    @text.setter
+    def text(self, value : str):
+        if value != self._text:
+            self._text = value
+            self._touch()
+
+    @property
+    def max_width(self):
+        """
+        Width lines are wrapped to, `None` to only break lines at newlines.
+        """
+        return self._max_width
+
+    @max_width.setter
+    def max_width(self, value : int):
+        if value != self._max_width:
+            self._max_width = value
+            self._touch()
+
+    def _backwards_attach(self, parent):
+        super()._backwards_attach(parent)
+        self._bake_style(override=True) # avoid baking when self.parent is None
+    
+    def _bake(self): # bakes both geometry & style
+        if self._baked == self._version: return # unchanged
+        if self._window() is None: return # can't lay out without a window, bake once attached
+
+        self._bake_style()
+        self.geometry = (
+            int(self._x),
+            int(self._y),
+            int(self._width),
+            int(self._height)
+        )
+        self._baked = self._version
+        
+    def _bake_style(self, override=False):
+        """
+        If the text, font, size, width or alignment changed lay the text out again from the window's
+        glyph atlas, which keeps recent layouts. Color changes are applied when drawing and never
+        need a new layout.
+        """
+
+        window = self._window()
+        if window is None: return # no renderer to create the atlas with yet
+
+        # check if text, font-family, font-size, max_width or text-align changed
+        style = self._style
+        font_key = (style["font-family"], style["font-size"], self._max_width, style["text-align"])
+        if override or self._baked_text != self._text or self._baked_font != font_key:
+            font_family, size, max_width, align = font_key
+
+            atlas = font.get_atlas(window.wid, window.renderer, font_family, size)
+            if atlas is not None:
+                self._layout = atlas.layout(self._text, max_width, align)
+            else:
+                self._layout = _NO_LAYOUT
+
+            if self._atlas is not None:
+                font.release_atlas(self._atlas) # destroyed once unused & evicted, e.g. after a size tween
+            self._atlas = atlas
+
+            self._width = self._layout.width
+            self._height = self._layout.height
+            self._baked_text = self._text
+            self._baked_font = font_key
+
+    def _render(self):
+        self._bake()
+        if self.geometry is None: return False # never baked, not attached yet
+        return super()._render()
+
+    def _bounds(self):
+        geometry = self.geometry
+        if geometry is None: return None
+        x, y, _, _ = geometry
+        x0, y0, x1, y1 = self._layout.ink # glyphs can reach past the layout box
+        return (x + x0, y + y0, x1 - x0, y1 - y0)
+
+class _Container:
+    """
+    Children in drawing order, shared by windows & groups: by `z_index`, then by when they were
+    attached.
+    """
+
+    __slots__ = ()
+
+    def _add_child(self, obj) -> int:
+        self._order[obj] = (obj._z, len(self.children))
+        self._ordered = None
+        if obj._handlers:
+            self._add_listener(obj)
+        self.children.append(obj)
+        return len(self.children) - 1
+
+    def _reorder(self, obj) -> None:
+        """
+        Called by attached screen objects when their z_index changes.
+        """
+
+        self._order[obj] = (obj._z, self._order[obj][1])
+        self._ordered = None
+
+    def _drawing_order(self) -> list:
+        if self._ordered is None:
+            self._ordered = sorted(self.children, key=self._order.__getitem__)
+        return self._ordered
+
+    def _add_listener(self, obj) -> None:
+        self._listeners.add(obj)
+
+def _expand(objects, point=None, rect=None) -> list:
+    """
+    `objects` with the children of every group among them listed right before the group, the ones
+    under `point` (x, y) or intersecting `rect` (x, y, w, h) only.
+    """
+
+    found = []
+    for obj in objects:
+        if isinstance(obj, Group):
+            found.extend(obj.query_point(*point) if point is not None else obj.query_rect(*rect))
+        found.append(obj)
+    return found
+
+# composites the premultiplied colors blending into a transparent layer leaves behind
+_PREMULTIPLIED = sdl2.SDL_ComposeCustomBlendMode(
+    sdl2.SDL_BLENDFACTOR_ONE, sdl2.SDL_BLENDFACTOR_ONE_MINUS_SRC_ALPHA, sdl2.SDL_BLENDOPERATION_ADD,
+    sdl2.SDL_BLENDFACTOR_ONE, sdl2.SDL_BLENDFACTOR_ONE_MINUS_SRC_ALPHA, sdl2.SDL_BLENDOPERATION_ADD
+)
+
+def _shrinks(old, new, box) -> bool:
+    """
+    Whether a rect (x, y, w, h) on a side of the `box` containing it moved from `old` to `new`
+    bounds away from that side, only then the box may have to shrink.
+    """
+
+    return old[0] <= box[0] < new[0] or old[1] <= box[1] < new[1] or \
+        new[0] + new[2] < box[0] + box[2] <= old[0] + old[2] or \
+        new[1] + new[3] < box[1] + box[3] <= old[1] + old[3]
+
+class Group(ScreenObject, _Container):
+    __slots__ = ("children", "_index", "_order", "_ordered", "_listeners", "_dirty", "_local",
+                 "_changes", "_moved", "_content", "_layer")
+
+    def __init__(self, x=0, y=0, z_index=0, cache=False):
+        """
+        A layer of screen objects moved & stacked as one. Children are attached with `group.attach`
+        and positioned relative to (x, y), groups can be nested. Siblings are drawn by `z_index`.
+
+        - `cache` (bool): render the children into a texture and blit it every frame until one of
+        them changes, a static layer of thousands of objects then costs a single copy. Children
+        that are not fully opaque may blend slightly differently on renderers without custom blend
+        modes (e.g. software).
+        """
+
+        super().__init__("group", None, cache)
+
+        self.children = []
+        self._index = spatial.SpatialGrid() # bounding boxes of the children relative to (x, y)
+        self._order = {} # child -> (z_index, attach position)
+        self._ordered = None # children in drawing order, `None` when it has to be sorted again
+        self._listeners = set() # children with event handlers
+        self._dirty = set() # children changed since the last bake
+        self._local = None # bounds of the children relative to (x, y)
+        self._changes = None # damage of changed children since the window last synced
+        self._moved = True # the group itself changed, redraw all of it
+        self._content = 0 # bumped whenever a child changes, invalidates the layer
+        self._layer = None # (window, key, texture) of `cache`
+
+        self.x = x
+        self.y = y
+        self._z = z_index
+
+    def attach(self, obj : ScreenObject) -> int:
+        """
+        Attach a `ScreenObject` to this group. Returns its index in the group's children list.
+        """
+
+        obj._backwards_attach(self)
+        self._index.insert(obj, None) # bounds are known after the next bake
+        return self._add_child(obj)
+
+    def query_point(self, x, y) -> list:
+        """
+        Returns the children whose bounding box contains the point (x, y), topmost first. (x, y)
+        is in the coordinates of the group's parent, e.g. the window.
+        """
+
+        self._bake()
+        x -= self._x
+        y -= self._y
+        found = sorted(self._index.query_point(x, y), key=self._order.__getitem__, reverse=True)
+        return _expand(found, point=(x, y))
+
+    def query_rect(self, x, y, width, height) -> list:
+        """
+        Returns the children whose bounding box intersects the given rect, in drawing order.
+        """
+
+        self._bake()
+        rect = (x - self._x, y - self._y, width, height)
+        return _expand(self._visible_children(rect), rect=rect)
+
+    # children draw through the window with the group's offset applied by the command buffer
+    def _render_pipe(self, pipe):
+        self.parent._render_pipe(pipe)
+
+    def _render_cached(self, pipe):
+        self.parent._render_cached(pipe)
+
+    def _touch(self) -> None:
+        self._moved = True
+        super()._touch()
+
+    def _style_children(self):
+        return self.children
+
+    def _mark_dirty(self, obj) -> None:
+        """
+        Called by attached screen objects whenever they change.
+        """
+
+        self._dirty.add(obj)
+        self._content += 1
+        super()._touch() # without `_moved`, only the changed children need a redraw
+
+    def _add_listener(self, obj) -> None:
+        self._listeners.add(obj)
+        self._listening() # events reach the children through the group
+
+    def _backwards_attach(self, parent) -> None:
+        super()._backwards_attach(parent)
+        if self._listeners:
+            self._listening()
+
+    def _bake(self):
+        if not self._dirty and self._baked == self._version: return # unchanged
+        if self._window() is None: return # children may need the renderer, bake once attached
+
+        changes = self._changes
+        index = self._index
+        local = self._local
+        stale = local is None # the bounds of the children have to be measured again
+        dirty = self._dirty
+        while dirty: # popping keeps the set's table, `clear` would free & regrow it every frame
+            obj = dirty.pop()
+            if obj.parent is not self: continue
+
+            old = obj._drawn
+            obj._bake()
+            new = obj._bounds()
+            obj._drawn = new
+            index.update(obj, new)
+            if new is None:
+                stale = True
+                continue
+
+            changes = batch._union(changes, obj._damage(old, new))
+            if not stale:
+                if old is None or _shrinks(old, new, local):
+                    stale = True # the group may have shrunk
+                else:
+                    local = batch._union(local, new)
+
+        if stale:
+            local = None
+            for obj in self.children:
+                bounds = obj._bounds()
+                if bounds is None:
+                    break
+                local = batch._union(local, bounds)
+            else:
+                local = local or (0, 0, 0, 0)
+
+        self._local = local
+        if changes is not None:
+            changes = (changes[0] + self._x, changes[1] + self._y, changes[2], changes[3])
+        self._changes = changes
+        self._baked = self._version
+
+    def _bounds(self):
+        if self._local is None: return None
+        x, y, w, h = self._local
+        return (x + self._x, y + self._y, w, h)
+
+    def _damage(self, old, new):
+        if self._moved:
+            self._moved = False
+            self._changes = None
+            return batch._union(old, new)
+
+        changes = self._changes
+        self._changes = None
+        return changes
+
+    def _render(self):
+        window = self._window()
+        if window is None: return False
+
+        self._bake()
+        if self.cache and self._render_layer(window):
+            return True
+
+        x, y = int(self._x), int(self._y)
+        cull = window._cull
+        if cull is not None: # in the coordinates of the children from here on
+            window._cull = (cull[0] - x, cull[1] - y, cull[2], cull[3])
+
+        window.commands.translate(x, y)
+        for obj in self._visible_children(window._cull):
+            obj._render()
+        window.commands.translate(-x, -y)
+        window._cull = cull
+        return True
+
+    def _visible_children(self, rect):
+        """
+        Children intersecting `rect` (x, y, w, h) relative to the group, or all of them when
+        `None`, in drawing order.
+        """
+
+        if rect is None: return self._drawing_order()
+
+        visible = self._index.query_rect(rect)
+        if len(visible) == len(self.children):
+            return self._drawing_order() # nothing culled
+        return sorted(visible, key=self._order.__getitem__)
+
+    def _render_layer(self, window) -> bool:
+        """
+        Blit the children from the layer texture, rendering them into it first when one of them
+        changed. Returns `False` when the layer can not be used (render targets unsupported).
+        """
+
+        if self._local is None: return False
+        lx, ly, w, h = self._local
+        lx, ly = int(lx), int(ly)
+        w, h = int(w) + 1, int(h) + 1 # cover fractional positions
+        key = (self._content, lx, ly, w, h)
+
+        if self._layer is None or self._layer[0] is not window or self._layer[1] != key:
+            if simulation.on_worker(): return False # rasterized by the main thread, drawn directly meanwhile
+            self._release_layer()
+            texture = self._rasterize_layer(window, lx, ly, w, h)
+            if texture is None: return False
+            self._layer = (window, key, texture)
+
+        window.commands.copy(self._layer[2], (int(self._x) + lx, int(self._y) + ly, w, h))
+        return True
+
+    def _rasterize_layer(self, window, lx, ly, w, h):
+        renderer = window.renderer
+        if not sdl2.SDL_RenderTargetSupported(renderer): return None
+
+        texture = sdl2.SDL_CreateTexture(renderer, sdl2.SDL_PIXELFORMAT_RGBA8888,
+                                         sdl2.SDL_TEXTUREACCESS_TARGET, w, h)
+        if not texture: return None
+        profiler.count("textures")
+
+        if sdl2.SDL_SetTextureBlendMode(texture, _PREMULTIPLIED) != 0: # unsupported by the renderer
+            sdl2.SDL_SetTextureBlendMode(texture, sdl2.SDL_BLENDMODE_BLEND)
+
+        previous = sdl2.SDL_GetRenderTarget(renderer)
+        sdl2.SDL_SetRenderTarget(renderer, texture)
+        sdl2.SDL_SetRenderDrawColor(renderer, 0, 0, 0, 0)
+        sdl2.SDL_RenderClear(renderer)
+
+        commands, cull = window.commands, window._cull
+        window.commands = batch.CommandBuffer() # children record into the layer instead
+        window._cull = None # all of them
+        window.commands.translate(-lx, -ly)
+        for obj in self._drawing_order():
+            obj._render()
+        window.commands.flush(renderer)
+        window.commands = commands
+        window._cull = cull
+
+        sdl2.SDL_SetRenderTarget(renderer, previous)
+        return texture
+
+    def _release_layer(self):
+        if self._layer is None: return
+        window, _, texture = self._layer
+        if window._open: # textures are freed along with a destroyed renderer
+            sdl2.SDL_DestroyTexture(texture)
+        self._layer = None
+
+class Layer(Group):
+    __slots__ = ()
+
+    def __init__(self, x=0, y=0, z_index=0, cache=True):
+        """
+        A `Group` cached into a texture by default, e.g. a static background drawn with one copy
+        per frame while the layers above it keep changing.
+        """
+        super().__init__(x, y, z_index, cache)
+
+class _NativeWindow:
+    DEFAULTFLAGS = sdl2.SDL_WINDOW_HIDDEN
+    DEFAULTPOS = (sdl2.SDL_WINDOWPOS_UNDEFINED, sdl2.SDL_WINDOWPOS_UNDEFINED)
+
+    def __init__(self, title : str, size : tuple, position=None, flags=None) -> None:
+        """
+        The SDL window behind `Window`, the interface of `sdl2.ext.Window` without importing
+        `sdl2.ext` (which loads numpy, SDL_image & SDL_ttf up front).
+        """
+
+        position = self.DEFAULTPOS if position is None else position
+        flags = self.DEFAULTFLAGS if flags is None else flags
+
+        window = sdl2.SDL_CreateWindow(title.encode("utf-8"), position[0], position[1], size[0], size[1], flags)
+        if not window:
+            raise RuntimeError(f"could not create the window: {sdl2.SDL_GetError().decode()}")
+        self.window = window.contents
+
+    @property
+    def title(self) -> str:
+        return sdl2.SDL_GetWindowTitle(self.window).decode("utf-8")
+
+    @title.setter
+    def title(self, value : str):
+        sdl2.SDL_SetWindowTitle(self.window, value.encode("utf-8"))
+
+    @property
+    def size(self) -> tuple:
+        w, h = ctypes.c_int(), ctypes.c_int()
+        sdl2.SDL_GetWindowSize(self.window, ctypes.byref(w), ctypes.byref(h))
+        return w.value, h.value
+
+    @size.setter
+    def size(self, value : tuple):
+        sdl2.SDL_SetWindowSize(self.window, value[0], value[1])
+
+    @property
+    def position(self) -> tuple:
+        x, y = ctypes.c_int(), ctypes.c_int()
+        sdl2.SDL_GetWindowPosition(self.window, ctypes.byref(x), ctypes.byref(y))
+        return x.value, y.value
+
+    @position.setter
+    def position(self, value : tuple):
+        sdl2.SDL_SetWindowPosition(self.window, value[0], value[1])
+
+    def show(self) -> None:
+        sdl2.SDL_ShowWindow(self.window)
+
+    def hide(self) -> None:
+        sdl2.SDL_HideWindow(self.window)
+
+    def maximize(self) -> None:
+        sdl2.SDL_MaximizeWindow(self.window)
+
+    def minimize(self) -> None:
+        sdl2.SDL_MinimizeWindow(self.window)
+
+    def restore(self) -> None:
+        sdl2.SDL_RestoreWindow(self.window)
+
+class Window(_NativeWindow, events.Emitter, _Container, style.Styled):
+    def __init__(self, title : str, size : tuple, styl=None, position=None, flags=None, fps=None, stylesheet=None) -> None:
+        """
+        Wraps an SDL window, `title`, `size` & `position` can be changed while it is open.
+
+        - `title` (str): title of the window
+        - `size` (tuple): size of the window (width, height)
+        - `styl` (dict | None): window styling
+        - `position` (tuple | None): where the window will open at (upper left corner)
+        - `flag` (int | None): custom flags the window will have on opening
+        - `fps` (float | None): see `Window.fps`
+        - `stylesheet` (Stylesheet | None): rules styling the window & everything attached to it,
+        `teacup.style.stylesheet` (shared by every window) by default
+        """
+
+        self.age = 0
+        self._fps = None if fps is None else max(0, fps)
+        self._schedule = clock.Schedule(self._fps or 0) # frames of this window
+        self.children = []
+        self.stylesheet = style.stylesheet if stylesheet is None else stylesheet
+        self._inline = style.intern(styl) if styl else None
+        self._classes = _NO_CLASSES
+        self._inheritable = None
+        self._style = None
+        self._style_view = None
+        self._restyle()
+
+        self.commands = batch.CommandBuffer() # draw commands of the current frame
+        self.sdl_calls = 0 # SDL calls made by the last drawn frame
+        self._published = None # (commands, region) recorded by `_publish`, waiting to be presented
+        self._spares = [] # command buffers presented already, recorded into again by `_publish`
+        self._handoff = threading.Lock() # guards `_published` & `_spares`
+
+        self._overlay = None # profiler results, drawn on top of the children
+        self._recorder = None # see `start_recording`
+        self._index = spatial.SpatialGrid() # bounding boxes of the children
+        self._order = {} # child -> (z_index, attach position), restores painter's order after culling
+        self._ordered = None # children in drawing order, `None` when it has to be sorted again
+        self._listeners = set() # children with event handlers
+        self._output = (0, 0) # size of the renderer output in pixels
+        self._viewport = (0, 0, 0, 0) # (0, 0, *_output)
+        self._visible = None # (index version, children) of the last unculled full redraw
+        self._cull = None # region groups draw their children within, see `_render_children`
+
+        self._full_redraw = True # first frame always draws everything
+        self._dirty = set() # children changed since the last frame
+        self._damage = None # region of the window to redraw on the next frame
+        self._region = None # region recorded by `_record`, `None` for all of it
+        self._backbuffer = None
+
+        super().__init__(title, size, position, flags) # init sdl2 prior to teacup init
+
+        self.wid = sdl2.SDL_GetWindowID(self.window)
+        register_window(self)
+
+        self._open = True
+        if not _headless:
+            self.show() # show the window
+        self.renderer = self._create_renderer()
+        sdl2.SDL_SetRenderDrawBlendMode(self.renderer, sdl2.SDL_BLENDMODE_BLEND) # open up alpha channel
+        self._create_backbuffer()
+
+    def _create_renderer(self):
+        """
+        Create the renderer of the window, falls back to software rendering when there is no gpu
+        (e.g. under the dummy video driver).
+        """
+
+        renderer_flags = sdl2.SDL_RENDERER_ACCELERATED
+        if _vsync:
+            renderer_flags |= sdl2.SDL_RENDERER_PRESENTVSYNC
+
+        renderer = None
+        if not _headless:
+            renderer = sdl2.SDL_CreateRenderer(self.window, -1, renderer_flags)
+        if not renderer:
+            renderer = sdl2.SDL_CreateRenderer(self.window, -1, sdl2.SDL_RENDERER_SOFTWARE)
+        return renderer
+
+    def _create_backbuffer(self):
+        """
+        (Re)create the target texture frames are drawn into. The previous frame must survive
+        `SDL_RenderPresent` so that only the changed parts of it need to be redrawn.
+        """
+
+        if self._backbuffer:
+            sdl2.SDL_DestroyTexture(self._backbuffer)
+        self._backbuffer = None
+        self._full_redraw = True
+
+        w, h = ctypes.c_int(), ctypes.c_int()
+        sdl2.SDL_GetRendererOutputSize(self.renderer, ctypes.byref(w), ctypes.byref(h))
+        self._output = (w.value, h.value)
+        self._viewport = (0, 0, w.value, h.value)
+        self._visible = None
+
+        if not sdl2.SDL_RenderTargetSupported(self.renderer): return # always redraw everything
+
+        texture = sdl2.SDL_CreateTexture(self.renderer, sdl2.SDL_PIXELFORMAT_RGBA8888,
+                                         sdl2.SDL_TEXTUREACCESS_TARGET, w.value, h.value)
+        if texture:
+            self._backbuffer = texture
+            profiler.count("textures")
+
+    def _touch(self) -> None:
+        """
+        The window itself changed (style or size), redraw all of it on the next frame.
+        """
+        self._full_redraw = True
+
+    def _mark_dirty(self, obj) -> None:
+        """
+        Called by attached screen objects whenever they change.
+        """
+        self._dirty.add(obj)
+    
+    def destroy(self) -> None:
+        """
+        Safely destroy the window. An error of a running recording is raised once the window is
+        gone.
+        """
+
+        self._open = False
+        try:
+            if self._recorder is not None:
+                self.stop_recording()
+        finally:
+            cache.get_cache().evict_window(self.wid) # cached textures belong to this renderer
+            font.release_window(self.wid)
+            image.release_window(self.wid)
+            if self._backbuffer:
+                sdl2.SDL_DestroyTexture(self._backbuffer)
+                self._backbuffer = None
+            sdl2.SDL_DestroyRenderer(self.renderer) # sdl2 cleanup
+            sdl2.SDL_DestroyWindow(self.window)
+            _windows.pop(self.wid, None) # remove from global list
+
+    def attach(self, obj : ScreenObject) -> int:
+        """
+        Attach a `ScreenObject` to this window. It will be rendered alongside the window.
+        Returns the index of the `ScreenObject` in the attached window's children list.
+        """
+
+        obj._backwards_attach(self) # link the window to the ScreenObject
+        self._index.insert(obj, None) # bounds are known after the next bake
+        return self._add_child(obj)
+
+    def query_point(self, x, y) -> list:
+        """
+        Returns the children whose bounding box contains the point (x, y), topmost first. The
+        children of a group come right before the group.
+        """
+
+        self._sync() # bring moved children up to date
+        found = sorted(self._index.query_point(x, y), key=self._order.__getitem__, reverse=True)
+        return _expand(found, point=(x, y))
+
+    def query_rect(self, x, y, width, height) -> list:
+        """
+        Returns the children whose bounding box intersects the given rect, in drawing order. The
+        children of a group come right before the group.
+        """
+
+        self._sync()
+        rect = (x, y, width, height)
+        return _expand(sorted(self._index.query_rect(rect), key=self._order.__getitem__), rect=rect)
+
+    def _reorder(self, obj) -> None:
+        super()._reorder(obj)
+        self._visible = None
+    
+    def _render_pipe(self, pipe):
+        pipe["shape"]._render(pipe, self.commands) # internally call draw.RECT()._render
+
+    def _render_cached(self, pipe):
+        """
+        Blit `pipe` from the texture cache, rasterizing it into a new texture on a cache miss.
+        """
+
+        shape = pipe["shape"]
+        geometry = pipe["geometry"]
+        x, y, w, h = shape._bounds(geometry)
+        if w <= 0 or h <= 0: return
+
+        local = shape._moved(geometry, -x, -y) # geometry relative to the texture
+        key = (self.wid, shape.name, local, cache.freeze_style(pipe["style"]), pipe.get("mesh"))
+
+        textures = cache.get_cache()
+        texture = textures.get(key)
+        if texture is None:
+            if simulation.on_worker(): # only the main thread renders into textures
+                return self._render_pipe(pipe)
+            if not textures.fits(w * h * 4): # larger than the whole cache
+                return self._render_pipe(pipe)
+            texture = self._rasterize(pipe, local, w, h)
+            if texture is None: # render targets unsupported, draw directly
+                return self._render_pipe(pipe)
+            textures.put(key, texture, w * h * 4, self.wid)
+
+        self.commands.copy(texture, (x, y, w, h))
+
+    def _rasterize(self, pipe, local, w, h):
+        """
+        Render a pipe once into a new `w` by `h` target texture. Returns `None` on failure.
+        """
+
+        texture = sdl2.SDL_CreateTexture(self.renderer, sdl2.SDL_PIXELFORMAT_RGBA8888,
+                                         sdl2.SDL_TEXTUREACCESS_TARGET, w, h)
+        if not texture: return None
+        profiler.count("textures")
+
+        sdl2.SDL_SetTextureBlendMode(texture, sdl2.SDL_BLENDMODE_BLEND)
+        previous = sdl2.SDL_GetRenderTarget(self.renderer)
+        sdl2.SDL_SetRenderTarget(self.renderer, texture)
+
+        # write the exact rgba of the shape instead of blending it onto transparent black
+        sdl2.SDL_SetRenderDrawBlendMode(self.renderer, sdl2.SDL_BLENDMODE_NONE)
+        sdl2.SDL_SetRenderDrawColor(self.renderer, 0, 0, 0, 0)
+        sdl2.SDL_RenderClear(self.renderer)
+
+        local_pipe = dict(pipe, geometry=local)
+        for key in draw.BAKED: # baked at the on screen position
+            local_pipe.pop(key, None)
+
+        commands = batch.CommandBuffer()
+        pipe["shape"]._render(local_pipe, commands)
+        commands.flush(self.renderer)
+
+        sdl2.SDL_SetRenderDrawBlendMode(self.renderer, sdl2.SDL_BLENDMODE_BLEND)
+        sdl2.SDL_SetRenderTarget(self.renderer, previous)
+        return texture
+
+    def _render_self(self, region=None) -> int:
+        """
+        Erase the window (or only `region`) with its background color. Returns the number of SDL
+        calls made.
+        """
+
+        r, g, b, a = self._style["background-color"]
+        sdl2.SDL_SetRenderDrawColor(self.renderer, r, g, b, a) # "erase" window
+
+        if region is None:
+            sdl2.SDL_RenderClear(self.renderer)
+            return 2
+
+        # SDL_RenderClear ignores the clip rect, only erase the damaged region
+        sdl2.SDL_SetRenderDrawBlendMode(self.renderer, sdl2.SDL_BLENDMODE_NONE)
+        sdl2.SDL_RenderFillRect(self.renderer, sdl2.SDL_Rect(*region))
+        sdl2.SDL_SetRenderDrawBlendMode(self.renderer, sdl2.SDL_BLENDMODE_BLEND)
+        return 4
+
+    def _visible_children(self, region):
+        """
+        Children intersecting `region` (or the window when `None`) in drawing order, everything else
+        is culled without being looked at.
+        """
+
+        version = self._index.version
+        if region is None:
+            if self._visible is not None and self._visible[0] == version:
+                return self._visible[1] # nothing moved since the last full redraw
+            region = self._viewport
+
+        visible = self._index.query_rect(region)
+        if len(visible) == len(self.children):
+            visible = self._drawing_order() # nothing culled
+        else:
+            visible = sorted(visible, key=self._order.__getitem__)
+
+        if region is self._viewport:
+            self._visible = (version, visible)
+        return visible
+
+    def _render_children(self, region=None):
+        timed = profiler.enabled and not simulation.on_worker()
+        self._cull = self._viewport if region is None else region
+        for child in self._visible_children(region):
+            if timed:
+                before = time.perf_counter()
+                child._render()
+                profiler.add_class(type(child).__name__, time.perf_counter() - before)
+            else:
+                child._render()
+            child._drawn = child._bounds()
+
+        if self._overlay is not None:
+            self._overlay._render()
+            self._overlay._drawn = self._overlay._bounds()
+
+    def _update_overlay(self):
+        """
+        Show the profiler results in the upper left corner while the profiler overlay is on.
+        """
+
+        if not profiler.overlay:
+            if self._overlay is not None: # erase it
+                self._overlay = None
+                self._touch()
+            return
+
+        if self._overlay is None:
+            self._overlay = Text(4, 4, "", {
+                "color": (255, 255, 0, 255),
+                "background-color": (0, 0, 0, 180),
+                "font-size": 12,
+            })
+            self._overlay._backwards_attach(self)
+
+        self._overlay.text = profiler.summary()
+
+    def _sync(self):
+        """
+        Bakes every changed child and moves it in the spatial index. Their old & new bounding boxes
+        are added to the damaged region of the next frame.
+        """
+
+        index = self._index
+        damage = self._damage
+
+        dirty = self._dirty
+        while dirty: # popping keeps the set's table, `clear` would free & regrow it every frame
+            obj = dirty.pop()
+            if obj.parent is not self: continue
+
+            old = obj._drawn
+            obj._bake()
+            new = obj._bounds()
+            if obj in index:
+                index.update(obj, new)
+
+            if new is None:
+                self._full_redraw = True # unknown extent
+                continue
+
+            obj._drawn = new # erased & redrawn (or culled) next frame
+            damage = batch._union(damage, obj._damage(old, new))
+
+        self._damage = damage
+
+    def _draw(self):
+        """
+        Redraw the parts of the window that changed and present them. Returns `False` and skips
+        presenting when nothing changed since the last frame.
+        """
+
+        if not self._record(): return False
+        self._submit()
+        return True
+
+    def _record(self) -> bool:
+        """
+        First half of `_draw`, bakes the changed children and records the commands of the next
+        frame. Only reads the scene, so `display` holds the simulation lock for this half alone.
+        Returns `False` when there is nothing to present.
+        """
+
+        self.age += 1
+        if self._overlay is not None or profiler.overlay:
+            self._update_overlay()
+        if not self._full_redraw and not self._dirty and self._damage is None: return False # idle
+
+        self._sync()
+        region = batch._outward(self._damage) # fractional positions damage partial pixels
+        self._damage = None
+
+        if self._backbuffer is None or self._full_redraw:
+            region = None
+        elif region is None or region[2] <= 0 or region[3] <= 0:
+            return False # changes were invisible
+
+        self._full_redraw = False
+        self._region = region
+
+        timed = profiler.enabled and not simulation.on_worker()
+        if timed:
+            profiler.mark("bake")
+
+        self._render_children(region) # records into self.commands
+        if timed:
+            profiler.mark("render")
+        return True
+
+    def _publish(self) -> bool:
+        """
+        Record the next frame into a command buffer of its own and leave it for `_present_published`.
+        Called with the simulation lock held, by the simulation thread at the end of every step and
+        by `display` when it finds the lock free. Returns `False` when there is nothing to present.
+        """
+
+        self._unpublish()
+        if not self._record(): return False
+
+        with self._handoff:
+            commands = self.commands
+            self.commands = self._spares.pop() if self._spares else batch.CommandBuffer()
+            self._published = (commands, self._region)
+        return True
+
+    def _unpublish(self) -> None:
+        """
+        Take back a published frame that was not presented, its region is redrawn by the next one.
+        """
+
+        with self._handoff:
+            published, self._published = self._published, None
+            if published is None: return
+            commands, region = published
+            commands.clear()
+            self._spares.append(commands)
+
+        if region is None:
+            self._full_redraw = True
+        else:
+            self._damage = batch._union(self._damage, region)
+
+    def _present_published(self) -> bool:
+        """
+        Submit & present the last published frame, if there is one. Never touches the scene, so it
+        runs while the simulation thread is in the middle of a step.
+        """
+
+        with self._handoff:
+            published, self._published = self._published, None
+        if published is None: return False
+
+        commands, region = published
+        self._present(commands, region)
+        with self._handoff:
+            self._spares.append(commands) # flushing emptied it
+        return True
+
+    def _submit(self) -> None:
+        """
+        Second half of `_draw`, erases the damaged region, submits the recorded commands and
+        presents. Never touches the scene.
+        """
+
+        self._present(self.commands, self._region)
+
+    def _present(self, commands, region) -> None:
+        """
+        Erase `region` (`None` for the whole window), submit `commands` and present.
+        """
+
+        timed = profiler.enabled
+
+        calls = 0
+        if self._backbuffer is not None:
+            sdl2.SDL_SetRenderTarget(self.renderer, self._backbuffer)
+            calls += 1
+        if region is not None:
+            sdl2.SDL_RenderSetClipRect(self.renderer, sdl2.SDL_Rect(*region))
+            calls += 1
+
+        calls += self._render_self(region)
+        calls += commands.flush(self.renderer)
+        cache.get_cache().flushed(self.wid) # evicted textures it drew can go now
+        if timed:
+            profiler.mark("flush")
+
+        if region is not None:
+            sdl2.SDL_RenderSetClipRect(self.renderer, None)
+            calls += 1
+        if self._backbuffer is not None:
+            sdl2.SDL_SetRenderTarget(self.renderer, None)
+            sdl2.SDL_RenderCopy(self.renderer, self._backbuffer, None, None)
+            calls += 2
+
+        if self._recorder is not None:
+            self._recorder.capture(self.renderer, *self._output)
+            calls += 1
+            if timed:
+                profiler.mark("record")
+
+        sdl2.SDL_RenderPresent(self.renderer) # push renders to sdl2 render buffer
+        self.sdl_calls = calls + 1
+
+        if timed:
+            profiler.mark("present")
+            profiler.count("sdl_calls", self.sdl_calls)
+
+    def start_recording(self, path : str, buffers : int = 8, threads : int = 2, compression : int = 1):
+        """
+        Record every frame this window presents into the directory `path` as a PNG sequence, see
+        `recorder.Recorder`. Frames are read back on the main thread and encoded & written by
+        `threads` background threads, frames arriving while all `buffers` are still being encoded
+        are dropped so the frame loop never waits for the disk. Returns the recorder, its `frames`
+        and `dropped` counters can be checked while recording.
+        """
+
+        if self._recorder is not None:
+            self.stop_recording()
+        self._recorder = recorder.Recorder(path, buffers, threads, compression)
+        self._full_redraw = True # the first recorded frame shows everything
+        return self._recorder
+
+    def stop_recording(self) -> dict:
+        """
+        Finish writing the recorded frames. Returns the contents of the `frames.json` written next
+        to them: every frame with its time and the number of dropped frames. Returns `None` when
+        not recording.
+        """
+
+        recording, self._recorder = self._recorder, None
+        if recording is None: return None
+        return recording.stop()
+
+    @property
+    def fps(self):
+        """
+        Refresh rate of this window. `None` follows the `fps` given to `display`, a positive rate
+        draws it at most that many times a second on its own schedule and `0` draws it on every
+        `display` call, only when something changed. Changes to windows that are not due yet are
+        kept and drawn with their next frame.
+        """
+        return self._fps
+
+    @fps.setter
+    def fps(self, value):
+        value = None if value is None else max(0, value)
+        if value != self._fps:
+            self._fps = value
+            self._schedule.rate = value or 0
+            self._schedule.deadline = None # due right away
+
+    @property
+    def dt(self) -> float:
+        """
+        Seconds between the last two frames of this window.
+        """
+        return self._schedule.dt
+
+    # borrows from ScreenObject
+    def _set_style(self, record) -> None:
+        if record is not self._style:
+            self._style = record
+            self._touch()
+
+    def _stylesheet(self):
+        return self.stylesheet
+
+    def _style_parent(self):
+        return None
+
+    def _style_type(self):
+        return "window"
+
+    def _style_children(self):
+        return self.children
+
+class OffscreenWindow(Window):
+    def __init__(self, size : tuple, styl=None, fps=None, stylesheet=None) -> None:
+        """
+        A window that is never shown and renders into memory with the software renderer. Frames
+        can be read back without copying through `pixels()` / `array()`. Best used together with
+        `teacup.init(headless=True)` so no display is needed at all.
+
+        - `size` (tuple): size of the frame (width, height)
+        - `styl` (dict | None): window styling
+        - `fps` (float | None): see `Window.fps`
+        - `stylesheet` (Stylesheet | None): see `Window`
+        """
+
+        self._surface = None
+        super().__init__("teacup offscreen", size, styl, flags=sdl2.SDL_WINDOW_HIDDEN, fps=fps,
+                         stylesheet=stylesheet)
+
+    def _create_renderer(self):
+        w, h = self.size
+        self._surface = sdl2.SDL_CreateRGBSurfaceWithFormat(0, w, h, 32, sdl2.SDL_PIXELFORMAT_RGBA32)
+        return sdl2.SDL_CreateSoftwareRenderer(self._surface)
+
+    def show(self) -> None: pass # always hidden
+
+    def destroy(self) -> None:
+        try:
+            super().destroy()
+        finally:
+            sdl2.SDL_FreeSurface(self._surface) # after the renderer drawing into it
+            self._surface = None
+
+    def pixels(self) -> memoryview:
+        """
+        The rendered frame as a memoryview over the pixel memory (rgba, row length is `pitch`
+        bytes). Not a copy, contents change with the next drawn frame.
+        """
+
+        surface = self._surface.contents
+        buffer = (ctypes.c_uint8 * (surface.pitch * surface.h)).from_address(surface.pixels)
+        return memoryview(buffer)
+
+    @property
+    def pitch(self) -> int:
+        """
+        Length of a row of pixels in bytes.
+        """
+        return self._surface.contents.pitch
+
+    def array(self):
+        """
+        The rendered frame as a numpy array of shape (height, width, 4) in rgba order. Shares memory
+        with the frame, copy it to keep it. Requires numpy.
+        """
+
+        np = _numpy()
+        surface = self._surface.contents
+        rows = np.frombuffer(self.pixels(), dtype=np.uint8).reshape(surface.h, surface.pitch // 4, 4)
+        return rows[:, :surface.w]
+
+    def render(self) -> bool:
+        """
+        Draw a frame right away, without going through `display`. Returns `False` if nothing
+        changed since the last frame.
+        """
+
+        return self._draw()
+
+    def save(self, path : str) -> None:
         """
-        The style of the window.
+        Save the last drawn frame as a .bmp file.
         """
-        return self._style
 
-    @style.setter
-    def style(self, value : dict):
-        self._style = style.get_style_template()
-        for k in value:
-            self._style[k] = value[k]
+        sdl2.SDL_SaveBMP(self._surface, path.encode("utf-8"))
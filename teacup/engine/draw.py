@@ -1,97 +1,329 @@
+import functools
+import math
 import sdl2
+from array import array
+
+BAKED = ("vertices", "origin") # pipe entries derived from the geometry by the screen object
+
+_VERTEX_SIZE = 20 # sizeof(SDL_Vertex)
 
 class Shape:
     def __init__(self, name):
         self.name = name
 
-    def _render(self, pipe, renderer): pass
+    def _render(self, pipe, commands): pass
+
+    def _bounds(self, geometry):
+        """
+        Returns the bounding box (x, y, w, h) of the pixels this shape covers.
+        """
+        return geometry
+
+    def _moved(self, geometry, dx, dy):
+        """
+        Returns `geometry` translated by (dx, dy).
+        """
+        x, y, *rest = geometry
+        return (x + dx, y + dy, *rest)
 
 class RECT(Shape):
     def __init__(self, name="rectangle"):
         super().__init__(name)
 
-    def _render(self, pipe, renderer):
-        # geometry
-        x, y, w, h = pipe["geometry"]
-        rect = sdl2.SDL_Rect(x, y, w, h) # xywh
+    def _render(self, pipe, commands):
+        # render, the window batches rects of the same color together, the baked geometry (xywh) is
+        # packed straight into the batch so nothing is allocated per frame
+        geometry = pipe["geometry"]
+        commands.fill_rects(pipe["style"]["background-color"], geometry, geometry)
+        return super()._render(pipe, commands)
+
+class GEOMETRY(Shape):
+    def __init__(self, name="geometry"):
+        super().__init__(name)
+
+    def _render(self, pipe, commands):
+        # prebuilt triangle list, geometry is only the bounding box
+        commands.geometry(pipe.get("texture"), (255, 255, 255, 255), pipe["vertices"], pipe["geometry"], pipe.get("count"))
+        return super()._render(pipe, commands)
+
+class Mesh:
+    def __init__(self, points, alphas=None) -> None:
+        """
+        Triangle list of a shape relative to its origin (x, y). Meshes are cached per shape & size
+        and shared by every object that looks the same, so are their vertices: objects keep none of
+        their own, the mesh is moved and colored while it is copied into the command buffer.
+
+        - `points` (list): (x, y) of every vertex, three per triangle
+        - `alphas` (list | None): opacity (0 to 1) of every vertex, edges of anti-aliased shapes fade out
+        """
+
+        self.count = len(points)
+        xs = array("f", (p[0] for p in points))
+        ys = array("f", (p[1] for p in points))
+
+        # packed SDL_Vertex structs relative to the origin, colors are written per draw
+        self.vertices = bytearray(self.count * _VERTEX_SIZE)
+        if points:
+            floats = memoryview(self.vertices).cast("f") # SDL_Vertex is 5 words: x, y, color, u, v
+            floats[0::5] = xs
+            floats[1::5] = ys
+            floats.release()
+
+        # every vertex as (r, g, b, alpha level) indices into the table built by `colors`
+        self._levels = None
+        self._codes = None
+        if alphas is not None:
+            self._levels = sorted(set(alphas))
+            level = {alpha: 3 + i for i, alpha in enumerate(self._levels)}
+            self._codes = bytes(code for alpha in alphas for code in (0, 1, 2, level[alpha]))
+
+        if points:
+            x0 = min(xs)
+            y0 = min(ys)
+            self.bounds = (x0, y0, max(xs) - x0, max(ys) - y0) # relative to the origin
+        else:
+            self.bounds = (0, 0, 0, 0)
+
+    def colors(self, color : tuple) -> bytes:
+        """
+        Packed `SDL_Color` of every vertex filled with `color` (rgba), see `CommandBuffer.geometry`.
+        """
+
+        if self._codes is None:
+            return bytes(color) * self.count
+
+        r, g, b, a = color
+        table = bytes((r, g, b, *(round(a * alpha) for alpha in self._levels))).ljust(256, b"\0")
+        return self._codes.translate(table)
+
+class MESH(Shape):
+    def __init__(self, name="mesh"):
+        super().__init__(name)
+
+    def _render(self, pipe, commands):
+        mesh = pipe["mesh"]
+        color = pipe["style"][pipe.get("color", "background-color")]
+        if mesh is None or not mesh.count or color[3] == 0:
+            return super()._render(pipe, commands)
 
-        # color
-        r, g, b, a = pipe["style"]["background-color"]
-        sdl2.SDL_SetRenderDrawColor(renderer, r, g, b, a) # rgba
+        geometry = pipe["geometry"]
+        origin = pipe.get("origin")
+        if origin is None: # not baked (e.g. rasterized into a cached texture)
+            origin = self._origin(geometry, mesh)
 
-        # render
-        sdl2.SDL_RenderFillRect(renderer, rect)
-        return super()._render(pipe, renderer)
+        # the shared vertices are relative to the origin, moved & painted as they are recorded
+        x, y = origin
+        bounds = (geometry[0] - x, geometry[1] - y, geometry[2], geometry[3])
+        commands.translate(x, y)
+        # vertices carry their own color, so every mesh shares one untextured batch state
+        commands.geometry(None, (255, 255, 255, 255), mesh.vertices, bounds, mesh.count, mesh.colors(color))
+        commands.translate(-x, -y)
+        return super()._render(pipe, commands)
 
-class ELLIPSE(Shape):
+    def _origin(self, geometry, mesh):
+        """
+        Origin of `mesh` drawn with `geometry` as its pixel bounding box, see `mesh_geometry`.
+        """
+        return (geometry[0] - math.floor(mesh.bounds[0]), geometry[1] - math.floor(mesh.bounds[1]))
+
+class ELLIPSE(MESH):
     def __init__(self, name="ellipse"):
+        """
+        The shape ellipses were drawn with before they became meshes, kept for custom pipes. A pipe
+        without a `mesh` is drawn as it used to be: its geometry is (cx, cy, w, h) around the center.
+        """
         super().__init__(name)
-    
-    def _render(self, pipe, renderer):
-        # color
-        r, g, b, a = pipe["style"]["background-color"]
-        sdl2.SDL_SetRenderDrawColor(renderer, r, g, b, a) # rgba
 
-        # avoid lookup
+    def _render(self, pipe, commands):
+        if pipe.get("mesh") is not None:
+            return super()._render(pipe, commands)
+
         cx, cy, width, height = pipe["geometry"]
+        mesh = ellipse_mesh(width, height)
+        x = cx - width / 2
+        y = cy - height / 2
+        return super()._render({"style": pipe["style"], "mesh": mesh, "origin": (x, y),
+                                "geometry": mesh_geometry(mesh, x, y)}, commands)
+
+    def _bounds(self, geometry):
+        cx, cy, width, height = geometry
+        return mesh_geometry(ellipse_mesh(width, height), cx - width / 2, cy - height / 2)
+
+def mesh_geometry(mesh, x : float, y : float) -> tuple:
+    """
+    Pixel bounding box (x, y, w, h) of `mesh` drawn at (x, y).
+    """
+
+    bx, by, bw, bh = mesh.bounds
+    x0 = math.floor(x + bx)
+    y0 = math.floor(y + by)
+    return (x0, y0, math.ceil(x + bx + bw) - x0, math.ceil(y + by + bh) - y0)
+
+# tessellation, every mesh is built once per shape & size
+
+FRINGE = 1.0 # width in pixels of the fading edge of anti-aliased shapes
+
+def segments(radius : float) -> int:
+    """
+    Number of segments a full circle of `radius` needs to stay within a quarter pixel of the curve.
+    """
+
+    if radius <= 0.25: return 4
+    return max(8, min(256, math.ceil(math.pi / math.acos(1 - 0.25 / radius))))
+
+def _area(outline):
+    area = 0
+    for i in range(len(outline)):
+        x0, y0 = outline[i - 1]
+        x1, y1 = outline[i]
+        area += x0 * y1 - x1 * y0
+    return area / 2
+
+def _fringe(outline, points, alphas):
+    """
+    Add a strip of triangles fading from the edge of `outline` to transparent, `FRINGE` pixels
+    outwards. `outline` must have a positive area.
+    """
+
+    n = len(outline)
+    normals = [] # outward normal of the edge starting at each point
+    for i in range(n):
+        x0, y0 = outline[i]
+        x1, y1 = outline[(i + 1) % n]
+        length = math.hypot(x1 - x0, y1 - y0) or 1
+        normals.append(((y1 - y0) / length, (x0 - x1) / length))
+
+    outer = []
+    for i in range(n): # miter the normals of both edges meeting at a point, limited for sharp corners
+        nx = normals[i - 1][0] + normals[i][0]
+        ny = normals[i - 1][1] + normals[i][1]
+        dot = nx * normals[i][0] + ny * normals[i][1]
+        scale = FRINGE / dot if dot > 0.25 else FRINGE * 4
+        x, y = outline[i]
+        outer.append((x + nx * scale, y + ny * scale))
+
+    for i in range(n):
+        j = (i + 1) % n
+        points += (outline[i], outline[j], outer[j], outline[i], outer[j], outer[i])
+        alphas += (1, 1, 0, 1, 0, 0)
+
+def _convex(outline, antialias):
+    """
+    Mesh of a convex outline, fanned out from its centroid.
+    """
+
+    if len(outline) < 3: return Mesh([])
+    if _area(outline) < 0:
+        outline = outline[::-1]
+
+    cx = sum(p[0] for p in outline) / len(outline)
+    cy = sum(p[1] for p in outline) / len(outline)
+
+    points = []
+    for i in range(len(outline)):
+        points += ((cx, cy), outline[i], outline[(i + 1) % len(outline)])
+
+    if not antialias: return Mesh(points)
+
+    alphas = [1] * len(points)
+    _fringe(outline, points, alphas)
+    return Mesh(points, alphas)
+
+def _arc(cx, cy, rx, ry, start, end, count):
+    """
+    `count + 1` points along an elliptical arc between the angles `start` and `end`.
+    """
+
+    step = (end - start) / count
+    return [(cx + rx * math.cos(start + i * step), cy + ry * math.sin(start + i * step)) for i in range(count + 1)]
+
+@functools.lru_cache(maxsize=256)
+def ellipse_mesh(width : float, height : float, antialias : bool = False) -> Mesh:
+    """
+    Ellipse filling the `width` by `height` box whose upper left corner is the origin.
+    """
+
+    if width <= 0 or height <= 0: return Mesh([])
+
+    rx = width / 2
+    ry = height / 2
+    count = segments(max(rx, ry))
+    return _convex(_arc(rx, ry, rx, ry, 0, 2 * math.pi, count)[:-1], antialias)
+
+@functools.lru_cache(maxsize=256)
+def rounded_rect_mesh(width : float, height : float, radius : float, antialias : bool = False) -> Mesh:
+    """
+    Rectangle with corners rounded by `radius`, upper left corner at the origin.
+    """
+
+    if width <= 0 or height <= 0: return Mesh([])
+
+    radius = max(0, min(radius, width / 2, height / 2))
+    if radius == 0:
+        return _convex([(0, 0), (width, 0), (width, height), (0, height)], antialias)
+
+    count = max(2, segments(radius) // 4) # per corner
+    half = math.pi / 2
+    outline = (_arc(width - radius, height - radius, radius, radius, 0, half, count)
+               + _arc(radius, height - radius, radius, radius, half, 2 * half, count)
+               + _arc(radius, radius, radius, radius, 2 * half, 3 * half, count)
+               + _arc(width - radius, radius, radius, radius, 3 * half, 4 * half, count))
+    return _convex(outline, antialias)
+
+@functools.lru_cache(maxsize=256)
+def line_mesh(dx : float, dy : float, thickness : float, antialias : bool = False) -> Mesh:
+    """
+    Line from the origin to (dx, dy), `thickness` pixels wide with flat ends.
+    """
+
+    length = math.hypot(dx, dy)
+    if length == 0 or thickness <= 0: return Mesh([])
+
+    # half thickness perpendicular to the line
+    nx = -dy / length * thickness / 2
+    ny = dx / length * thickness / 2
+    return _convex([(nx, ny), (dx + nx, dy + ny), (dx - nx, dy - ny), (-nx, -ny)], antialias)
+
+@functools.lru_cache(maxsize=256)
+def polygon_mesh(points : tuple, antialias : bool = False) -> Mesh:
+    """
+    Simple (not self intersecting) polygon, convex or not, through `points` ((x, y), ...) relative to
+    the origin. Triangulated by ear clipping.
+    """
+
+    outline = [tuple(p) for p in points]
+    if len(outline) < 3: return Mesh([])
+    if _area(outline) < 0:
+        outline = outline[::-1]
+
+    triangles = []
+    remaining = list(outline)
+    while len(remaining) > 3:
+        n = len(remaining)
+        for i in range(n):
+            a, b, c = remaining[i - 1], remaining[i], remaining[(i + 1) % n]
+            if _cross(a, b, c) <= 0: continue # reflex corner
+            if any(_inside(p, a, b, c) for p in remaining if p is not a and p is not b and p is not c):
+                continue # another point lies in the ear
+
+            triangles += (a, b, c)
+            del remaining[i]
+            break
+        else: # degenerate (collinear or self intersecting) input, fan the rest
+            triangles += [p for i in range(1, len(remaining) - 1) for p in (remaining[0], remaining[i], remaining[i + 1])]
+            remaining = []
+
+    if len(remaining) == 3:
+        triangles += remaining
+
+    if not antialias: return Mesh(triangles)
+
+    alphas = [1] * len(triangles)
+    _fringe(outline, triangles, alphas)
+    return Mesh(triangles, alphas)
+
+def _cross(a, b, c):
+    return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
 
-        # temporary solution (thanks chatgpt)
-        if width <= 0 or height <= 0:
-            return super()._render(pipe, renderer)
-
-        rx = width // 2
-        ry = height // 2
-        if rx <= 0 or ry <= 0:
-            sdl2.SDL_RenderDrawLine(renderer, cx - rx, cy, cx + rx, cy)
-            return super()._render(pipe, renderer)
-
-        rx2 = rx * rx
-        ry2 = ry * ry
-        two_rx2 = rx2 << 1
-        two_ry2 = ry2 << 1
-
-        x = 0
-        y = ry
-
-        # Region 1 (scaled by 4)
-        p1 = (ry2 << 2) - (rx2 * ry << 2) + rx2
-        dx = 0
-        dy = two_rx2 * y
-
-        while dx < dy:
-            # spans at cy +- y, half-width x
-            sdl2.SDL_RenderDrawLine(renderer, cx - x, cy + y, cx + x, cy + y)
-            if y:
-                sdl2.SDL_RenderDrawLine(renderer, cx - x, cy - y, cx + x, cy - y)
-
-            x += 1
-            dx += two_ry2
-
-            if p1 < 0:
-                p1 += (dx << 2) + (ry2 << 2)
-            else:
-                y -= 1
-                dy -= two_rx2
-                p1 += ((dx - dy) << 2) + (ry2 << 2)
-
-        # Region 2 (scaled by 4)
-        x2p1 = (x << 1) + 1
-        ym1 = y - 1
-        p2 = (ry2 * x2p1 * x2p1) + (rx2 * ((ym1 << 1) * (ym1 << 1))) - (rx2 * ry2 << 2)
-
-        while y >= 0:
-            sdl2.SDL_RenderDrawLine(renderer, cx - x, cy + y, cx + x, cy + y)
-            if y:
-                sdl2.SDL_RenderDrawLine(renderer, cx - x, cy - y, cx + x, cy - y)
-
-            y -= 1
-            dy -= two_rx2
-
-            if p2 > 0:
-                p2 += (rx2 << 2) - (dy << 2)
-            else:
-                x += 1
-                dx += two_ry2
-                p2 += ((dx - dy) << 2) + (rx2 << 2)
-
-        return super()._render(pipe, renderer)
+def _inside(p, a, b, c):
+    return _cross(a, b, p) >= 0 and _cross(b, c, p) >= 0 and _cross(c, a, p) >= 0
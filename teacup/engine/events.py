@@ -0,0 +1,194 @@
+import ctypes
+import sdl2
+
+"""
+Event routing for teacup. Windows & screen objects register handlers per event name with
+`obj.on("mousedown", handler)`. A handler receives an `Event` and may return `True` to mark it as
+handled, which stops it from reaching anything further down the line (and prevents the default
+action, e.g. closing the window on "close").
+"""
+
+# sdl event types -> teacup names
+_TYPES = {
+    sdl2.SDL_MOUSEMOTION: "mousemotion",
+    sdl2.SDL_MOUSEBUTTONDOWN: "mousedown",
+    sdl2.SDL_MOUSEBUTTONUP: "mouseup",
+    sdl2.SDL_MOUSEWHEEL: "mousewheel",
+    sdl2.SDL_KEYDOWN: "keydown",
+    sdl2.SDL_KEYUP: "keyup",
+    sdl2.SDL_TEXTINPUT: "textinput",
+}
+
+# sdl window events -> teacup names
+_WINDOW_EVENTS = {
+    sdl2.SDL_WINDOWEVENT_CLOSE: "close",
+    sdl2.SDL_WINDOWEVENT_SIZE_CHANGED: "resize",
+    sdl2.SDL_WINDOWEVENT_FOCUS_GAINED: "focus",
+    sdl2.SDL_WINDOWEVENT_FOCUS_LOST: "blur",
+    sdl2.SDL_WINDOWEVENT_ENTER: "enter",
+    sdl2.SDL_WINDOWEVENT_LEAVE: "leave",
+}
+
+POINTER = ("mousemotion", "mousedown", "mouseup", "mousewheel") # routed to objects under the mouse
+
+class Event:
+    def __init__(self, type : str, window=None, sdl_event=None) -> None:
+        """
+        A teacup event. `type` is the event name, `window` the window it happened in (if any) and
+        `sdl_event` a copy of the underlying `SDL_Event`. Depending on the type it also carries:
+
+        - mouse events: `x`, `y`, `button` (mousedown/mouseup), `dx`, `dy` (mousemotion/mousewheel)
+        - key events: `key` (name), `keycode`, `scancode`, `mod`, `repeat`
+        - textinput: `text`
+        - resize: `width`, `height`
+        """
+
+        self.type = type
+        self.window = window
+        self.sdl_event = sdl_event
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={v!r}" for k, v in self.__dict__.items() if k not in ("window", "sdl_event"))
+        return f"Event({fields})"
+
+def copy_event(event):
+    """
+    Copy an `SDL_Event`, the one passed to `SDL_PollEvent` is overwritten by the next event.
+    """
+
+    return sdl2.SDL_Event.from_buffer_copy(event)
+
+def translate(event, window):
+    """
+    Returns a teacup `Event` for an `SDL_Event`, or `None` if teacup has no name for it.
+    """
+
+    kind = event.type
+    if kind == sdl2.SDL_WINDOWEVENT:
+        name = _WINDOW_EVENTS.get(event.window.event)
+        if name is None: return None
+
+        result = Event(name, window, event)
+        if name == "resize":
+            result.width = event.window.data1
+            result.height = event.window.data2
+        return result
+
+    name = _TYPES.get(kind)
+    if name is None: return None
+
+    result = Event(name, window, event)
+    if kind == sdl2.SDL_MOUSEMOTION:
+        motion = event.motion
+        result.x, result.y = motion.x, motion.y
+        result.dx, result.dy = motion.xrel, motion.yrel
+        result.buttons = motion.state
+
+    elif kind in (sdl2.SDL_MOUSEBUTTONDOWN, sdl2.SDL_MOUSEBUTTONUP):
+        button = event.button
+        result.x, result.y = button.x, button.y
+        result.button = button.button
+        result.clicks = button.clicks
+
+    elif kind == sdl2.SDL_MOUSEWHEEL:
+        x, y = ctypes.c_int(), ctypes.c_int()
+        sdl2.SDL_GetMouseState(ctypes.byref(x), ctypes.byref(y))
+        result.x, result.y = x.value, y.value
+        result.dx, result.dy = event.wheel.x, event.wheel.y
+
+    elif kind in (sdl2.SDL_KEYDOWN, sdl2.SDL_KEYUP):
+        key = event.key
+        result.keycode = key.keysym.sym
+        result.key = sdl2.SDL_GetKeyName(key.keysym.sym).decode("utf-8")
+        result.scancode = key.keysym.scancode
+        result.mod = key.keysym.mod
+        result.repeat = bool(key.repeat)
+
+    elif kind == sdl2.SDL_TEXTINPUT:
+        result.text = event.text.text.decode("utf-8")
+
+    return result
+
+def window_id(event) -> int:
+    """
+    Returns the id of the window an `SDL_Event` belongs to, 0 if it has none.
+    """
+
+    kind = event.type
+    if kind == sdl2.SDL_WINDOWEVENT: return event.window.windowID
+    if kind == sdl2.SDL_MOUSEMOTION: return event.motion.windowID
+    if kind in (sdl2.SDL_MOUSEBUTTONDOWN, sdl2.SDL_MOUSEBUTTONUP): return event.button.windowID
+    if kind == sdl2.SDL_MOUSEWHEEL: return event.wheel.windowID
+    if kind in (sdl2.SDL_KEYDOWN, sdl2.SDL_KEYUP): return event.key.windowID
+    if kind == sdl2.SDL_TEXTINPUT: return event.text.windowID
+    return 0
+
+def coalesce_motion(pending, event) -> None:
+    """
+    Fold mouse motion `event` into the `pending` copy: latest position & buttons, summed movement.
+    """
+
+    motion = pending.motion
+    new = event.motion
+    motion.x = new.x
+    motion.y = new.y
+    motion.xrel += new.xrel
+    motion.yrel += new.yrel
+    motion.state = new.state
+    motion.timestamp = new.timestamp
+
+class Emitter:
+    __slots__ = ()
+    _handlers = None # name -> list of handlers, created on first use
+
+    def on(self, name : str, handler=None):
+        """
+        Call `handler(event)` whenever a `name` event reaches this object. Can be used as a decorator.
+        """
+
+        if handler is None: # @obj.on("name")
+            return lambda func: self.on(name, func)
+
+        if self._handlers is None:
+            self._handlers = {}
+        self._handlers.setdefault(name, []).append(handler)
+        self._listening()
+        return handler
+
+    def off(self, name : str, handler=None) -> None:
+        """
+        Remove `handler` (or every handler when `None`) from `name` events.
+        """
+
+        if not self._handlers or name not in self._handlers: return
+
+        if handler is None:
+            del self._handlers[name]
+        else:
+            self._handlers[name].remove(handler)
+            if not self._handlers[name]:
+                del self._handlers[name]
+
+    def _listening(self): pass
+
+    def _emit(self, event) -> bool:
+        """
+        Call the handlers registered for the event. Returns `True` if one of them handled it.
+        """
+
+        handlers = self._handlers
+        if not handlers: return False
+
+        for handler in tuple(handlers.get(event.type, ())):
+            if handler(event):
+                return True
+        return False
+
+class EventTarget(Emitter):
+    __slots__ = ("_handlers",)
+
+    def __init__(self) -> None:
+        """
+        Standalone set of handlers, e.g. the global ones registered with `teacup.on`.
+        """
+        self._handlers = None
@@ -1,6 +1,9 @@
+import ctypes
 import os
 import sdl2
-import sdl2.sdlttf as ttf
+from collections import OrderedDict
+from . import atlas
+from . import simulation
 from .draw import RECT
 
 _BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -13,17 +16,49 @@ _fonts = {
     "Noto Sans" : os.path.join(_BASE_DIR, "..", "assets", "NotoSans-Regular.ttf")
 }
 
+_open_fonts = {} # (name, size) -> [TTF_Font, refcount]
+_atlases = {} # (wid, name, size) -> GlyphAtlas
+_metrics = {} # (name, size) -> FontMetrics, None if the font could not be loaded
+_unused_atlases = OrderedDict() # keys of `_atlases` nothing uses, least recently released first
+_unused_metrics = OrderedDict() # same for `_metrics`
+_ttf = None # sdl2.sdlttf once initialized, see `init_fonts`
+
+UNUSED = 8 # atlases & metrics kept after their last user let go, in case the size comes back
+
 def init_fonts():
     """
-    Init both teacup & sdl2 font systems.
+    Init both teacup & sdl2 font systems. Called on the first font load, SDL_ttf is neither
+    imported nor initialized by apps that never draw text. Returns `sdl2.sdlttf`.
     """
-    ttf.TTF_Init()
+
+    global _ttf
+    if _ttf is None:
+        from sdl2 import sdlttf
+        sdlttf.TTF_Init()
+        _ttf = sdlttf
+    return _ttf
 
 def close_fonts():
     """
     Safely exit teacup font api
     """
-    ttf.TTF_Quit()
+
+    for atlas in list(_atlases.values()):
+        atlas.destroy()
+    _atlases.clear()
+    _unused_atlases.clear()
+    _metrics.clear() # their fonts are closed below
+    _unused_metrics.clear()
+
+    global _ttf
+    if _ttf is None: return # never initialized, nothing was opened
+
+    for font_, _ in _open_fonts.values():
+        _ttf.TTF_CloseFont(font_)
+    _open_fonts.clear()
+
+    _ttf.TTF_Quit()
+    _ttf = None
 
 def create_custom_font(path : str, name : str) -> None:
     """
@@ -35,28 +70,436 @@ def create_custom_font(path : str, name : str) -> None:
 def load_font(name : str, size : int):
     """
     Load a font from teacup's font api. Returns `None` if the font could not be found in the api.
+    Handles are shared & refcounted per (name, size), pair every call with `release_font`.
     """
 
+    key = (name, size)
+    entry = _open_fonts.get(key)
+    if entry is not None:
+        entry[1] += 1
+        return entry[0]
+
     if name in _fonts:
-        return ttf.TTF_OpenFont(_fonts[name].encode("utf-8"), size) # convert to bytes
+        font_ = init_fonts().TTF_OpenFont(_fonts[name].encode("utf-8"), size) # convert to bytes
+        if font_:
+            _open_fonts[key] = [font_, 1]
+            return font_
 
     return None
 
+def release_font(name : str, size : int) -> None:
+    """
+    Give back a handle from `load_font`. The font is closed once nothing uses it anymore.
+    """
+
+    entry = _open_fonts.get((name, size))
+    if entry is None: return
+
+    entry[1] -= 1
+    if entry[1] <= 0:
+        _ttf.TTF_CloseFont(entry[0])
+        del _open_fonts[(name, size)]
+
+def get_atlas(wid : int, renderer, name : str, size : int):
+    """
+    Returns the glyph atlas of font `name` at `size` for the renderer of window `wid`. Returns
+    `None` if the font could not be loaded. Pair every atlas returned with `release_atlas`.
+    """
+
+    key = (wid, name, size)
+    atlas = _atlases.get(key)
+    if atlas is None:
+        metrics = get_metrics(name, size)
+        if metrics is None: return None
+
+        atlas = _atlases[key] = GlyphAtlas(renderer, metrics, key)
+    elif atlas.users == 0:
+        del _unused_atlases[key]
+
+    atlas.users += 1
+    return atlas
+
+def release_atlas(atlas) -> None:
+    """
+    Give back an atlas from `get_atlas`. Once nothing uses it, it is kept among the `UNUSED` most
+    recently released atlases and destroyed when it falls out of them.
+    """
+
+    if _atlases.get(atlas.key) is not atlas: return # its window was destroyed
+
+    atlas.users -= 1
+    if atlas.users > 0: return
+
+    _unused_atlases[atlas.key] = None
+    evict_unused()
+
+def evict_unused() -> None:
+    """
+    Destroy the least recently released atlases & metrics beyond the `UNUSED` kept of each. Does
+    nothing on a simulation thread, textures are destroyed on the main thread by the next frame.
+    """
+
+    if simulation.on_worker(): return
+
+    while len(_unused_atlases) > UNUSED:
+        key, _ = _unused_atlases.popitem(last=False)
+        _atlases.pop(key).destroy()
+
+    while len(_unused_metrics) > UNUSED:
+        key, _ = _unused_metrics.popitem(last=False)
+        release_font(*key)
+        del _metrics[key]
+
+def get_metrics(name : str, size : int):
+    """
+    Returns the `FontMetrics` of font `name` at `size`, shared by every window. Returns `None` if
+    the font could not be loaded. Pair every metrics returned with `release_metrics`.
+    """
+
+    key = (name, size)
+    if key not in _metrics:
+        font_ = load_font(name, size) # released once the metrics are evicted
+        _metrics[key] = FontMetrics(font_, name, size) if font_ is not None else None
+
+    metrics = _metrics[key]
+    if metrics is not None:
+        if metrics.users == 0:
+            _unused_metrics.pop(key, None)
+        metrics.users += 1
+    return metrics
+
+def release_metrics(metrics) -> None:
+    """
+    Give back metrics from `get_metrics`. Unused ones are evicted like atlases and close their font.
+    """
+
+    key = (metrics.name, metrics.size)
+    if _metrics.get(key) is not metrics: return # fonts were closed
+
+    metrics.users -= 1
+    if metrics.users > 0: return
+
+    _unused_metrics[key] = None
+    evict_unused()
+
+def measure_text(text : str, name : str = "Inter", size : int = 24, max_width=None) -> tuple:
+    """
+    Returns the (width, height) `text` takes up in font `name` at `size`, wrapped to `max_width`
+    if given, the same as a `Text` with these settings. Only glyph metrics are looked up, nothing
+    is rendered and no window is needed. (0, 0) if the font could not be loaded.
+    """
+
+    metrics = get_metrics(name, size)
+    if metrics is None: return (0, 0)
+
+    lines = metrics.wrap(text, max_width)
+    width = max(metrics.measure(line) for line in lines)
+    height = metrics.lines_height(len(lines))
+    release_metrics(metrics) # stays cached among the unused ones for the next measurement
+    return (width if max_width is None else max_width, height)
+
+def release_window(wid : int) -> None:
+    """
+    Destroy every glyph atlas created for window `wid`. Must run before its renderer is destroyed.
+    """
+
+    for key in [k for k in _atlases if k[0] == wid]:
+        _unused_atlases.pop(key, None)
+        _atlases.pop(key).destroy()
+
 def get_loaded_font_names():
     return list(_fonts.keys())
 
+class FontMetrics:
+    def __init__(self, font_, name : str, size : int) -> None:
+        """
+        Advances & kerning of one font & size, looked up once per glyph (pair) and cached. Text is
+        measured & wrapped with them without rendering anything.
+        """
+
+        self.font = font_
+        self.name = name
+        self.size = size
+        self.height = _ttf.TTF_FontHeight(font_)
+        self.line_skip = _ttf.TTF_FontLineSkip(font_) # distance between the tops of two lines
+        self.users = 0 # see `get_metrics`
+
+        self._glyphs = {} # codepoint -> (advance, leftmost pixel relative to the pen)
+        self._kerning = {} # (previous, codepoint) -> kerning
+        self._scratch = [ctypes.c_int() for _ in range(5)]
+
+    def glyph(self, codepoint : int):
+        """
+        Returns (advance, min x) of `codepoint`.
+        """
+
+        entry = self._glyphs.get(codepoint)
+        if entry is None:
+            minx, maxx, miny, maxy, advance = self._scratch
+            _ttf.TTF_GlyphMetrics32(self.font, codepoint, minx, maxx, miny, maxy, advance)
+            entry = self._glyphs[codepoint] = (advance.value, minx.value)
+        return entry
+
+    def kerning(self, previous : int, codepoint : int) -> int:
+        pair = (previous, codepoint)
+        kerning = self._kerning.get(pair)
+        if kerning is None:
+            kerning = self._kerning[pair] = _ttf.TTF_GetFontKerningSizeGlyphs32(self.font, previous, codepoint)
+        return kerning
+
+    def measure(self, line : str) -> int:
+        """
+        Width of `line` in pixels, newlines are not handled.
+        """
+
+        pen = 0
+        previous = None
+        for char in line:
+            codepoint = ord(char)
+            if previous is not None:
+                pen += self.kerning(previous, codepoint)
+            pen += self.glyph(codepoint)[0]
+            previous = codepoint
+        return pen
+
+    def lines_height(self, count : int) -> int:
+        return self.line_skip * (max(count, 1) - 1) + self.height
+
+    def wrap(self, text : str, max_width=None) -> list:
+        """
+        Split `text` into lines at newlines and, with `max_width`, at the last space that keeps a
+        line within `max_width` pixels. Words longer than a line are broken between characters.
+        """
+
+        lines = []
+        for paragraph in text.split("\n"):
+            if max_width is None:
+                lines.append(paragraph)
+            else:
+                self._wrap(paragraph, max_width, lines)
+        return lines
+
+    def _wrap(self, paragraph, max_width, lines):
+        start = 0 # first character of the current line
+        space = -1 # last space of the current line
+        pen = 0
+        previous = None
+        i = 0
+
+        while i < len(paragraph):
+            char = paragraph[i]
+            codepoint = ord(char)
+            advance = self.glyph(codepoint)[0]
+            if previous is not None:
+                advance += self.kerning(previous, codepoint)
+
+            if pen + advance > max_width and i > start: # does not fit anymore
+                if char == " ": # break right here, the space is dropped
+                    lines.append(paragraph[start:i])
+                    start = i + 1
+                elif space > start: # break after the last word
+                    lines.append(paragraph[start:space])
+                    start = space + 1
+                else: # a single word wider than the line
+                    lines.append(paragraph[start:i])
+                    start = i
+
+                i = start # measure the new line from its start
+                space = -1
+                pen = 0
+                previous = None
+                continue
+
+            if char == " ":
+                space = i
+            pen += advance
+            previous = codepoint
+            i += 1
+
+        lines.append(paragraph[start:])
+
+class GlyphAtlas(atlas.Atlas):
+    PAGE_SIZE = 512
+    PADDING = 1
+    LAYOUTS = 1024 # laid out texts kept per atlas, least recently used ones are dropped
+
+    def __init__(self, renderer, metrics : FontMetrics, key : tuple = None) -> None:
+        """
+        Every glyph of one font & size rendered once in white and packed into shared textures.
+        Text is drawn as a batch of quads out of these textures, tinted with the texture color mod.
+        """
+
+        super().__init__(renderer)
+        self.metrics = metrics
+        self.font = metrics.font
+        self.name = metrics.name
+        self.size = metrics.size
+        self.height = metrics.height
+        self.key = key # (wid, name, size) in `_atlases`
+        self.users = 0 # see `get_atlas`
+
+        self.glyphs = {} # codepoint -> (page, (x, y, w, h)), page is None for blank glyphs
+        self.layouts = OrderedDict() # (text, max width, align) -> TextLayout
+
+    def glyph(self, codepoint : int):
+        """
+        Returns the atlas entry of `codepoint`, rendering it into the atlas the first time.
+        """
+
+        entry = self.glyphs.get(codepoint)
+        if entry is None:
+            entry = self.glyphs[codepoint] = self._add(codepoint)
+        return entry
+
+    def kerning(self, previous : int, codepoint : int) -> int:
+        return self.metrics.kerning(previous, codepoint)
+
+    def _add(self, codepoint):
+        white = sdl2.SDL_Color(255, 255, 255, 255)
+        surface = _ttf.TTF_RenderGlyph32_Blended(self.font, codepoint, white)
+        if not surface: # nothing to draw (e.g. zero width glyph)
+            return (None, None)
+
+        w = surface.contents.w
+        h = surface.contents.h
+        page, x, y = self._reserve(w, h)
+
+        page.blit(surface, x, y)
+        sdl2.SDL_FreeSurface(surface)
+        return (page, (x, y, w, h))
+
+    def layout(self, text : str, max_width=None, align : str = "left"):
+        """
+        Returns a `TextLayout` of `text`, wrapped to `max_width` if given and aligned "left",
+        "center" or "right" within `max_width` (or the widest line). Layouts do not depend on where
+        the text is drawn, laying out the same text again returns the same layout.
+        """
+
+        key = (text, max_width, align)
+        layout = self.layouts.get(key)
+        if layout is not None:
+            self.layouts.move_to_end(key)
+        else:
+            layout = self.layouts[key] = self._layout(text, max_width, align)
+            if len(self.layouts) > self.LAYOUTS:
+                self.layouts.popitem(last=False)
+        return layout
+
+    def _layout(self, text, max_width, align):
+        metrics = self.metrics
+        lines = metrics.wrap(text, max_width)
+        box = max(metrics.measure(line) for line in lines) if max_width is None else max_width
+
+        height = metrics.lines_height(len(lines))
+        quads = {} # page -> list of (x, y, src rect)
+        ink = [0, 0, box, height] # x0, y0, x1, y1 of every pixel drawn
+        for row, line in enumerate(lines):
+            pen = 0
+            if align != "left": # trailing spaces are not aligned
+                free = box - metrics.measure(line.rstrip(" "))
+                pen = free // 2 if align == "center" else free
+
+            y = row * metrics.line_skip
+            previous = None
+            for char in line:
+                codepoint = ord(char)
+                if previous is not None:
+                    pen += metrics.kerning(previous, codepoint)
+
+                page, src = self.glyph(codepoint)
+                advance, minx = metrics.glyph(codepoint)
+                if page is not None: # rendered glyphs start at the leftmost pixel left of the pen
+                    left = pen + min(0, minx)
+                    quads.setdefault(page, []).append((left, y, src))
+                    _, _, w, h = src # e.g. "j" inks left of the pen, italics past the advance
+                    ink[0] = min(ink[0], left)
+                    ink[1] = min(ink[1], y)
+                    ink[2] = max(ink[2], left + w)
+                    ink[3] = max(ink[3], y + h)
+
+                pen += advance
+                previous = codepoint
+
+        return TextLayout(height, box, quads, tuple(ink))
+
+    def destroy(self):
+        super().destroy()
+        self.glyphs.clear()
+        self.layouts.clear()
+        release_metrics(self.metrics)
+
+class TextLayout:
+    def __init__(self, height : int, width : int = 0, quads : dict = None, ink : tuple = None) -> None:
+        """
+        Positioned glyph quads of a piece of text, grouped per atlas page. Vertices are relative to
+        the text origin and built once, texts are moved by translating the command buffer so every
+        text showing the same layout shares its vertices. `ink` (x0, y0, x1, y1) contains the box
+        and every glyph, which may reach outside of it.
+        """
+
+        self.width = width
+        self.height = height
+        self.ink = (0, 0, width, height) if ink is None else ink
+        self._quads = {} if quads is None else quads # page -> list of (x, y, src rect)
+        self._batches = None # what `batches` hands out
+
+    def batches(self):
+        """
+        Returns a list of (atlas page, SDL_Vertex array) with the text's upper left corner at (0, 0).
+        """
+
+        if self._batches is None:
+            self._batches = []
+            for page, quads in self._quads.items():
+                vertices = (sdl2.SDL_Vertex * (6 * len(quads)))()
+                _fill_quads(vertices, quads, page.width)
+                self._batches.append((page, vertices))
+        return self._batches
+
+def _fill_quads(vertices, quads, page_size):
+    """
+    Write two triangles per glyph into `vertices`.
+    """
+
+    scale = 1 / page_size
+    i = 0
+    for qx, qy, (sx, sy, w, h) in quads:
+        x0 = qx
+        y0 = qy
+        x1 = x0 + w
+        y1 = y0 + h
+        u0 = sx * scale
+        v0 = sy * scale
+        u1 = (sx + w) * scale
+        v1 = (sy + h) * scale
+
+        for px, py, u, v in ((x0, y0, u0, v0), (x1, y0, u1, v0), (x1, y1, u1, v1),
+                             (x0, y0, u0, v0), (x1, y1, u1, v1), (x0, y1, u0, v1)):
+            vertex = vertices[i]
+            vertex.position.x = px
+            vertex.position.y = py
+            vertex.color.r = vertex.color.g = vertex.color.b = vertex.color.a = 255
+            vertex.tex_coord.x = u
+            vertex.tex_coord.y = v
+            i += 1
+
 class TEXT(RECT):
     def __init__(self, name="text"):
         super().__init__(name)
     
-    def _render(self, pipe, renderer):
+    def _render(self, pipe, commands):
         # unload pipe
-        x, y, w, h = pipe["geometry"] # borrows the same geometry from teacup.draw.RECT
-        r, g, b, a = pipe["style"]["color"] # text uses color instead of background-color
+        geometry = pipe["geometry"] # borrows the same geometry from teacup.draw.RECT
+        color = pipe["style"]["color"] # text uses color instead of background-color
 
-        super()._render(pipe, renderer) # render the background rectangle
-        rect = sdl2.SDL_Rect(x, y, w, h) # destination
-        
-        sdl2.SDL_SetRenderDrawColor(renderer, r, g, b, a)
-        sdl2.SDL_RenderCopy(renderer, pipe["texture"], None, rect) # render the texture
+        super()._render(pipe, commands) # render the background rectangle
+
+        # glyphs are white in the atlas, the color is applied as the texture's color mod
+        layout = pipe["layout"]
+        x0, y0, x1, y1 = layout.ink
+        x, y, _, _ = geometry
+        commands.translate(x, y) # the layout's vertices are relative to the text
+        for page, vertices in layout.batches(): # pages are uploaded when flushed
+            commands.geometry(page, color, vertices, (x0, y0, x1 - x0, y1 - y0))
+        commands.translate(-x, -y)
         
@@ -0,0 +1,176 @@
+import ctypes
+import mmap
+import os
+import sdl2
+from . import atlas
+from .draw import Shape
+
+_atlases = {} # wid -> ImageAtlas
+_sdlimage = None # sdl2.sdlimage once imported, False if it is not available
+
+def _image_module():
+    """
+    SDL2_image is only needed once an image is loaded, import it on first use. Without it only
+    .bmp files can be read.
+    """
+
+    global _sdlimage
+    if _sdlimage is None:
+        try:
+            from sdl2 import sdlimage
+            sdlimage.IMG_Init(sdlimage.IMG_INIT_PNG | sdlimage.IMG_INIT_JPG)
+            _sdlimage = sdlimage
+        except Exception: # missing module or missing SDL2_image library
+            _sdlimage = False
+    return _sdlimage
+
+def decode(path : str):
+    """
+    Decode the image at `path` into a new RGBA32 `SDL_Surface`, returns `None` on failure. The file
+    is memory mapped and decoded straight from the mapping, it is never read into a python buffer.
+    """
+
+    try:
+        with open(path, "rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY) # private, pages are read lazily
+    except (OSError, ValueError): # missing or empty file
+        return None
+
+    try:
+        data = (ctypes.c_char * len(mapping)).from_buffer(mapping)
+        rw = sdl2.SDL_RWFromConstMem(data, len(mapping))
+
+        sdlimage = _image_module()
+        if sdlimage:
+            surface = sdlimage.IMG_Load_RW(rw, 1) # frees rw
+        else:
+            surface = sdl2.SDL_LoadBMP_RW(rw, 1)
+        del data # release the mapping before closing it
+    finally:
+        mapping.close()
+
+    if not surface: return None
+
+    converted = sdl2.SDL_ConvertSurfaceFormat(surface, sdl2.SDL_PIXELFORMAT_RGBA32, 0)
+    sdl2.SDL_FreeSurface(surface)
+    return converted or None
+
+def get_atlas(wid : int, renderer):
+    """
+    Returns the image atlas of the renderer of window `wid`.
+    """
+
+    images = _atlases.get(wid)
+    if images is None:
+        images = _atlases[wid] = ImageAtlas(renderer)
+    return images
+
+def release_window(wid : int) -> None:
+    """
+    Destroy the image atlas of window `wid`. Must run before its renderer is destroyed.
+    """
+
+    images = _atlases.pop(wid, None)
+    if images is not None:
+        images.destroy()
+
+def close_images() -> None:
+    for images in _atlases.values():
+        images.destroy()
+    _atlases.clear()
+
+    if _sdlimage:
+        _sdlimage.IMG_Quit()
+
+class ImageAtlas(atlas.Atlas):
+    PAGE_SIZE = 1024
+    MAX_PACKED = 256 # larger images get a page of their own
+
+    def __init__(self, renderer) -> None:
+        """
+        Every image a renderer has drawn, decoded once per path. Small images share atlas pages so
+        sprites out of the same page are drawn together as one batch.
+        """
+
+        super().__init__(renderer)
+        self.images = {} # path -> (page, (x, y, w, h)) or None if it could not be loaded
+        self.single = [] # pages holding one large image
+
+    def get(self, path : str):
+        """
+        Returns (page, (x, y, w, h)) of the image at `path`, loading it on first use. Returns `None`
+        if it could not be loaded.
+        """
+
+        key = os.path.abspath(path)
+        if key in self.images:
+            return self.images[key]
+
+        entry = None
+        surface = decode(path)
+        if surface:
+            w = surface.contents.w
+            h = surface.contents.h
+
+            if w > self.MAX_PACKED or h > self.MAX_PACKED:
+                page = atlas.Page(self.renderer, w, h)
+                self.single.append(page)
+                x = y = 0
+            else:
+                page, x, y = self._reserve(w, h)
+
+            page.blit(surface, x, y)
+            sdl2.SDL_FreeSurface(surface)
+            entry = (page, (x, y, w, h))
+
+        self.images[key] = entry
+        return entry
+
+    def destroy(self):
+        super().destroy()
+        for page in self.single:
+            page.destroy()
+        self.single.clear()
+        self.images.clear()
+
+def fill_quad(vertices, dst, src, page, color=(255, 255, 255, 255)):
+    """
+    Write the two triangles drawing the `src` (x, y, w, h) area of `page` onto `dst` (x, y, w, h).
+    `color` (rgba) is stored in the vertices so differently tinted images still share a batch.
+    """
+
+    r, g, b, a = color
+
+    x0, y0, w, h = dst
+    x1 = x0 + w
+    y1 = y0 + h
+
+    sx, sy, sw, sh = src
+    u0 = sx / page.width
+    v0 = sy / page.height
+    u1 = (sx + sw) / page.width
+    v1 = (sy + sh) / page.height
+
+    for i, (px, py, u, v) in enumerate(((x0, y0, u0, v0), (x1, y0, u1, v0), (x1, y1, u1, v1),
+                                        (x0, y0, u0, v0), (x1, y1, u1, v1), (x0, y1, u0, v1))):
+        vertex = vertices[i]
+        vertex.position.x = px
+        vertex.position.y = py
+        vertex.color.r = r
+        vertex.color.g = g
+        vertex.color.b = b
+        vertex.color.a = a
+        vertex.tex_coord.x = u
+        vertex.tex_coord.y = v
+
+class IMAGE(Shape):
+    def __init__(self, name="image"):
+        super().__init__(name)
+
+    def _render(self, pipe, commands):
+        page = pipe["page"]
+        if page is None: # not loaded (yet)
+            return super()._render(pipe, commands)
+
+        commands.geometry(page, (255, 255, 255, 255), pipe["vertices"], pipe["geometry"]) # uploaded when flushed
+        return super()._render(pipe, commands)
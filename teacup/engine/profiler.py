@@ -0,0 +1,105 @@
+import time
+from collections import defaultdict
+
+"""
+Opt-in per frame instrumentation of `display`. While disabled every hook is skipped behind a single
+`if profiler.enabled` check.
+"""
+
+enabled = False
+overlay = False # draw the results in the corner of every window
+
+_phases = defaultdict(float) # seconds spent per phase in the current frame
+_classes = defaultdict(float) # seconds spent in `_render` per screen object class
+_counters = defaultdict(int)
+_mark = 0.0
+
+results = { # last finished frame, updated in place
+    "frames": 0,
+    "phases": {},
+    "classes": {},
+    "counters": {},
+}
+
+def enable(show_overlay : bool = False) -> None:
+    """
+    Start profiling every frame. With `show_overlay` the results are drawn on top of every window.
+    """
+
+    global enabled, overlay, _mark
+    reset()
+    enabled = True
+    overlay = show_overlay
+    _mark = time.perf_counter()
+
+def disable() -> None:
+    """
+    Stop profiling, the last results stay available through `stats()`.
+    """
+
+    global enabled, overlay
+    enabled = False
+    overlay = False
+
+def reset() -> None:
+    """
+    Forget all recorded results.
+    """
+
+    _phases.clear()
+    _classes.clear()
+    _counters.clear()
+    results["frames"] = 0
+    results["phases"] = {}
+    results["classes"] = {}
+    results["counters"] = {}
+
+def stats() -> dict:
+    """
+    Returns the results of the last profiled frame: time per `phases` & per screen object `classes`
+    in milliseconds and per frame `counters` (SDL calls, textures created...). The same dict is
+    updated every frame.
+    """
+
+    return results
+
+def mark(phase : str) -> None:
+    """
+    Add the time since the previous mark to `phase`.
+    """
+
+    global _mark
+    now = time.perf_counter()
+    _phases[phase] += now - _mark
+    _mark = now
+
+def add_class(name : str, seconds : float) -> None:
+    _classes[name] += seconds
+
+def count(name : str, n : int = 1) -> None:
+    if enabled:
+        _counters[name] += n
+
+def end_frame() -> None:
+    """
+    Publish the current frame to `results` and start a new one.
+    """
+
+    results["frames"] += 1
+    results["phases"] = {k: v * 1000 for k, v in _phases.items()}
+    results["classes"] = {k: v * 1000 for k, v in _classes.items()}
+    results["counters"] = dict(_counters)
+
+    _phases.clear()
+    _classes.clear()
+    _counters.clear()
+
+def summary() -> str:
+    """
+    Short text version of the results with one line per entry, used by the overlay.
+    """
+
+    lines = [f"{k}: {v:.2f}ms" for k, v in results["phases"].items()]
+    lines += [f"{k}: {v:.2f}ms" for k, v in sorted(results["classes"].items(), key=lambda i: -i[1])]
+    lines += [f"{k}: {v}" for k, v in results["counters"].items()]
+    return "\n".join(lines)
@@ -0,0 +1,168 @@
+import ctypes
+import json
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+import sdl2
+
+"""
+Frame recording of a window, see `Window.start_recording`. Presented frames are read back into a
+small ring of preallocated buffers and handed to encoder threads that write a PNG sequence, the
+render loop only pays for the read back. When every buffer is still waiting for an encoder the frame
+is dropped and counted instead of stalling the frame.
+"""
+
+class Recorder:
+    def __init__(self, path : str, buffers : int = 8, threads : int = 2, compression : int = 1) -> None:
+        """
+        Writes the frames it captures to `path` (a directory, created if needed) as `frame_000000.png`,
+        `frame_000001.png`... and, once stopped, `frames.json` listing every frame with the seconds
+        since the recording started. Frames are only captured when the window redraws, a frame is
+        shown until the time of the next one.
+
+        - `buffers` (int): frames that can wait for an encoder before new ones are dropped
+        - `threads` (int): encoder threads, zlib releases the gil while compressing
+        - `compression` (int): zlib level 0-9, 0 stores frames uncompressed & fastest
+        """
+
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.compression = compression
+        self.frames = 0 # frames handed to the encoders
+        self.dropped = 0 # frames skipped because every buffer was busy
+        self.error = None # first exception raised by an encoder
+
+        self._buffers = max(1, buffers)
+        self._free = [] # (width, height, buffer) ready to be read into
+        self._allocated = 0
+        self._lock = threading.Lock() # guards `_free`
+        self._times = [] # (file name, seconds) of every captured frame
+        self._start = time.perf_counter()
+
+        self._jobs = queue.SimpleQueue()
+        self._threads = [threading.Thread(target=self._encode, name="teacup recorder", daemon=True)
+                         for _ in range(max(1, threads))]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def recording(self) -> bool:
+        return bool(self._threads)
+
+    def capture(self, renderer, width : int, height : int) -> bool:
+        """
+        Read the current frame of `renderer` back and queue it for encoding, call before it is
+        presented. Returns `False` if the frame was dropped.
+        """
+
+        if not self._threads: return False
+
+        buffer = self._buffer(width, height)
+        if buffer is None: # encoders are behind, never wait for them
+            self.dropped += 1
+            return False
+
+        if sdl2.SDL_RenderReadPixels(renderer, None, sdl2.SDL_PIXELFORMAT_RGB24, buffer[2], width * 3) != 0:
+            self._give_back(buffer)
+            self.dropped += 1
+            return False
+
+        name = f"frame_{self.frames:06d}.png"
+        self._times.append((name, time.perf_counter() - self._start))
+        self.frames += 1
+        self._jobs.put((name, buffer))
+        return True
+
+    def _buffer(self, width, height):
+        """
+        Returns a free (width, height, buffer), allocating up to `buffers` of them. Buffers of a
+        previous size (the window was resized) are replaced.
+        """
+
+        with self._lock:
+            while self._free:
+                buffer = self._free.pop()
+                if buffer[0] == width and buffer[1] == height:
+                    return buffer
+                self._allocated -= 1
+
+            if self._allocated == self._buffers:
+                return None
+            self._allocated += 1
+
+        return (width, height, (ctypes.c_uint8 * (width * height * 3))())
+
+    def _give_back(self, buffer):
+        with self._lock:
+            self._free.append(buffer)
+
+    def _encode(self):
+        while True:
+            job = self._jobs.get()
+            if job is None: return # stopped
+
+            name, buffer = job
+            try:
+                width, height, pixels = buffer
+                data = _filtered(memoryview(pixels), width * 3, height)
+                self._give_back(buffer) # rows were copied, the buffer can take the next frame
+                buffer = None
+
+                with open(os.path.join(self.path, name), "wb") as f:
+                    f.write(_png(data, width, height, self.compression))
+            except Exception as error:
+                if self.error is None:
+                    self.error = error
+            finally:
+                if buffer is not None:
+                    self._give_back(buffer)
+
+    def stop(self) -> dict:
+        """
+        Wait for the queued frames to be written, write `frames.json` and return it as a dict.
+        Raises the first exception an encoder ran into.
+        """
+
+        threads, self._threads = self._threads, []
+        for _ in threads:
+            self._jobs.put(None)
+        for thread in threads:
+            thread.join()
+
+        summary = {
+            "frames": [{"file": name, "time": seconds} for name, seconds in self._times],
+            "dropped": self.dropped,
+        }
+        if threads:
+            with open(os.path.join(self.path, "frames.json"), "w") as f:
+                json.dump(summary, f, indent=1)
+
+        if self.error is not None:
+            raise self.error
+        return summary
+
+def _filtered(pixels, row, height):
+    """
+    Copy rows of `row` bytes into PNG scanlines, each starting with filter type 0 (none).
+    """
+
+    data = bytearray((row + 1) * height)
+    for y in range(height):
+        start = y * (row + 1) + 1
+        data[start:start + row] = pixels[y * row:(y + 1) * row]
+    return data
+
+def _chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+def _png(data, width, height, compression):
+    """
+    Returns a complete 8 bit RGB PNG file of the filtered scanlines `data`.
+    """
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0) # rgb, no interlacing
+    return (b"\x89PNG\r\n\x1a\n" + _chunk(b"IHDR", header)
+            + _chunk(b"IDAT", zlib.compress(data, compression)) + _chunk(b"IEND", b""))
@@ -0,0 +1,111 @@
+import contextlib
+import threading
+import time
+
+from . import clock
+
+class _Worker(threading.Thread):
+    pass
+
+def on_worker() -> bool:
+    """
+    Returns `True` when called from a simulation thread. SDL must only be used from the main
+    thread, code reachable from both checks this to leave SDL work for the next frame.
+    """
+
+    return isinstance(threading.current_thread(), _Worker)
+
+class Simulation:
+    def __init__(self, update, rate : float = 60, publish=None) -> None:
+        """
+        Runs `update(dt)` on a worker thread `rate` times a second. Every call holds `lock` from
+        start to end and is followed by `publish()` while still holding it, which records a frame of
+        the finished step. The main thread presents published frames without waiting for the lock
+        while the next step is already running.
+
+        - `update` (callable): simulation step, receives the seconds since the previous step
+        - `rate` (float): steps per second, uncapped if `rate <= 0`
+        - `publish` (callable | None): called after every step, with the lock held
+        """
+
+        self.update = update
+        self.rate = rate
+        self.publish = publish
+        self.lock = threading.RLock() # hold it to touch the scene from anywhere else
+        self.error = None # exception that stopped the worker
+
+        self._clock = clock.Clock()
+        self._clock.SPIN = 0 # busy waiting would hold the gil the renderer needs
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running: return
+
+        self._stop.clear()
+        self._thread = _Worker(target=self._run, name="teacup simulation", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout : float = 1.0) -> None:
+        """
+        Ask the worker to finish its current step and wait for it.
+        """
+
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    @contextlib.contextmanager
+    def unlocked(self):
+        """
+        Release the lock for a part of `update` that does not touch the scene (e.g. heavy math on
+        arrays of your own), the main thread can render meanwhile.
+
+            def update(dt):
+                with sim.unlocked():
+                    positions = integrate(state, dt)
+                balls.x = positions[:, 0]
+        """
+
+        self.lock.release()
+        try:
+            yield
+        finally:
+            self.lock.acquire()
+
+    def check(self) -> None:
+        """
+        Raise the exception the worker died with, if any.
+        """
+
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def stats(self) -> dict:
+        """
+        Step time statistics, same format as `teacup.frame_stats`.
+        """
+
+        return self._clock.stats()
+
+    def _run(self):
+        self._clock.tick(self.rate) # start the schedule
+        while not self._stop.is_set():
+            dt = self._clock.tick(self.rate)
+            try:
+                with self.lock:
+                    self.update(dt)
+                    if self.publish is not None:
+                        self.publish()
+            except BaseException as e:
+                self.error = e
+                return
+
+            if self.rate <= 0:
+                time.sleep(0) # let the renderer take the lock
@@ -0,0 +1,153 @@
+class SpatialGrid:
+    MAX_CELLS = 64 # objects covering more cells than this are kept in a separate list
+
+    def __init__(self, cell_size : int = 128) -> None:
+        """
+        Uniform grid of object bounding boxes (x, y, w, h). Used by windows to skip children that are
+        off screen and to find the children under a point.
+        """
+
+        self.cell_size = cell_size
+        self._cells = {} # (column, row) -> set of objects
+        self._entries = {} # object -> (bounds, cells it is stored in)
+        self._large = set() # huge objects & objects without bounds, always checked
+        self.version = 0 # bumped on every change, lets callers reuse query results
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, obj):
+        return obj in self._entries
+
+    def _span(self, bounds):
+        x, y, w, h = bounds
+        size = self.cell_size
+        return (int(x // size), int(y // size), int((x + max(w, 1) - 1) // size), int((y + max(h, 1) - 1) // size))
+
+    def insert(self, obj, bounds) -> None:
+        """
+        Add `obj` covering `bounds`. `None` bounds means unknown, the object matches every query.
+        """
+
+        if obj in self._entries:
+            return self.update(obj, bounds)
+
+        cells = None
+        if bounds is None:
+            self._large.add(obj)
+        else:
+            c0, r0, c1, r1 = span = self._span(bounds)
+            if (c1 - c0 + 1) * (r1 - r0 + 1) > self.MAX_CELLS:
+                self._large.add(obj)
+            else:
+                cells = span
+                grid = self._cells
+                for column in range(c0, c1 + 1):
+                    for row in range(r0, r1 + 1):
+                        cell = grid.get((column, row))
+                        if cell is None:
+                            cell = grid[(column, row)] = set()
+                        cell.add(obj)
+
+        self._entries[obj] = (bounds, cells)
+        self.version += 1
+
+    def remove(self, obj) -> None:
+        entry = self._entries.pop(obj, None)
+        if entry is None: return
+        self.version += 1
+
+        cells = entry[1]
+        if cells is None:
+            self._large.discard(obj)
+            return
+
+        c0, r0, c1, r1 = cells
+        grid = self._cells
+        for column in range(c0, c1 + 1):
+            for row in range(r0, r1 + 1):
+                cell = grid[(column, row)]
+                cell.discard(obj)
+                if not cell:
+                    del grid[(column, row)]
+
+    def update(self, obj, bounds) -> None:
+        """
+        Move `obj` to new `bounds`. Cheap when it stays within the same cells.
+        """
+
+        entry = self._entries.get(obj)
+        if entry is not None and entry[1] is not None and bounds is not None and self._span(bounds) == entry[1]:
+            self._entries[obj] = (bounds, entry[1]) # same cells
+            self.version += 1
+            return
+
+        self.remove(obj)
+        self.insert(obj, bounds)
+
+    def bounds(self, obj):
+        entry = self._entries.get(obj)
+        return entry[0] if entry is not None else None
+
+    def query_rect(self, rect) -> list:
+        """
+        Returns every object whose bounds intersect `rect` (x, y, w, h) once, in no particular order.
+        """
+
+        found = []
+        entries = self._entries
+        c0, r0, c1, r1 = self._span(rect)
+
+        # filter while collecting instead of building a union of the cells, keeps scratch memory low
+        if (c1 - c0 + 1) * (r1 - r0 + 1) > len(self._cells): # faster to walk the filled cells
+            for (column, row), cell in self._cells.items():
+                _collect(found, cell, entries, rect, column, row, c0, r0)
+        else:
+            grid = self._cells
+            for column in range(c0, c1 + 1):
+                for row in range(r0, r1 + 1):
+                    cell = grid.get((column, row))
+                    if cell:
+                        _collect(found, cell, entries, rect, column, row, c0, r0)
+
+        for obj in self._large:
+            if _overlaps(entries[obj][0], rect):
+                found.append(obj)
+        return found
+
+    def query_point(self, x, y) -> set:
+        """
+        Returns every object whose bounds contain the point (x, y).
+        """
+
+        size = self.cell_size
+        found = set(self._cells.get((int(x // size), int(y // size)), ()))
+        found |= self._large
+
+        entries = self._entries
+        return {obj for obj in found if _contains(entries[obj][0], x, y)}
+
+def _collect(found, objects, entries, rect, column, row, c0, r0):
+    """
+    Appends the `objects` of cell (column, row) intersecting `rect`, whose span starts at column
+    `c0` & row `r0`. An object stored in several cells is only taken from the first one it shares
+    with the span, so no set of the objects already seen is needed.
+    """
+
+    for obj in objects:
+        bounds, cells = entries[obj]
+        if not _overlaps(bounds, rect): continue
+
+        if cells[0] == cells[2] and cells[1] == cells[3]:
+            found.append(obj) # stored in one place only
+        elif min(max(cells[0], c0), cells[2]) == column and min(max(cells[1], r0), cells[3]) == row:
+            found.append(obj)
+
+def _overlaps(bounds, rect):
+    if bounds is None: return True
+    return bounds[0] < rect[0] + rect[2] and rect[0] < bounds[0] + bounds[2] and \
+        bounds[1] < rect[1] + rect[3] and rect[1] < bounds[1] + bounds[3]
+
+def _contains(bounds, x, y):
+    if bounds is None: return True
+    return bounds[0] <= x < bounds[0] + bounds[2] and bounds[1] <= y < bounds[1] + bounds[3]
@@ -1,3 +1,6 @@
+import weakref
+from collections.abc import Mapping, MutableMapping
+
 def get_style_template() -> dict:
     """
     Returns the default style templated used by all objects
@@ -8,4 +11,369 @@ def get_style_template() -> dict:
         "background-color": (0, 0, 0, 0),
         "font-size": 24,
         "font-family": "Inter",
+        "text-align": "left",
+        "opacity": 1.0,
     }
+
+# keys children take over from their parent (window or group) unless set otherwise
+INHERITED = ("color", "font-size", "font-family", "text-align")
+
+_records = weakref.WeakValueDictionary() # every live StyleRecord by its items
+_plain = {} # own style -> `compute` of objects without rules or inherited keys
+
+class StyleRecord(Mapping):
+    __slots__ = ("_values", "_key", "__weakref__")
+
+    def __init__(self, values : dict, key : tuple) -> None:
+        """
+        Immutable style shared by every object styled the same way, create them with `intern`.
+        Records are unique per content so two records are equal only if they are the same object.
+        """
+
+        self._values = values
+        self._key = key
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, key):
+        return key in self._values
+
+    def get(self, key, default=None):
+        return self._values.get(key, default)
+
+    def __eq__(self, other):
+        if isinstance(other, StyleRecord):
+            return self is other
+        return Mapping.__eq__(self, other)
+
+    def __hash__(self):
+        return id(self)
+
+    def __repr__(self):
+        return f"StyleRecord({self._values!r})"
+
+    def replace(self, key, value) -> "StyleRecord":
+        """
+        Returns the record with `key` set to `value`.
+        """
+
+        value = _freeze(value)
+        if self._values.get(key, _MISSING) == value: return self
+
+        values = dict(self._values)
+        values[key] = value
+        return intern(values)
+
+    def without(self, key) -> "StyleRecord":
+        """
+        Returns the record with `key` removed.
+        """
+
+        values = dict(self._values)
+        del values[key]
+        return intern(values)
+
+_MISSING = object()
+
+def _freeze(value):
+    return tuple(value) if isinstance(value, list) else value # colors given as lists
+
+def intern(values : dict) -> StyleRecord:
+    """
+    Returns the shared `StyleRecord` holding exactly `values`.
+    """
+
+    values = {k: _freeze(v) for k, v in values.items()}
+    key = tuple(sorted(values.items()))
+
+    record = _records.get(key)
+    if record is None:
+        record = _records[key] = StyleRecord(values, key)
+    return record
+
+def create(values : dict = None) -> StyleRecord:
+    """
+    Returns the record of the default style template updated with `values`.
+    """
+
+    template = get_style_template()
+    if values:
+        template.update(values)
+    return intern(template)
+
+def compute(rules, inherited : StyleRecord = None, inline : StyleRecord = None) -> tuple:
+    """
+    Returns (computed style, inherited keys for the children) of an object: the template, then
+    what it `inherited`, then the records in `rules` and finally its `inline` style, each one
+    overriding the ones before.
+    """
+
+    plain = not rules and inherited is None # e.g. every object before it is attached
+    if plain and inline in _plain:
+        return _plain[inline]
+
+    values = get_style_template()
+    passed = {}
+    for layer in (inherited, *rules, inline):
+        if layer:
+            values.update(layer._values)
+            passed.update((key, value) for key, value in layer._values.items() if key in INHERITED)
+    entry = (intern(values), intern(passed) if passed else None)
+
+    if plain:
+        if len(_plain) >= Stylesheet.MAX_COMPUTED:
+            _plain.clear()
+        _plain[inline] = entry
+    return entry
+
+def parse_selector(selector : str) -> tuple:
+    """
+    Returns (type or `None`, frozenset of classes) of a selector such as `text.title.large`.
+    """
+
+    kind, *classes = selector.strip().split(".")
+    if not (kind or classes) or not all(classes):
+        raise ValueError(f"invalid selector {selector!r}")
+    return kind or None, frozenset(classes)
+
+def _matches(kind, classes, signature):
+    return (kind is None or kind == signature[0]) and classes <= signature[1]
+
+class Style(MutableMapping):
+    __slots__ = ("_owner",)
+
+    def __init__(self, owner) -> None:
+        """
+        Dict-like view of an object's computed style. Writing a key such as `obj.style["color"] = ...`
+        sets it in the object's own style, swaps its (shared) `StyleRecord` for an updated one and
+        tells the object to redraw. Deleting a key of the own style falls back to stylesheet rules,
+        the parent or the template.
+        """
+
+        self._owner = owner
+
+    def __getitem__(self, key):
+        return self._owner._style[key]
+
+    def __setitem__(self, key, value):
+        self._owner._set_inline(key, value)
+
+    def __delitem__(self, key):
+        self._owner._del_inline(key)
+
+    def __iter__(self):
+        return iter(self._owner._style)
+
+    def __len__(self):
+        return len(self._owner._style)
+
+    def __repr__(self):
+        return repr(dict(self._owner._style))
+
+    def copy(self) -> dict:
+        return dict(self._owner._style)
+
+    @property
+    def record(self) -> StyleRecord:
+        """
+        The immutable record currently backing this style.
+        """
+        return self._owner._style
+
+class Stylesheet(MutableMapping):
+    MAX_COMPUTED = 4096 # resolved combinations kept before starting over
+
+    def __init__(self, rules : dict = None) -> None:
+        """
+        Style rules of every window using this sheet, by selector:
+
+            sheet[".button"] = {"background-color": (40, 40, 40, 255)}
+            sheet["text.title"] = {"font-size": 32}
+
+        A selector is a type (the object's `name`: `rectangle`, `text`, `group`, `window`...) and/or
+        any number of `.classes`, all of which an object must have. Styles are computed from the
+        template, the `INHERITED` keys of the parent, the matching rules (more classes first, then
+        type, then the order rules were added in, later ones win) and the object's own style.
+
+        Every combination is resolved once into a shared `StyleRecord`. Setting or deleting a rule
+        only restyles the objects it matches, and their children if what they inherit changed.
+        """
+
+        self._rules = {} # selector -> (type, classes, record, position)
+        self._position = 0
+        self._matched = {} # (type, classes) -> records of the matching rules in cascade order
+        self._computed = {} # ((type, classes), inherited, inline) -> (computed, inherited keys)
+        self._members = {} # (type, classes) -> WeakSet of the objects styled by this sheet
+        if rules:
+            self.update(rules)
+
+    def __getitem__(self, selector):
+        return dict(self._rules[selector][2])
+
+    def __setitem__(self, selector, values : dict):
+        kind, classes = parse_selector(selector)
+        previous = self._rules.get(selector)
+        if previous is None:
+            self._position += 1
+            position = self._position
+        else: # keeps its place in the cascade
+            position = previous[3]
+            if previous[2] == intern(values): return
+
+        self._rules[selector] = (kind, classes, intern(values), position)
+        self._changed(kind, classes)
+
+    def __delitem__(self, selector):
+        kind, classes, _, _ = self._rules.pop(selector)
+        self._changed(kind, classes)
+
+    def __iter__(self):
+        return iter(self._rules)
+
+    def __len__(self):
+        return len(self._rules)
+
+    def __repr__(self):
+        return f"Stylesheet({ {selector: dict(rule[2]) for selector, rule in self._rules.items()}!r})"
+
+    def resolve(self, signature : tuple, inherited : StyleRecord = None, inline : StyleRecord = None) -> tuple:
+        """
+        Returns `compute` of an object with `signature` (type, classes), cached.
+        """
+
+        key = (signature, inherited, inline)
+        entry = self._computed.get(key)
+        if entry is None:
+            if len(self._computed) >= self.MAX_COMPUTED:
+                self._computed.clear()
+            entry = self._computed[key] = compute(self._match(signature), inherited, inline)
+        return entry
+
+    def _match(self, signature):
+        matched = self._matched.get(signature)
+        if matched is None:
+            rules = sorted((rule for rule in self._rules.values() if _matches(rule[0], rule[1], signature)),
+                           key=lambda rule: (len(rule[1]), rule[0] is not None, rule[3]))
+            matched = self._matched[signature] = tuple(rule[2] for rule in rules)
+        return matched
+
+    def _join(self, obj, signature) -> None:
+        members = self._members.get(signature)
+        if members is None:
+            members = self._members[signature] = weakref.WeakSet()
+        members.add(obj)
+
+    def _leave(self, obj, signature) -> None:
+        members = self._members.get(signature)
+        if members is not None:
+            members.discard(obj)
+
+    def _changed(self, kind, classes):
+        """
+        A rule matching `kind` & `classes` changed, restyle the objects it applies to.
+        """
+
+        affected = {signature for signature in self._members if _matches(kind, classes, signature)}
+        affected.update(signature for signature in self._matched if _matches(kind, classes, signature))
+        for signature in affected:
+            self._matched.pop(signature, None)
+        self._computed = {key: entry for key, entry in self._computed.items() if key[0] not in affected}
+
+        for signature in affected:
+            for obj in list(self._members.get(signature, ())):
+                obj._restyle()
+
+stylesheet = Stylesheet() # used by windows created without a stylesheet of their own
+
+class Styled:
+    """
+    Style of screen objects & windows: their own (inline) style, their `classes` and the computed
+    style in `_style` they are drawn with. Subclasses provide `_stylesheet`, `_style_parent`,
+    `_style_type`, `_style_children` (`None` for objects that never have children) & `_set_style`.
+    """
+
+    __slots__ = ()
+
+    @property
+    def style(self):
+        """
+        The computed style of this object. Writing to it sets the object's own style, which wins
+        over stylesheet rules & inherited keys.
+        """
+
+        if self._style_view is None:
+            self._style_view = Style(self)
+        return self._style_view
+
+    @style.setter
+    def style(self, value : dict):
+        self._inline = intern(value) if value else None
+        self._restyle()
+
+    @property
+    def classes(self) -> frozenset:
+        """
+        Stylesheet classes of this object, set with a string (`"button primary"`) or any iterable.
+        """
+        return self._classes
+
+    @classes.setter
+    def classes(self, value):
+        classes = frozenset(value.split() if isinstance(value, str) else value)
+        if classes == self._classes: return
+
+        sheet = self._stylesheet()
+        if sheet is not None:
+            sheet._leave(self, (self._style_type(), self._classes))
+        self._classes = classes
+        self._restyle()
+
+    def _restyle(self, cascade : bool = False) -> None:
+        """
+        Compute the style again from the stylesheet, the parent and the own style. Children are
+        restyled when what they inherit changed, or always with `cascade` (e.g. once attached).
+        """
+
+        parent = self._style_parent()
+        inherited = parent._inheritable if parent is not None else None
+
+        sheet = self._stylesheet()
+        if sheet is None: # not attached yet
+            record, passed = compute((), inherited, self._inline)
+        else:
+            signature = (self._style_type(), self._classes)
+            sheet._join(self, signature)
+            record, passed = sheet.resolve(signature, inherited, self._inline)
+
+        cascade = cascade or passed is not self._inheritable
+        self._inheritable = passed
+        self._set_style(record)
+
+        children = self._style_children()
+        if cascade and children:
+            for child in children:
+                child._restyle(cascade=True)
+
+    def _set_inline(self, key, value) -> None:
+        inline = self._inline
+        self._inline = intern({key: value}) if inline is None else inline.replace(key, value)
+
+        # the own style wins over everything, no need to resolve again
+        self._set_style(self._style.replace(key, value))
+        if key in INHERITED and self._style_children() is not None: # passed on to the children
+            self._restyle()
+
+    def _del_inline(self, key) -> None:
+        if self._inline is None or key not in self._inline:
+            raise KeyError(key)
+
+        inline = self._inline.without(key)
+        self._inline = inline or None
+        self._restyle()
@@ -0,0 +1,283 @@
+import time
+
+"""
+Tweens of screen object properties, started with `teacup.animate` and advanced by every frame of
+`display` / `run`. Every running tween is packed into flat numpy arrays (when numpy is installed) so
+a frame interpolates all of them with a handful of array operations, only writing the results back
+is done per object. Shape batch columns are written back with a single array assignment, animating
+a `RectangleBatch` of 10k shapes costs the same as animating one rectangle.
+"""
+
+# easing curves map progress 0..1 to 0..1, polynomials so they work on floats & numpy arrays alike
+EASINGS = {
+    "linear": lambda p: p,
+    "ease-in": lambda p: p * p * p,
+    "ease-out": lambda p: 1 - (1 - p) * (1 - p) * (1 - p),
+    "ease-in-out": lambda p: p * p * (3 - 2 * p),
+}
+
+_np = None # numpy once the first tween starts, False if it is not installed
+_channels = {} # every running channel (to None), in start order
+_properties = {} # (target, property) -> the channel animating it
+_packed = None # flat arrays of `_channels` for numpy, `None` after channels changed
+
+def _numpy():
+    global _np
+    if _np is None:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError: # fall back to interpolating channel by channel
+            _np = False
+    return _np
+
+class Tween:
+    def __init__(self, target, duration : float, easing, delay : float, on_done) -> None:
+        """
+        Handle of one `teacup.animate` call, moving any number of properties of `target` together.
+        """
+
+        self.target = target
+        self.duration = max(duration, 0)
+        self.easing = EASINGS[easing] if isinstance(easing, str) else easing
+        self.start = time.perf_counter() + delay
+        self.on_done = on_done # called with the tween once every property arrived
+        self._channels = []
+
+    @property
+    def finished(self) -> bool:
+        """
+        `True` once every property arrived or was taken over by a newer tween.
+        """
+        return not self._channels
+
+    def cancel(self) -> None:
+        """
+        Stop where the properties are now, `on_done` is not called.
+        """
+
+        for channel in tuple(self._channels):
+            _remove(channel)
+
+class _Channel:
+    __slots__ = ("tween", "target", "kind", "name", "start", "delta", "shape", "integer")
+
+    def __init__(self, tween, target, kind, name, start, end, shape, integer):
+        """
+        One animated property: `start` and `end - start` as flat sequences of floats.
+        """
+
+        self.tween = tween
+        self.target = target
+        self.kind = kind # "attribute", "style" or "column"
+        self.name = name
+        self.shape = shape # None for a number, the length of a tuple or the shape of a column
+        self.integer = integer # rounded when written, e.g. rgba
+
+        np = _numpy()
+        if np:
+            self.start = np.asarray(start, dtype=np.float64).ravel()
+            self.delta = np.asarray(end, dtype=np.float64).ravel() - self.start
+        else:
+            self.start = list(start)
+            self.delta = [b - a for a, b in zip(start, end)]
+
+    def apply(self, values):
+        """
+        Write `values`, a numpy array for columns and a list of floats otherwise.
+        """
+
+        if self.kind == "column": # one assignment into the batch
+            if self.integer:
+                values = _np.rint(values)
+            setattr(self.target, self.name, values.reshape(self.shape))
+            return
+
+        if self.integer:
+            values = [int(round(v)) for v in values]
+        value = values[0] if self.shape is None else tuple(values)
+
+        if self.kind == "style":
+            self.target.style[self.name] = value
+        else:
+            setattr(self.target, self.name, value)
+
+def animate(target, duration : float, easing="ease-in-out", delay : float = 0, on_done=None, **properties) -> Tween:
+    """
+    Move properties of `target` to new values over `duration` seconds, advanced by every frame.
+
+        teacup.animate(ball, 0.5, x=300, y=200, easing="ease-out")
+        teacup.animate(label, 2, color=(255, 0, 0, 255))
+        teacup.animate(stars, 1, color=new_colors) # whole batch column at once
+
+    Properties are attributes (`x`, `y`, `width`, `height`, `radius`, ...) or style keys, written
+    with underscores (`background_color`, `opacity`). Shape batch columns take anything that
+    broadcasts to the column. Values that start and end as ints (`font_size`, rgba) are rounded to
+    ints. A new tween of a property takes it over from a running one.
+
+    - `easing` (str | callable): one of `EASINGS` or a function mapping progress 0..1 (a float,
+    or a numpy array when numpy is installed) to 0..1
+    - `delay` (float): seconds to wait before starting
+    - `on_done` (callable | None): called with the tween once every property arrived
+    """
+
+    global _packed
+
+    tween = Tween(target, duration, easing, delay, on_done)
+    for name, end in properties.items():
+        channel = _channel(tween, target, name, end)
+        previous = _properties.get((target, channel.name))
+        if previous is not None:
+            _remove(previous)
+
+        _properties[(target, channel.name)] = channel
+        tween._channels.append(channel)
+        _channels[channel] = None
+    _packed = None
+
+    if not tween._channels and on_done is not None: # nothing to animate
+        on_done(tween)
+    return tween
+
+def _channel(tween, target, name, end):
+    key = name.replace("_", "-")
+    own_style = getattr(target, "_style", None)
+
+    if own_style is not None and key in own_style and not hasattr(type(target), name):
+        start = own_style[key]
+        kind, name = "style", key
+    else:
+        start = getattr(target, name)
+        kind = "attribute"
+
+    np = _numpy()
+    if np and isinstance(start, np.ndarray): # shape batch column
+        start = start.copy()
+        end = np.broadcast_to(end, start.shape)
+        return _Channel(tween, target, "column", name, start, end, start.shape,
+                        np.issubdtype(start.dtype, np.integer))
+
+    if isinstance(start, (tuple, list)):
+        if len(end) != len(start):
+            raise ValueError(f"can not animate {name} from {start} to {end}")
+        integer = all(_whole(v) for v in start) and all(_whole(v) for v in end) # e.g. rgba
+        return _Channel(tween, target, kind, name, start, end, len(start), integer)
+
+    integer = _whole(start) and _whole(end) # e.g. font-size, a float on either end is kept
+    return _Channel(tween, target, kind, name, (start,), (end,), None, integer)
+
+def _whole(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def stop(target) -> None:
+    """
+    Cancel every tween animating `target`, its properties stay where they are.
+    """
+
+    for channel in [channel for channel in _channels if channel.target is target]:
+        _remove(channel)
+
+def _remove(channel):
+    global _packed
+    del _channels[channel]
+    channel.tween._channels.remove(channel)
+    if _properties.get((channel.target, channel.name)) is channel:
+        del _properties[(channel.target, channel.name)]
+    _packed = None
+
+def running() -> int:
+    """
+    Returns the number of properties being animated.
+    """
+    return len(_channels)
+
+def step(now : float = None) -> None:
+    """
+    Advance every tween to `now` (`time.perf_counter()` seconds). Called by each frame before
+    anything is drawn.
+    """
+
+    if not _channels: return
+    if now is None:
+        now = time.perf_counter()
+
+    arrived = []
+    if _np:
+        channels, progress, values, offsets, columns_only = _interpolate(now)
+        listed = values if columns_only else values.tolist() # objects are written one by one anyway
+
+        for i, p in enumerate(progress.tolist()):
+            if p < 0: continue # waiting for its delay
+
+            channel = channels[i]
+            start, end = offsets[i], offsets[i + 1]
+            channel.apply(values[start:end] if channel.kind == "column" else listed[start:end])
+            if p >= 1:
+                arrived.append(channel)
+    else:
+        for channel in _channels:
+            tween = channel.tween
+            if now < tween.start: continue
+
+            p = min(1, (now - tween.start) / tween.duration) if tween.duration > 0 else 1
+            eased = tween.easing(p)
+            channel.apply([s + d * eased for s, d in zip(channel.start, channel.delta)])
+            if p >= 1:
+                arrived.append(channel)
+
+    _finish(arrived)
+
+def _interpolate(now):
+    """
+    Returns (channels, progress per channel, -1 before it started, interpolated values of every
+    channel back to back, offset of each channel in the values, whether all channels are columns).
+    """
+
+    global _packed
+    np = _np
+
+    if _packed is None: # channels changed, pack them again
+        channels = list(_channels)
+        tweens = [channel.tween for channel in channels]
+        sizes = [len(channel.start) for channel in channels]
+        groups = {}
+        for i, tween in enumerate(tweens):
+            groups.setdefault(tween.easing, []).append(i)
+
+        _packed = (
+            channels,
+            np.array([tween.start for tween in tweens]),
+            np.array([tween.duration for tween in tweens]),
+            [(easing, np.array(indices)) for easing, indices in groups.items()],
+            np.concatenate([channel.start for channel in channels]),
+            np.concatenate([channel.delta for channel in channels]),
+            np.repeat(np.arange(len(channels)), sizes), # channel of every value
+            np.concatenate(([0], np.cumsum(sizes))).tolist(),
+            all(channel.kind == "column" for channel in channels),
+        )
+
+    channels, starts, durations, groups, start, delta, lanes, offsets, columns_only = _packed
+
+    elapsed = now - starts
+    with np.errstate(divide="ignore", invalid="ignore"): # zero durations arrive right away
+        progress = np.where(durations > 0, elapsed / durations, 1.0)
+    progress = np.minimum(progress, 1.0)
+    progress[elapsed < 0] = -1 # waiting for its delay
+
+    eased = np.empty_like(progress)
+    clipped = np.maximum(progress, 0)
+    for easing, indices in groups:
+        eased[indices] = easing(clipped[indices])
+
+    return channels, progress, start + delta * eased[lanes], offsets, columns_only
+
+def _finish(arrived):
+    done = []
+    for channel in arrived:
+        _remove(channel)
+        tween = channel.tween
+        if tween.finished and tween.on_done is not None:
+            done.append(tween)
+
+    for tween in done: # may start new tweens
+        tween.on_done(tween)
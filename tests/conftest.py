@@ -0,0 +1,27 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # no display needed
+
+import pytest
+import teacup
+
+@pytest.fixture(scope="session", autouse=True)
+def headless():
+    teacup.init(headless=True)
+    yield
+    teacup.done()
+
+@pytest.fixture
+def window():
+    win = teacup.OffscreenWindow((100, 100), {"background-color": (0, 0, 0, 255)})
+    yield win
+    if win._open:
+        win.destroy()
+
+def pixel(win, x, y) -> tuple:
+    """
+    The rgba of the offscreen window `win` at (x, y).
+    """
+
+    start = y * win.pitch + x * 4
+    return tuple(bytes(win.pixels()[start:start + 4]))
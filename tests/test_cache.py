@@ -0,0 +1,35 @@
+import teacup
+from teacup.engine import cache
+
+from conftest import pixel
+
+RED = {"background-color": (255, 0, 0, 255)}
+BLUE = {"background-color": (0, 0, 255, 255)}
+
+def cached(obj):
+    obj.cache = True
+    return obj
+
+def test_larger_than_budget_is_drawn_uncached(window):
+    cache.set_budget(1000) # a 20x20 texture takes 1600 bytes
+    try:
+        window.attach(cached(teacup.Rectangle(10, 10, 20, 20, RED)))
+        window.render()
+
+        assert pixel(window, 15, 15) == (255, 0, 0, 255)
+        assert len(cache.get_cache()) == 0
+    finally:
+        cache.set_budget(64 * 1024 * 1024)
+
+def test_evicted_during_the_frame_still_draws(window):
+    cache.set_budget(2000) # room for one of the two textures
+    try:
+        window.attach(cached(teacup.Rectangle(10, 10, 20, 20, RED)))
+        window.attach(cached(teacup.Rectangle(50, 50, 20, 20, BLUE)))
+        window.render()
+
+        assert pixel(window, 15, 15) == (255, 0, 0, 255)
+        assert pixel(window, 55, 55) == (0, 0, 255, 255)
+        assert cache.get_cache().used <= 2000
+    finally:
+        cache.set_budget(64 * 1024 * 1024)
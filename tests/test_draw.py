@@ -0,0 +1,26 @@
+import teacup
+from teacup.engine import draw
+
+from conftest import pixel
+
+RED = {"background-color": (255, 0, 0, 255)}
+
+class Dot(teacup.ScreenObject):
+    def __init__(self, geometry, style, cache=False):
+        super().__init__("dot", style, cache)
+        self.geometry = geometry
+
+    def _render(self):
+        return super()._render([{"style": self._style, "shape": draw.ELLIPSE(), "geometry": self.geometry}])
+
+def test_ellipse_draws_pipes_around_their_center(window):
+    window.attach(Dot((50, 50, 20, 20), RED))
+    window.attach(Dot((20, 80, 10, 10), RED, cache=True))
+    window.render()
+
+    assert pixel(window, 50, 50) == (255, 0, 0, 255)
+    assert pixel(window, 50, 42) == (255, 0, 0, 255)
+    assert pixel(window, 50, 63) == (0, 0, 0, 255)
+    assert pixel(window, 42, 42) == (0, 0, 0, 255)
+    assert pixel(window, 20, 80) == (255, 0, 0, 255)
+    assert pixel(window, 20, 88) == (0, 0, 0, 255)
@@ -0,0 +1,57 @@
+import teacup
+
+from conftest import pixel
+
+RED = {"background-color": (255, 0, 0, 255)}
+
+def test_fractional_position(window):
+    group = teacup.Group()
+    rect = teacup.Rectangle(10, 10, 20, 20, RED)
+    group.attach(rect)
+    window.attach(group)
+    window.render()
+
+    group.x = 0.5
+    window.render()
+    rect.y = 40.25 # damage of a child, offset by the group's fractional position
+    window.render()
+
+    frame = bytes(window.pixels())
+    window._touch()
+    window.render()
+    assert bytes(window.pixels()) == frame
+    assert pixel(window, 15, 45) == (255, 0, 0, 255)
+    assert pixel(window, 15, 15) == (0, 0, 0, 255)
+
+def test_culled_children_show_up_when_scrolled_in(window):
+    group = teacup.Group()
+    for i in range(40):
+        group.attach(teacup.Rectangle(i * 50, 10, 20, 20, RED))
+    window.attach(group)
+    window.render()
+
+    group.x = -1000 # the 21st rectangle is at x=0 now
+    window.render()
+    assert pixel(window, 10, 15) == (255, 0, 0, 255)
+    assert pixel(window, 60, 15) == (255, 0, 0, 255)
+    assert pixel(window, 30, 15) == (0, 0, 0, 255)
+
+def test_bounds_follow_moving_children(window):
+    group = teacup.Group(5, 5)
+    rects = [teacup.Rectangle(i * 10, i * 5, 8, 8, RED) for i in range(10)]
+    for rect in rects:
+        group.attach(rect)
+    window.attach(group)
+
+    for step, (i, dx, dy) in enumerate([(0, 3, 0), (9, -20, 0), (9, 0, -30), (4, 50, 50), (0, -10, 2),
+                                        (4, -50, -50), (5, 1, 1), (0, 7, -2)]):
+        rects[i].x += dx
+        rects[i].y += dy
+        window.render()
+
+        x0 = min(rect.x for rect in rects)
+        y0 = min(rect.y for rect in rects)
+        x1 = max(rect.x + 8 for rect in rects)
+        y1 = max(rect.y + 8 for rect in rects)
+        assert group._bounds() == (x0 + 5, y0 + 5, x1 - x0, y1 - y0), step
+        assert group.query_point(rects[i].x + 6, rects[i].y + 6) == [rects[i]]
@@ -0,0 +1,19 @@
+import pytest
+
+from benchmarks import memory
+
+# limits of the check documented in benchmarks/memory.py, a rectangle took about 450 bytes before
+# objects were slotted
+MAX_OBJECT_BYTES = 500
+MAX_FRAME_BYTES = 80000
+MAX_REDRAW_BYTES = 4096
+
+@pytest.mark.parametrize("name", list(memory.FACTORIES))
+def test_object_bytes(name):
+    assert memory.per_object(memory.FACTORIES[name], 2000) <= MAX_OBJECT_BYTES
+
+@pytest.mark.parametrize("name", list(memory.FACTORIES))
+def test_frame_bytes(name):
+    factory = memory.FACTORIES[name]
+    assert memory.per_frame(factory, 2000, 2) <= MAX_FRAME_BYTES
+    assert memory.per_frame(factory, 2000, 2, moving=False) <= MAX_REDRAW_BYTES
@@ -0,0 +1,18 @@
+from teacup.engine import profiler
+
+def test_summary_has_one_line_per_entry():
+    profiler.enable()
+    try:
+        profiler.mark("bake")
+        profiler.mark("render")
+        profiler.add_class("Rectangle", 0.001)
+        profiler.count("calls", 3)
+        profiler.end_frame()
+        lines = profiler.summary().split("\n")
+    finally:
+        profiler.disable()
+        profiler.reset()
+
+    assert len(lines) == 4
+    assert [line.split(":")[0] for line in lines[:2]] == ["bake", "render"]
+    assert lines[2:] == ["Rectangle: 1.00ms", "calls: 3"]
@@ -0,0 +1,47 @@
+import pytest
+import teacup
+
+def frame(win) -> bytes:
+    return bytes(win.pixels())
+
+def redrawn(win) -> bytes:
+    """
+    The pixels of `win` drawn from scratch instead of only the damaged regions.
+    """
+
+    win._touch()
+    win.render()
+    return frame(win)
+
+@pytest.mark.parametrize("text", ["j", "hi 7", "fj\nyg"])
+def test_moving_text_leaves_no_trail(window, text):
+    obj = teacup.Text(20, 20, text, {"font-size": 12, "color": (255, 255, 255, 255)})
+    window.attach(obj)
+    window.render()
+
+    for dx, dy in ((1, 0), (-2, 1), (3, -2), (0, 5), (-7, 0)):
+        obj.x += dx
+        obj.y += dy
+        window.render()
+        assert frame(window) == redrawn(window), (obj.x, obj.y)
+
+def test_bounds_contain_the_glyphs(window):
+    obj = teacup.Text(10, 10, "hi 7", {"font-size": 12})
+    window.attach(obj)
+    window.render()
+
+    x0, y0, x1, y1 = obj._layout.ink
+    x, y, w, h = obj._bounds()
+    assert (x, y) == (10 + x0, 10 + y0)
+    assert w >= obj._layout.width and x + w == 10 + x1
+    assert h >= obj._layout.height and y + h == 10 + y1
+
+def test_fractional_position(window):
+    obj = teacup.Text(10.5, 20.25, "hi", {"background-color": (255, 0, 0, 255)})
+    window.attach(obj)
+    window.render()
+
+    obj.x += 1.5
+    window.render()
+    assert obj.geometry[:2] == (12, 20)
+    assert frame(window) == redrawn(window)
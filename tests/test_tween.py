@@ -0,0 +1,13 @@
+import time
+
+import teacup
+from teacup.engine import tween
+
+def test_int_to_float_target_is_not_rounded():
+    obj = teacup.Rectangle(0, 0, 10, 10)
+    teacup.animate(obj, 0.05, x=10.5, y=4)
+    tween.step(time.perf_counter() + 1) # past the end
+
+    assert obj.x == 10.5
+    assert obj.y == 4 and isinstance(obj.y, int)
+    assert tween.running() == 0
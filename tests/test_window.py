@@ -0,0 +1,16 @@
+import shutil
+
+import pytest
+from teacup.engine import core
+
+def test_destroy_after_a_failed_recording(window, tmp_path):
+    path = tmp_path / "frames"
+    window.start_recording(str(path))
+    window.render()
+    shutil.rmtree(path) # frames.json can not be written
+
+    with pytest.raises(OSError):
+        window.destroy()
+    assert not window._open
+    assert window.wid not in core._windows
+    assert window._surface is None